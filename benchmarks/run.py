@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+Analysis Benchmark Suite
+Times the Trends loader, the v1 and refined analysis sections and the v3 /
+phase-2 scorers on seeded synthetic inputs at 5, 500 and 50,000 series, and
+stores each run as JSON under benchmarks/results/ for comparison across commits
+
+    python benchmarks/run.py [--sizes 5 500] [--filter lag] [--compare results/abc1234.json]
+"""
+
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+for directory in ['phase-1-detection/analysis/v1', 'phase-1-detection/analysis/v3',
+                  'phase-2-strategies/analysis', 'common']:
+    sys.path.insert(0, str(ROOT / directory))
+
+from synthetic import (trends_frame, write_trends_csv, market_snapshots,
+                       sector_corrections, equity_universe)
+
+SIZES = [5, 500, 50000]
+# The v1 sections are written for the five-term export, so only run at that size
+SCRIPT_SIZES = [5]
+
+BENCHMARKS = []
+
+
+def benchmark(name, sizes=None, warmup=1):
+    """
+    Register a benchmark: the decorated function does its setup for n series
+    and returns the zero-argument callable that gets timed
+
+    sizes=None runs at any requested size. warmup untimed calls absorb lazy
+    imports and first-touch page faults before timing starts.
+    """
+    def register(setup):
+        BENCHMARKS.append((name, sizes, warmup, setup))
+        return setup
+    return register
+
+
+@lru_cache(maxsize=None)
+def _frame(n):
+    return trends_frame(n)
+
+
+@lru_cache(maxsize=None)
+def _csv(n, workdir):
+    return write_trends_csv(Path(workdir) / f'trends_{n}.csv', _frame(n))
+
+
+def _script_frame(n):
+    # The scripts widen the uint8 export before their arithmetic
+    return _frame(n).astype(np.int64)
+
+
+# Parsing 50,000 columns takes about a minute; nothing to warm up
+@benchmark('trends_csv_parse', warmup=0)
+def bench_csv_parse(n, workdir):
+    from trends_loader import parse_trends_csv
+    path = _csv(n, workdir)
+    return lambda: parse_trends_csv(path)
+
+
+@benchmark('trends_load_cached', warmup=0)
+def bench_load_cached(n, workdir):
+    from trends_loader import load_trends
+    path, cache_dir = _csv(n, workdir), Path(workdir) / 'cache'
+    load_trends(path, cache_dir=cache_dir)
+    return lambda: load_trends(path, cache_dir=cache_dir)
+
+
+@benchmark('v1_trend_trajectory', SCRIPT_SIZES)
+def bench_v1_trajectory(n, workdir):
+    from ai_bubble_analysis import trend_trajectory
+    df = _script_frame(n)
+    return lambda: trend_trajectory(df)
+
+
+@benchmark('v1_correlation', SCRIPT_SIZES)
+def bench_v1_correlation(n, workdir):
+    from ai_bubble_analysis import correlation_analysis
+    df = _script_frame(n)
+    return lambda: correlation_analysis(df)
+
+
+@benchmark('v1_predictive_modeling', SCRIPT_SIZES)
+def bench_v1_regression(n, workdir):
+    from ai_bubble_analysis import predictive_modeling
+    df = _script_frame(n)
+    return lambda: predictive_modeling(df)
+
+
+@benchmark('lag_correlation')
+def bench_lag_correlation(n, workdir):
+    from cross_correlation import lag_correlation_matrix
+    df = _frame(n)
+    return lambda: lag_correlation_matrix(df.iloc[:, 0], df.iloc[:, 1:])
+
+
+# The trend trajectory's peak pass (peak_stream.detect_peaks) over every
+# series; a Python loop per point, so the first two sizes only
+@benchmark('detect_peaks_per_series', [5, 500])
+def bench_peaks(n, workdir):
+    from peak_stream import detect_peaks
+    matrix = _frame(n).to_numpy(dtype=np.float64).T
+    return lambda: [detect_peaks(row, prominence=5) for row in matrix]
+
+
+@benchmark('linear_trend_batch')
+def bench_linear_trend(n, workdir):
+    from batch_scoring import linear_trend
+    matrix = _frame(n).to_numpy(dtype=np.float64).T[:, -52:]
+    return lambda: linear_trend(matrix)
+
+
+@benchmark('trend_table_batch')
+def bench_trend_table(n, workdir):
+    from batch_scoring import trend_table
+    matrix = _frame(n).to_numpy(dtype=np.float64).T
+    return lambda: trend_table(matrix)
+
+
+@benchmark('quantile_sketch')
+def bench_quantile_sketch(n, workdir):
+    from quantile_sketch import QuantileSketch
+    matrix = _frame(n).to_numpy(dtype=np.float64).T
+
+    def run():
+        # Weekly updates as a monitor would see them, then the phase thresholds
+        sketch = QuantileSketch(range(n))
+        for week in range(matrix.shape[1]):
+            sketch.update(matrix[:, week])
+        sketch.phase_thresholds()
+    return run
+
+
+# 200 resamples per series; cost is linear in series x resamples, so 50,000
+# series would take minutes
+@benchmark('score_bootstrap', [5, 500])
+def bench_score_bootstrap(n, workdir):
+    from score_bootstrap import bootstrap_scores
+    matrix = _frame(n).to_numpy(dtype=np.float64).T
+    return lambda: bootstrap_scores(matrix, matrix[2], matrix[1], _frame(n).index, n_boot=200)
+
+
+# One series; n is the number of paths in thousands (5k, 500k and 50M paths
+# would not fit, so only the first two sizes run)
+@benchmark('monte_carlo_paths', [5, 500])
+def bench_monte_carlo(n, workdir):
+    from monte_carlo import fan_chart, simulate_ar
+    history = _frame(1).iloc[:, 0].to_numpy(dtype=np.float64)
+    return lambda: fan_chart(simulate_ar(history, horizon=26, n_paths=n * 1000))
+
+
+@benchmark('change_points_batch')
+def bench_change_points(n, workdir):
+    from change_points import pelt_matrix
+    matrix = _frame(n).to_numpy(dtype=np.float64).T
+    return lambda: pelt_matrix(matrix)
+
+
+# A week at a time through per-series detectors, as a live monitor runs; the
+# Python loop per point keeps this to the first two sizes
+@benchmark('streaming_peaks', [5, 500])
+def bench_streaming_peaks(n, workdir):
+    from peak_stream import PeakMonitor
+    frame = _frame(n)
+    weeks = frame.to_numpy(dtype=np.float64)
+
+    def run():
+        monitor = PeakMonitor(frame.columns, wlen=52)
+        for week in weeks:
+            monitor.update(week)
+    return run
+
+
+@benchmark('refined_monthly_quarterly')
+def bench_refined_phases(n, workdir):
+    from ai_bubble_refined_analysis import prepare_frames, evolution_phases, acceleration_analysis
+    df = _script_frame(n)
+
+    def run():
+        df_relevant, df_monthly, df_quarterly = prepare_frames(df)
+        evolution_phases(df_monthly)
+        acceleration_analysis(df_quarterly)
+    return run
+
+
+@benchmark('phase_timeline_batch')
+def bench_phase_timeline(n, workdir):
+    from aggregate_pyramid import AggregatePyramid
+    from batch_scoring import classify_monthly_phases, period_growth
+    pyramid = AggregatePyramid.from_frame(_frame(n))
+    monthly = pyramid.frame('month').to_numpy()
+    quarterly = pyramid.frame('quarter').to_numpy()
+
+    def run():
+        classify_monthly_phases(monthly)
+        period_growth(quarterly, axis=0)
+    return run
+
+
+@benchmark('monitor_composite_score')
+def bench_composite(n, workdir):
+    from bubble_monitoring_dashboard import AIBubbleMonitor
+    monitors = [AIBubbleMonitor() for _ in range(n)]
+    return lambda: [monitor.calculate_composite_score() for monitor in monitors]
+
+
+@benchmark('monitor_indicator_scores')
+def bench_indicators(n, workdir):
+    from bubble_monitoring_dashboard import AIBubbleMonitor
+    monitor = AIBubbleMonitor()
+    snapshots = market_snapshots(n)
+
+    def run():
+        for snapshot in snapshots:
+            for method, kwargs in snapshot.items():
+                getattr(monitor, method)(**kwargs)
+    return run
+
+
+# One input changing per step, as in a scenario sweep: the other five
+# indicators come from the monitor's cache
+@benchmark('monitor_scenario_sweep')
+def bench_scenario_sweep(n, workdir):
+    from bubble_monitoring_dashboard import AIBubbleMonitor
+    monitor = AIBubbleMonitor()
+    investments = np.linspace(10, 120, n)
+
+    def run():
+        for investment in investments:
+            monitor.set_inputs('vc_funding', quarterly_investment=float(investment))
+            monitor.calculate_composite_score()
+    return run
+
+
+# n derived indicators on top of the built-in six, half of them downstream of
+# vc_funding: an input change re-evaluates only those and what they need
+@benchmark('monitor_derived_indicators')
+def bench_derived_indicators(n, workdir):
+    from bubble_monitoring_dashboard import AIBubbleMonitor
+    monitor = AIBubbleMonitor()
+
+    def funding_gap(monitor, vc_funding, valuation_metrics, scale=1.0):
+        return abs(vc_funding['score'] - valuation_metrics['score']) * scale
+
+    def search_gap(monitor, search_trends, valuation_metrics, scale=1.0):
+        return abs(search_trends['score'] - valuation_metrics['score']) * scale
+
+    names = [f'derived_{i}' for i in range(n)]
+    for i, name in enumerate(names):
+        compute, base = [(funding_gap, 'vc_funding'), (search_gap, 'search_trends')][i % 2]
+        monitor.registry.register(name, compute, depends=[base, 'valuation_metrics'])
+    monitor.evaluate(*names)
+    investments = iter(np.linspace(10, 120, 1000))
+
+    def run():
+        monitor.set_inputs('vc_funding', quarterly_investment=float(next(investments)))
+        monitor.evaluate(*names)
+    return run
+
+
+# n thousand random what-if scenarios, every input varied, scored in one pass
+# (50M scenarios would not fit, so only the first two sizes run)
+@benchmark('monitor_scenario_grid', [5, 500])
+def bench_scenario_grid(n, workdir):
+    from bubble_monitoring_dashboard import AIBubbleMonitor
+    from scenario_grid import random_scenarios, INDICATOR_INPUTS
+    monitor = AIBubbleMonitor()
+    ranges = {name: (0, 150) for names in INDICATOR_INPUTS.values() for name in names
+              if name != 'pe_ratios'}
+    ranges.update({f'pe_{company}': (10, 120) for company in monitor.DEFAULT_PE_RATIOS})
+    scenarios = random_scenarios(n * 1000, ranges)
+    return lambda: monitor.score_scenarios(scenarios)
+
+
+# 10n base rows of the Saltelli design (37 composites each), scored in-process
+@benchmark('monitor_sobol_chunk', [5, 500])
+def bench_sobol_chunk(n, workdir):
+    from bubble_monitoring_dashboard import AIBubbleMonitor
+    from sensitivity import parameter_space, _sobol_chunk
+    space = parameter_space(AIBubbleMonitor())
+    return lambda: _sobol_chunk(space, 0, n * 10, 0)
+
+
+# A dashboard refresh after n new weeks of a five-year search series: the
+# cached pyramid is restored and only the new weeks folded in (50,000 weeks
+# of a single term is not a refresh, so only the first two sizes run)
+@benchmark('search_feed_refresh', [5, 500])
+def bench_search_feed(n, workdir):
+    from search_feed import SearchTrendFeed
+    weeks = pd.date_range('2019-01-06', periods=260 + n, freq='W-SUN')
+    values = np.random.default_rng(0).uniform(0, 100, len(weeks)).round()
+    df = pd.DataFrame({'ai_bubble': values}, index=weeks)
+    feed = SearchTrendFeed(Path(workdir) / f'search_feed_{n}')
+    feed.inputs(df.iloc[:260])
+    cached = {path: path.read_bytes() for path in [feed._pyramid_path, feed._meta_path]}
+
+    def run():
+        for path, data in cached.items():
+            path.write_bytes(data)
+        SearchTrendFeed(feed.cache_dir.parent).inputs(df)
+    return run
+
+
+# n tickers read from Parquet and scored against their sector norms, both
+# weightings and the sector breakdown
+@benchmark('valuation_universe')
+def bench_valuation_universe(n, workdir):
+    from valuation_engine import load_universe, universe_score
+    path = Path(workdir) / f'universe_{n}.parquet'
+    equity_universe(n).to_parquet(path)
+    return lambda: universe_score(load_universe(path))
+
+
+def _history_snapshots(n, seed=0):
+    # n monitor snapshots five minutes apart over two universes
+    rng = np.random.default_rng(seed)
+    names = ['search_trends', 'valuation_metrics', 'sentiment_analysis', 'vc_funding',
+             'market_concentration', 'roi_delivery']
+    scores = rng.uniform(0, 100, (n, len(names)))
+    start = pd.Timestamp('2024-01-01')
+    return [{'indicators': {name: {'score': score, 'interpretation': 'High concern'}
+                            for name, score in zip(names, row)},
+             'composite': row.mean(), 'timestamp': start + pd.Timedelta(minutes=5 * (i // 2)),
+             'universe': ('us', 'eu')[i % 2]} for i, row in enumerate(scores)]
+
+
+@benchmark('score_history_append')
+def bench_history_append(n, workdir):
+    from score_history import ScoreHistory
+    snapshots = _history_snapshots(n)
+    runs = iter(range(1000))
+
+    def run():
+        with ScoreHistory(Path(workdir) / f'history_{n}_{next(runs)}.db') as history:
+            history.append_many(snapshots)
+    return run
+
+
+@benchmark('score_history_queries')
+def bench_history_queries(n, workdir):
+    from score_history import ScoreHistory
+    history = ScoreHistory(Path(workdir) / f'history_queries_{n}.db')
+    history.append_many(_history_snapshots(n))
+    middle = pd.Timestamp('2024-01-01') + pd.Timedelta(minutes=5 * n // 4)
+
+    def run():
+        history.range(middle, middle + pd.Timedelta('1D'), universe='us')
+        history.latest('eu')
+        history.downsample('1D', universe='us')
+    return run
+
+
+@benchmark('sector_historical_patterns')
+def bench_sector_patterns(n, workdir):
+    from sector_rotation_analysis import SectorRotationAnalyzer
+    analyzer = SectorRotationAnalyzer()
+    analyzer.corrections = sector_corrections(n)
+    return analyzer.analyze_historical_patterns
+
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Silence the analyses' printing and warnings, as their scripts' main() does
+    """
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), \
+            warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        yield
+
+
+def time_call(func, repeat, warmup=1):
+    """
+    Wall-clock seconds of `repeat` calls, after `warmup` untimed ones
+    """
+    times = []
+    with quiet():
+        for _ in range(warmup):
+            func()
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                    cwd=ROOT, capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+    return commit, dirty
+
+
+def run_suite(sizes=SIZES, name_filter=None, repeat=3):
+    """
+    Run every registered benchmark at the requested sizes; returns result rows
+    """
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, supported, warmup, setup in BENCHMARKS:
+            if name_filter and name_filter not in name:
+                continue
+            for n in sizes:
+                if supported is not None and n not in supported:
+                    continue
+                with quiet():
+                    func = setup(n, workdir)
+                times = time_call(func, repeat, warmup)
+                rows.append({'name': name, 'size': n, 'repeat': repeat, 'min': min(times),
+                             'median': statistics.median(times), 'times': times})
+                print(f"{name:28s} {n:>6d}  min {min(times) * 1000:10.2f} ms"
+                      f"  median {statistics.median(times) * 1000:10.2f} ms", flush=True)
+    return rows
+
+
+def save_results(rows, path=None):
+    """
+    Write a run with enough context (commit, versions, machine) to compare later
+    """
+    commit, dirty = git_revision()
+    record = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': rows,
+    }
+    if path is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        path = RESULTS_DIR / f"{commit}{'-dirty' if dirty else ''}.json"
+    Path(path).write_text(json.dumps(record, indent=2))
+    return path
+
+
+def compare(baseline_path, rows):
+    """
+    Print min-time ratios of this run against a stored one (>1 means slower now)
+    """
+    baseline = json.loads(Path(baseline_path).read_text())
+    before = {(r['name'], r['size']): r['min'] for r in baseline['results']}
+    print(f"\nAgainst {baseline['commit']} ({baseline['timestamp']}):")
+    for row in rows:
+        old = before.get((row['name'], row['size']))
+        if old is None:
+            continue
+        ratio = row['min'] / old
+        flag = '  SLOWER' if ratio > 1.1 else '  faster' if ratio < 0.9 else ''
+        print(f"  {row['name']:28s} {row['size']:>6d}  {old * 1000:10.2f} -> "
+              f"{row['min'] * 1000:10.2f} ms  x{ratio:5.2f}{flag}")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run the analysis benchmarks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES,
+                        help='series counts to run at (default: %(default)s)')
+    parser.add_argument('--filter', default=None, help='only benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=3, help='timed calls per case (default: %(default)s)')
+    parser.add_argument('--output', default=None,
+                        help='results file (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', default=None, help='earlier results file to compare against')
+    args = parser.parse_args()
+
+    rows = run_suite(args.sizes, args.filter, args.repeat)
+    path = save_results(rows, args.output)
+    print(f"\nResults saved to: {path}")
+    if args.compare:
+        compare(args.compare, rows)
+    return rows
+
+
+if __name__ == "__main__":
+    rows = main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Synthetic Benchmark Inputs
+Seeded generators for Google Trends-shaped search data and for the market
+inputs AIBubbleMonitor and SectorRotationAnalyzer score, at any number of
+series
+"""
+
+import numpy as np
+import pandas as pd
+
+# The five terms the v1 scripts analyse come first, so a 5-series frame is a
+# drop-in replacement for the bundled export
+TERMS = ['ai_bubble', 'ai_startup', 'prompt_engineering', 'ai_roadmap', 'langchain']
+HEADERS = ['AI bubble', 'AI Startup', 'prompt engineering', 'AI roadmap', 'langchain']
+FIRST_WEEK = '2020-10-18'
+N_WEEKS = 262
+
+SECTORS = ['Technology', 'Consumer Discretionary', 'Financials', 'Healthcare',
+           'Industrials', 'Energy', 'Utilities', 'Consumer Staples', 'Real Estate',
+           'Materials', 'Gold/Precious Metals']
+
+# Series are generated in fixed-size blocks, each from its own seeded stream,
+# so series i is identical whatever total size it is generated at
+BLOCK = 4096
+
+
+def term_names(n_series):
+    return TERMS[:n_series] + [f'term_{i:05d}' for i in range(len(TERMS), n_series)]
+
+
+def _trends_block(rng, n_series, n_weeks, weeks):
+    """
+    Log-space random walk plus a logistic take-off, a year-end dip and rare
+    news spikes, rescaled so each series peaks at 100 like a Trends export
+    """
+    t = np.arange(n_weeks)
+    walk = np.cumsum(rng.normal(0.0, 0.08, (n_series, n_weeks)), axis=1)
+    onset = rng.integers(n_weeks // 4, n_weeks, (n_series, 1))
+    width = rng.uniform(4, 20, (n_series, 1))
+    takeoff = rng.uniform(1, 4, (n_series, 1)) / (1 + np.exp(-(t - onset) / width))
+    year_end = np.isin(weeks.isocalendar().week.to_numpy(), [52, 53, 1])
+    spikes = (rng.random((n_series, n_weeks)) < 0.01) * rng.exponential(1.0, (n_series, n_weeks))
+    level = np.exp(walk + takeoff - 0.15 * year_end + spikes - rng.uniform(0, 3, (n_series, 1)))
+    return np.round(100 * level / level.max(axis=1, keepdims=True)).astype(np.uint8)
+
+
+def trends_matrix(n_series, n_weeks=N_WEEKS, seed=0):
+    """
+    n_series x n_weeks uint8 matrix of 0-100 search interest
+    """
+    weeks = pd.date_range(FIRST_WEEK, periods=n_weeks, freq='W-SUN')
+    blocks = []
+    for block, start in enumerate(range(0, n_series, BLOCK)):
+        rng = np.random.default_rng([seed, block])
+        blocks.append(_trends_block(rng, BLOCK, n_weeks, weeks)[:min(BLOCK, n_series - start)])
+    return np.concatenate(blocks) if blocks else np.empty((0, n_weeks), dtype=np.uint8)
+
+
+def trends_frame(n_series, n_weeks=N_WEEKS, seed=0):
+    """
+    Weeks x series DataFrame shaped like load_trends() output
+    """
+    weeks = pd.DatetimeIndex(pd.date_range(FIRST_WEEK, periods=n_weeks, freq='W-SUN'), name='Week')
+    return pd.DataFrame(trends_matrix(n_series, n_weeks, seed).T, index=weeks,
+                        columns=term_names(n_series))
+
+
+def write_trends_csv(path, df):
+    """
+    Write a frame in Google's multiTimeline export format, zeros as '<1'
+    """
+    names = list(df.columns)
+    headers = [HEADERS[TERMS.index(n)] if n in TERMS else n.replace('_', ' ') for n in names]
+    body = df.astype(str).replace('0', '<1')
+    body.index = df.index.strftime('%Y-%m-%d')
+    with open(path, 'w') as fh:
+        fh.write('Category: All categories\n\n')
+        fh.write(','.join(['Week'] + [f'{h}: (United States)' for h in headers]) + '\n')
+        body.to_csv(fh, header=False)
+    return path
+
+
+def market_snapshots(n, seed=0):
+    """
+    n sets of keyword arguments for AIBubbleMonitor's six calculate_* methods,
+    spread around the defaults the dashboard ships with
+    """
+    rng = np.random.default_rng([seed, 1])
+    pe = rng.lognormal(np.log([53, 35, 28, 27, 100]), 0.3, (n, 5)).round(1)
+    snapshots = []
+    for i in range(n):
+        snapshots.append({
+            'calculate_search_trend_score': {
+                'current_level': int(rng.integers(0, 101)), 'growth_rate': float(rng.uniform(-50, 400))},
+            'calculate_valuation_score': {
+                'pe_ratios': dict(zip(['NVIDIA', 'Microsoft', 'Google', 'Meta', 'OpenAI_implied'], pe[i]))},
+            'calculate_sentiment_score': {
+                'fund_manager_bubble_pct': float(rng.uniform(0, 100)),
+                'expert_warnings': int(rng.integers(0, 15)), 'media_mentions': float(rng.uniform(0, 100))},
+            'calculate_vc_funding_score': {
+                'quarterly_investment': float(rng.uniform(5, 150)), 'yoy_growth': float(rng.uniform(-30, 150))},
+            'calculate_concentration_score': {
+                'top7_market_share': float(rng.uniform(10, 45)), 'ai_exposure_pct': float(rng.uniform(0, 80))},
+            'calculate_roi_score': {
+                'project_failure_rate': float(rng.uniform(50, 100)),
+                'paid_user_pct': float(rng.uniform(0, 40)), 'revenue_multiple': float(rng.uniform(5, 150))},
+        })
+    return snapshots
+
+
+def sector_corrections(n_sectors, n_corrections=4, seed=0):
+    """
+    SectorRotationAnalyzer.corrections-shaped history with n_sectors sectors
+    (the eleven real ones first) across n_corrections tech corrections
+    """
+    rng = np.random.default_rng([seed, 2])
+    names = SECTORS[:n_sectors] + [f'Sector {i:05d}' for i in range(len(SECTORS), n_sectors)]
+    tech = -rng.uniform(25, 80, n_corrections).round()
+    # Sector moves track the tech drawdown with a sector-specific beta
+    beta = rng.uniform(-0.3, 1.2, n_sectors)
+    moves = (beta[None, :] * tech[:, None] + rng.normal(0, 12, (n_corrections, n_sectors))).round()
+    return {
+        f'Synthetic Correction {c + 1}': {
+            'tech_performance': int(tech[c]),
+            'sector_performance': dict(zip(names, moves[c].astype(int).tolist())),
+        }
+        for c in range(n_corrections)
+    }
+
+
+def equity_universe(n_tickers, seed=0):
+    """
+    Ticker, sector, P/E, P/S and market cap columns for n_tickers stocks:
+    lognormal multiples and caps, one in ten loss-making (negative P/E)
+    """
+    rng = np.random.default_rng([seed, 3])
+    sectors = SECTORS[:-1] + ['Communication Services']
+    pe = rng.lognormal(np.log(22), 0.6, n_tickers)
+    return pd.DataFrame({
+        'ticker': [f'T{i:07d}' for i in range(n_tickers)],
+        'sector': pd.Categorical(rng.choice(sectors, n_tickers), categories=sectors),
+        'pe': np.where(rng.random(n_tickers) < 0.1, -pe, pe).round(1),
+        'ps': rng.lognormal(np.log(2.5), 0.8, n_tickers).round(2),
+        'market_cap': rng.lognormal(np.log(5e9), 1.5, n_tickers),
+    })
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Figure Rendering
+Hashes the inputs of each figure, copies unchanged figures straight out of an
+on-disk cache and renders the rest in parallel worker processes on the Agg
+backend, so the calling process never imports matplotlib
+
+    python common/figures.py [--output-dir DIR] [--workers N]
+"""
+
+import contextlib
+import hashlib
+import inspect
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from importlib import metadata
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Bump when the way figures are saved changes, to invalidate every cached PNG
+RENDER_VERSION = 1
+CACHE_DIR = Path(os.environ.get('FIGURE_CACHE_DIR',
+                                Path.home() / '.cache' / 'ai-bubble-or-not' / 'figures'))
+
+
+class FigureJob:
+    """
+    One figure to produce: func(*args, **kwargs) must return a matplotlib
+    Figure, and must be importable by name (a module-level function or a
+    method of a picklable object) so worker processes can call it
+    """
+
+    def __init__(self, name, func, args=(), kwargs=None, output=None, dpi=150):
+        self.name = name
+        self.func = func
+        self.args = tuple(args)
+        self.kwargs = dict(kwargs or {})
+        self.output = Path(output if output is not None else f'{name}.png')
+        self.dpi = dpi
+
+
+def _feed(h, obj):
+    """
+    Stream a canonical encoding of obj into hash h
+
+    Frames and arrays are hashed by content rather than pickled, so the
+    digest is stable across runs and processes.
+    """
+    h.update(type(obj).__name__.encode())
+    if isinstance(obj, pd.DataFrame):
+        _feed(h, list(obj.columns))
+        _feed(h, [str(t) for t in obj.dtypes])
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, (pd.Series, pd.Index)):
+        _feed(h, getattr(obj, 'name', None))
+        h.update(str(obj.dtype).encode())
+        h.update(pd.util.hash_pandas_object(obj).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(f'{obj.dtype.str}{obj.shape}'.encode())
+        if obj.dtype.hasobject:
+            _feed(h, obj.tolist())
+        else:
+            h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        h.update(str(len(obj)).encode())
+        for key, value in obj.items():           # insertion order matters to plots
+            _feed(h, key)
+            _feed(h, value)
+    elif isinstance(obj, (list, tuple)):
+        h.update(str(len(obj)).encode())
+        for item in obj:
+            _feed(h, item)
+    elif obj is None or isinstance(obj, (bool, int, float, str, bytes, np.generic,
+                                         datetime, date, pd.Timestamp)):
+        h.update(repr(obj).encode())
+    elif hasattr(obj, '__dict__'):
+        h.update(type(obj).__qualname__.encode())
+        _feed(h, vars(obj))
+    else:
+        h.update(repr(obj).encode())
+
+
+def _module_source(func):
+    """
+    Source file of the module defining func; any edit to it invalidates its figures
+    """
+    try:
+        return Path(inspect.getsourcefile(func)).read_bytes()
+    except (TypeError, OSError):
+        return func.__qualname__.encode()
+
+
+def figure_digest(job):
+    """
+    SHA-1 over everything that determines the PNG: plotting code, inputs,
+    dpi and the matplotlib version doing the drawing
+    """
+    try:
+        mpl_version = metadata.version('matplotlib')
+    except metadata.PackageNotFoundError:
+        mpl_version = 'missing'
+
+    h = hashlib.sha1()
+    _feed(h, [RENDER_VERSION, mpl_version, job.dpi, job.func.__qualname__])
+    h.update(_module_source(job.func))
+    if hasattr(job.func, '__self__'):
+        _feed(h, job.func.__self__)
+    _feed(h, list(job.args))
+    _feed(h, job.kwargs)
+    return h.hexdigest()
+
+
+def _init_worker():
+    import matplotlib
+    import tracemalloc
+    matplotlib.use('Agg', force=True)
+    # A forked worker inherits the parent's allocation tracing; drawing doesn't need it
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def _render(func, args, kwargs, path, dpi):
+    """
+    Worker side: draw one figure and write it atomically to path
+    """
+    import matplotlib.pyplot as plt
+
+    # Figure functions sometimes print their inputs; keep worker output quiet
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        fig = func(*args, **kwargs)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    fig.savefig(tmp, dpi=dpi, bbox_inches='tight', format='png')
+    plt.close(fig)
+    os.replace(tmp, path)
+    return path
+
+
+def render_figures(jobs, workers=None, cache_dir=None, use_cache=True):
+    """
+    Produce every job's PNG, rendering only those whose inputs changed
+
+    Returns one dict per job with name, output, digest and whether it was a
+    cache hit. Misses are drawn in a pool of up to `workers` processes
+    (default: one per CPU, never more than there are misses).
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else CACHE_DIR
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    results, misses = [], []
+    for job in jobs:
+        digest = figure_digest(job)
+        cached = cache_dir / f'{digest}.png'
+        hit = use_cache and cached.exists()
+        results.append({'name': job.name, 'output': job.output, 'digest': digest, 'cached': hit})
+        if not hit:
+            misses.append((job, cached))
+
+    if misses:
+        workers = min(workers or os.cpu_count() or 1, len(misses))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(_render, job.func, job.args, job.kwargs, str(cached), job.dpi)
+                       for job, cached in misses]
+            for future in futures:
+                future.result()
+
+    for job, result in zip(jobs, results):
+        job.output.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(cache_dir / f"{result['digest']}.png", job.output)
+    return results
+
+
+def main():
+    """
+    Run every analysis quietly and render all four figures in one pool
+    """
+    import argparse
+    import io
+
+    parser = argparse.ArgumentParser(description='Render all analysis figures')
+    parser.add_argument('--output-dir', default='.', help='where to write the PNGs (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=None, help='render processes (default: one per CPU)')
+    parser.add_argument('--no-cache', action='store_true', help='re-render even when inputs are unchanged')
+    args = parser.parse_args()
+
+    for directory in ['phase-1-detection/analysis/v1', 'phase-1-detection/analysis/v3',
+                      'phase-2-strategies/analysis']:
+        sys.path.insert(0, str(ROOT / directory))
+    import ai_bubble_analysis
+    import ai_bubble_refined_analysis
+    import bubble_monitoring_dashboard
+    import sector_rotation_analysis
+
+    out = Path(args.output_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df, results = ai_bubble_analysis.run_analysis()
+        frames, refined = ai_bubble_refined_analysis.run_analysis()
+        monitor = bubble_monitoring_dashboard.AIBubbleMonitor()
+        monitor.calculate_composite_score()
+        analyzer = sector_rotation_analysis.SectorRotationAnalyzer()
+
+    jobs = [
+        ai_bubble_analysis.figure_job(df, results, out / 'ai_bubble_analysis.png'),
+        ai_bubble_refined_analysis.figure_job(frames, refined, out / 'ai_bubble_refined_analysis.png'),
+        bubble_monitoring_dashboard.figure_job(monitor, out / 'ai_bubble_dashboard.png'),
+        sector_rotation_analysis.figure_job(analyzer, out / 'sector_rotation_analysis.png'),
+    ]
+    for result in render_figures(jobs, workers=args.workers, use_cache=not args.no_cache):
+        print(f"{'cached  ' if result['cached'] else 'rendered'} {result['output']}")
+
+
+if __name__ == "__main__":
+    main()
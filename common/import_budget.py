@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Import-Time Budget Check
+Imports every analysis module in a fresh interpreter and fails if it drags in
+a plotting library or scipy, or costs more than the budget on top of
+numpy + pandas
+
+    python common/import_budget.py [--budget-ms 100] [--repeat 3]
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Libraries that must only load when a figure or a statistical test is requested
+FORBIDDEN = ['matplotlib', 'seaborn', 'scipy']
+
+# Incremental import cost allowed per module, over an interpreter that has
+# already imported numpy and pandas (which every module needs anyway)
+BUDGET_MS = 100
+
+# (directory, module) pairs that make up the library surface
+MODULES = [
+    ('common', 'figures'),
+    ('common', 'instrument'),
+    ('common', 'monte_carlo'),
+    ('phase-1-detection/analysis/v1', 'trends_loader'),
+    ('phase-1-detection/analysis/v1', 'trends_store'),
+    ('phase-1-detection/analysis/v1', 'cross_correlation'),
+    ('phase-1-detection/analysis/v1', 'incremental_indicators'),
+    ('phase-1-detection/analysis/v1', 'batch_scoring'),
+    ('phase-1-detection/analysis/v1', 'historical_replay'),
+    ('phase-1-detection/analysis/v1', 'aggregate_pyramid'),
+    ('phase-1-detection/analysis/v1', 'quantile_sketch'),
+    ('phase-1-detection/analysis/v1', 'score_bootstrap'),
+    ('phase-1-detection/analysis/v1', 'change_points'),
+    ('phase-1-detection/analysis/v1', 'peak_stream'),
+    ('phase-1-detection/analysis/v1', 'ai_bubble_analysis'),
+    ('phase-1-detection/analysis/v1', 'ai_bubble_refined_analysis'),
+    ('phase-1-detection/analysis/v3', 'indicator_registry'),
+    ('phase-1-detection/analysis/v3', 'bubble_monitoring_dashboard'),
+    ('phase-1-detection/analysis/v3', 'scenario_grid'),
+    ('phase-1-detection/analysis/v3', 'sensitivity'),
+    ('phase-1-detection/analysis/v3', 'score_history'),
+    ('phase-1-detection/analysis/v3', 'search_feed'),
+    ('phase-1-detection/analysis/v3', 'valuation_engine'),
+    ('phase-2-strategies/analysis', 'sector_rotation_analysis'),
+]
+
+PROBE = '''
+import json, sys, time
+import numpy, pandas
+sys.path.insert(0, {directory!r})
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+loaded = sorted({{name.split('.')[0] for name in sys.modules}} & set({forbidden!r}))
+print(json.dumps({{'ms': elapsed, 'loaded': loaded}}))
+'''
+
+
+def measure(directory, module, repeat=3):
+    """
+    Best-of-`repeat` import time (ms) of one module in fresh interpreters,
+    plus any forbidden libraries it loaded
+    """
+    code = PROBE.format(directory=str(ROOT / directory), module=module, forbidden=FORBIDDEN)
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                             text=True, check=True, cwd=ROOT / directory)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return min(run['ms'] for run in runs), runs[0]['loaded']
+
+
+def check(budget_ms=BUDGET_MS, repeat=3):
+    """
+    Measure every module; returns a list of (module, ms, loaded, ok)
+    """
+    results = []
+    for directory, module in MODULES:
+        ms, loaded = measure(directory, module, repeat)
+        results.append((module, ms, loaded, ms <= budget_ms and not loaded))
+    return results
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Check the import-time budget of the analysis modules')
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS,
+                        help='per-module budget over numpy + pandas (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='fresh interpreters per module, best time kept (default: %(default)s)')
+    args = parser.parse_args()
+
+    results = check(args.budget_ms, args.repeat)
+    for module, ms, loaded, ok in results:
+        note = f"  loads {', '.join(loaded)}" if loaded else ''
+        print(f"{'ok  ' if ok else 'FAIL'} {module:30s} {ms:7.1f} ms{note}")
+
+    failed = [module for module, _, _, ok in results if not ok]
+    if failed:
+        print(f"\n{len(failed)} module(s) over the {args.budget_ms:.0f} ms budget or loading {'/'.join(FORBIDDEN)}")
+        sys.exit(1)
+    print(f"\nAll {len(results)} modules within {args.budget_ms:.0f} ms and headless")
+
+
+if __name__ == "__main__":
+    main()
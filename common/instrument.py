@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Section Instrumentation
+Records wall time, CPU time and peak allocated memory for each analysis
+section and writes them as a JSON/CSV trace and, optionally, a Chrome trace
+(chrome://tracing or ui.perfetto.dev)
+
+Off unless enabled, in which case a traced call costs one flag check.
+Enable from the environment:
+
+    ANALYSIS_TRACE=trace.csv ANALYSIS_CHROME_TRACE=trace.json python ai_bubble_analysis.py
+
+or in code with enable(trace_path=..., chrome_path=...).
+
+Sections may run on several threads at once; each thread nests its own.
+CPU time and peak memory are process-wide counters, so only main-thread
+sections get them: a section on another thread records that thread's own
+CPU time (time.thread_time) and no peak memory.
+
+Only the last MAX_RECORDS sections are kept (ANALYSIS_TRACE_MAX_RECORDS or
+enable(max_records=...)), so tracing can stay on in a long-running monitor.
+"""
+
+import atexit
+import functools
+import os
+import threading
+import time
+from collections import deque
+
+MAX_RECORDS = 100000
+
+_enabled = False
+_memory = False
+_own_tracemalloc = False            # whether enable() started tracemalloc
+_flush_registered = False
+_records = deque(maxlen=MAX_RECORDS)
+_local = threading.local()          # per thread: the stack of open sections
+_outputs = {'trace': None, 'chrome': None}
+_origin = time.perf_counter()
+
+
+def enabled():
+    return _enabled
+
+
+def enable(trace_path=None, chrome_path=None, memory=True, max_records=None):
+    """
+    Start recording; on exit the records are written to trace_path (.json or
+    .csv) and chrome_path if given. memory=True tracks peak allocations with
+    tracemalloc, which slows allocation-heavy code down noticeably.
+    max_records changes how many of the latest sections are kept.
+    """
+    global _enabled, _memory, _own_tracemalloc, _flush_registered, _records
+    _outputs['trace'] = trace_path
+    _outputs['chrome'] = chrome_path
+    if max_records is not None and max_records != _records.maxlen:
+        _records = deque(_records, maxlen=max_records)
+    if memory and not _memory:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _own_tracemalloc = True
+        _memory = True
+    if not _flush_registered:
+        atexit.register(_flush)
+        _flush_registered = True
+    _enabled = True
+
+
+def disable():
+    global _enabled, _memory, _own_tracemalloc
+    _enabled = False
+    if _memory:
+        # Leave tracemalloc running if someone else started it
+        if _own_tracemalloc:
+            import tracemalloc
+            tracemalloc.stop()
+            _own_tracemalloc = False
+        _memory = False
+
+
+def records():
+    """
+    Completed sections so far (the latest MAX_RECORDS), in the order they
+    finished
+    """
+    return list(_records)
+
+
+def reset():
+    _records.clear()
+
+
+class _Frame:
+    __slots__ = ('name', 'wall', 'cpu', 'clock', 'main', 'mem_start', 'peak')
+
+    def __init__(self, name):
+        self.name = name
+        self.peak = 0
+        self.main = threading.current_thread() is threading.main_thread()
+        # process_time would count every thread's work against a worker's section
+        self.clock = time.process_time if self.main else time.thread_time
+
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _begin(name):
+    frame = _Frame(name)
+    stack = _stack()
+    # tracemalloc's peak is process-wide: only the main thread may reset it
+    if _memory and frame.main:
+        import tracemalloc
+        current, peak = tracemalloc.get_traced_memory()
+        # Fold the parent's peak so far in before resetting the counter for this section
+        if stack:
+            stack[-1].peak = max(stack[-1].peak, peak)
+        tracemalloc.reset_peak()
+        frame.mem_start = current
+        frame.peak = current
+    stack.append(frame)
+    frame.cpu = frame.clock()
+    frame.wall = time.perf_counter()
+    return frame
+
+
+def _end(frame):
+    wall_end = time.perf_counter()
+    cpu_end = frame.clock()
+    stack = _stack()
+    stack.pop()
+    peak_kb = None
+    if _memory and frame.main:
+        import tracemalloc
+        _, peak = tracemalloc.get_traced_memory()
+        frame.peak = max(frame.peak, peak)
+        peak_kb = (frame.peak - frame.mem_start) / 1024
+        if stack:
+            stack[-1].peak = max(stack[-1].peak, frame.peak)
+    _records.append({
+        'name': frame.name,
+        'depth': len(stack),
+        'start_ms': (frame.wall - _origin) * 1000,
+        'wall_ms': (wall_end - frame.wall) * 1000,
+        'cpu_ms': (cpu_end - frame.cpu) * 1000,
+        'peak_kb': peak_kb,
+        'thread': threading.get_ident(),
+    })
+
+
+class section:
+    """
+    Context manager timing the enclosed block as one named section
+    """
+
+    __slots__ = ('name', 'frame')
+
+    def __init__(self, name):
+        self.name = name
+        self.frame = None
+
+    def __enter__(self):
+        if _enabled:
+            self.frame = _begin(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        if self.frame is not None:
+            _end(self.frame)
+            self.frame = None
+        return False
+
+
+def traced(name=None):
+    """
+    Decorator recording every call as a section (default name: the
+    function's qualified name)
+    """
+    def wrap(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            frame = _begin(label)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _end(frame)
+        return wrapper
+    return wrap
+
+
+def write_trace(path, rows=None):
+    """
+    Section records as JSON (a list of objects) or CSV, chosen by suffix
+    """
+    rows = records() if rows is None else rows
+    path = str(path)
+    if path.endswith('.csv'):
+        import csv
+        fields = ['name', 'depth', 'start_ms', 'wall_ms', 'cpu_ms', 'peak_kb', 'thread']
+        with open(path, 'w', newline='') as fh:
+            writer = csv.DictWriter(fh, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        import json
+        with open(path, 'w') as fh:
+            json.dump(rows, fh, indent=2)
+    return path
+
+
+def write_chrome_trace(path, rows=None):
+    """
+    Section records in the Chrome trace-event format (complete 'X' events)
+    """
+    import json
+
+    rows = records() if rows is None else rows
+    events = [{
+        'name': row['name'], 'ph': 'X', 'pid': os.getpid(), 'tid': row['thread'],
+        'ts': row['start_ms'] * 1000, 'dur': row['wall_ms'] * 1000,
+        'args': {'cpu_ms': round(row['cpu_ms'], 3), 'peak_kb': row['peak_kb']},
+    } for row in rows]
+    with open(path, 'w') as fh:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, fh)
+    return path
+
+
+def summary(rows=None):
+    """
+    One line per section, totals over repeated calls
+    """
+    rows = records() if rows is None else rows
+    totals = {}
+    for row in rows:
+        total = totals.setdefault(row['name'], {'calls': 0, 'wall_ms': 0.0, 'cpu_ms': 0.0, 'peak_kb': None})
+        total['calls'] += 1
+        total['wall_ms'] += row['wall_ms']
+        total['cpu_ms'] += row['cpu_ms']
+        if row['peak_kb'] is not None:
+            total['peak_kb'] = max(total['peak_kb'] or 0.0, row['peak_kb'])
+    lines = []
+    for name, total in totals.items():
+        peak = f"{total['peak_kb']:10.1f} KB" if total['peak_kb'] is not None else ''
+        lines.append(f"{name:50s} {total['calls']:4d}x {total['wall_ms']:10.2f} ms wall "
+                     f"{total['cpu_ms']:10.2f} ms cpu {peak}")
+    return '\n'.join(lines)
+
+
+def _flush():
+    if _outputs['trace']:
+        write_trace(_outputs['trace'])
+    if _outputs['chrome']:
+        write_chrome_trace(_outputs['chrome'])
+
+
+if os.environ.get('ANALYSIS_TRACE') or os.environ.get('ANALYSIS_CHROME_TRACE'):
+    enable(os.environ.get('ANALYSIS_TRACE') or None,
+           os.environ.get('ANALYSIS_CHROME_TRACE') or None,
+           memory=os.environ.get('ANALYSIS_TRACE_MEMORY', '1') != '0',
+           max_records=int(os.environ.get('ANALYSIS_TRACE_MAX_RECORDS', MAX_RECORDS)))
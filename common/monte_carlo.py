@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo Projections
+Simulates many future paths of a 0-100 series at once, either from an AR(1)
+fitted to its log-intensity or from a drifting random walk, and summarises
+them as quantile fans for the v1 projections and the dashboard's outlook
+"""
+
+import numpy as np
+import pandas as pd
+
+N_PATHS = 100_000
+FAN_QUANTILES = [0.05, 0.25, 0.50, 0.75, 0.95]
+# Google Trends (and the dashboard's scores) live on a 0-100 scale
+BOUNDS = (0.0, 100.0)
+
+
+def fit_ar1(y):
+    """
+    Least-squares AR(1) with intercept, y[t] = c + phi * y[t-1] + e[t], over
+    the consecutive pairs where both weeks are present; returns (c, phi, residuals)
+    """
+    y = np.asarray(y, dtype=np.float64)
+    prev, curr = y[:-1], y[1:]
+    pairs = np.isfinite(prev) & np.isfinite(curr)
+    prev, curr = prev[pairs], curr[pairs]
+    if len(prev) < 2:
+        raise ValueError(f"need at least 3 consecutive weeks to fit, got {len(prev)} pairs")
+
+    prev_dev = prev - prev.mean()
+    sxx = prev_dev @ prev_dev
+    phi = (prev_dev @ (curr - curr.mean())) / sxx if sxx > 0 else 0.0
+    c = curr.mean() - phi * prev.mean()
+    return c, phi, curr - (c + phi * prev)
+
+
+def simulate_ar(history, horizon=26, n_paths=N_PATHS, fit_weeks=52, seed=0, bounds=BOUNDS):
+    """
+    n_paths x horizon future values of a weekly 0-100 series
+
+    Fits an AR(1) to log(1 + x) over the last fit_weeks and runs it forward
+    from the last observed week with residuals bootstrapped from the fit, so
+    the shocks keep the series' own skew and fat tails. Missing weeks stay in
+    place, so only truly consecutive weeks pair up in the fit, and missing
+    weeks at the end are simulated through before the horizon starts. All
+    paths advance together, one array operation per week, and stay inside
+    bounds. Raises ValueError when the window has too few consecutive weeks.
+    """
+    x = np.asarray(history, dtype=np.float64)[-fit_weeks:]
+    observed = np.flatnonzero(np.isfinite(x))
+    if not len(observed):
+        raise ValueError(f"no observed weeks in the last {fit_weeks} to simulate from")
+    lo, hi = np.log1p(bounds[0]), np.log1p(bounds[1])
+    c, phi, residuals = fit_ar1(np.log1p(x))
+
+    # Weeks after the last observed one are simulated but not returned
+    gap = len(x) - 1 - observed[-1]
+    rng = np.random.default_rng(seed)
+    shocks = residuals[rng.integers(0, len(residuals), (gap + horizon, n_paths))]
+    paths = np.empty((horizon, n_paths))
+    state = np.full(n_paths, np.log1p(x[observed[-1]]))
+    for t in range(gap + horizon):
+        state = np.clip(c + phi * state + shocks[t], lo, hi)
+        if t >= gap:
+            paths[t - gap] = state
+    return np.expm1(paths).T
+
+
+def simulate_walk(start, horizon=6, n_paths=N_PATHS, drift=0.0, scale=1.0, steps=None,
+                  seed=0, bounds=BOUNDS):
+    """
+    n_paths x horizon paths of a random walk from start
+
+    Each step adds drift plus noise: draws from `steps` (observed changes to
+    bootstrap) when given, otherwise normal with standard deviation scale.
+    Paths are held inside bounds.
+    """
+    rng = np.random.default_rng(seed)
+    if steps is not None:
+        steps = np.asarray(steps, dtype=np.float64)
+        steps = steps[np.isfinite(steps)]
+        noise = steps[rng.integers(0, len(steps), (n_paths, horizon))]
+    else:
+        noise = rng.normal(0.0, scale, (n_paths, horizon))
+    paths = start + np.cumsum(drift + noise, axis=1)
+    return np.clip(paths, *bounds)
+
+
+def fan_chart(paths, quantiles=FAN_QUANTILES, index=None):
+    """
+    horizon x quantiles DataFrame of the simulated paths, plus their mean
+    """
+    paths = np.asarray(paths)
+    fan = pd.DataFrame(np.quantile(paths, quantiles, axis=0).T, columns=list(quantiles),
+                       index=index if index is not None else pd.RangeIndex(1, paths.shape[1] + 1, name='step'))
+    fan['mean'] = paths.mean(axis=0)
+    return fan
+
+
+def weekly_index(last_week, horizon):
+    """
+    The horizon weeks after last_week, for labelling a Trends fan
+    """
+    return pd.date_range(pd.Timestamp(last_week) + pd.Timedelta(weeks=1), periods=horizon,
+                         freq='7D', name='Week')
+
+
+def band(fan, step, confidence=0.90):
+    """
+    (low, median, high) of one step of a fan
+    """
+    tail = round((1 - confidence) / 2, 6)
+    row = fan.iloc[step - 1]
+    return row[tail], row[0.5], row[round(1 - tail, 6)]
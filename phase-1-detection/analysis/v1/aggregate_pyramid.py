@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Multi-Resolution Aggregate Pyramid
+Month, quarter and year mean/max/std/count for every series, built once per
+dataset and extended one week at a time, so period queries are dictionary
+lookups instead of repeated resamples and date slices
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+LEVELS = ['month', 'quarter', 'year']
+FREQ = {'month': 'M', 'quarter': 'Q', 'year': 'Y'}
+STATS = ['mean', 'max', 'std', 'count']
+
+
+def period_codes(weeks, level):
+    """
+    Period ordinal of each week at the given level (pandas Period numbering)
+    """
+    return pd.DatetimeIndex(weeks).to_period(FREQ[level]).asi8
+
+
+def period_ends(codes, level):
+    """
+    Period-end timestamps for ordinals, matching the index resample('M'/'Q') gives
+    """
+    periods = pd.PeriodIndex.from_ordinals(np.asarray(codes, dtype=np.int64), freq=FREQ[level])
+    return periods.to_timestamp(how='end').normalize()
+
+
+class _Level:
+    """
+    Per-period running count, mean, sum of squared deviations and max
+    (periods x series), the Welford state std needs
+    """
+
+    def __init__(self, n_series):
+        self.codes = np.empty(0, dtype=np.int64)
+        self.rows = {}
+        self.count = np.empty((0, n_series))
+        self.mean = np.empty((0, n_series))
+        self.m2 = np.empty((0, n_series))
+        self.max = np.empty((0, n_series))
+
+    def set(self, codes, count, mean, m2, maximum):
+        self.codes = np.asarray(codes, dtype=np.int64)
+        self.rows = {int(code): row for row, code in enumerate(self.codes)}
+        self.count, self.mean, self.m2, self.max = count, mean, m2, maximum
+
+    def append(self, code):
+        n_series = self.count.shape[1]
+        self.codes = np.append(self.codes, code)
+        self.rows[int(code)] = len(self.codes) - 1
+        self.count = np.vstack([self.count, np.zeros(n_series)])
+        self.mean = np.vstack([self.mean, np.full(n_series, np.nan)])
+        self.m2 = np.vstack([self.m2, np.zeros(n_series)])
+        self.max = np.vstack([self.max, np.full(n_series, np.nan)])
+        return self.rows[int(code)]
+
+    def stat(self, stat, rows=slice(None)):
+        count = self.count[rows]
+        if stat == 'count':
+            return count
+        if stat == 'mean':
+            return self.mean[rows]
+        if stat == 'max':
+            return self.max[rows]
+        if stat == 'std':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(count > 1, np.sqrt(self.m2[rows] / (count - 1)), np.nan)
+        raise ValueError(f"unknown stat {stat!r}; expected one of {STATS}")
+
+
+class AggregatePyramid:
+    """
+    Calendar aggregates of N weekly series at month, quarter and year level
+
+    Statistics follow pandas: NaN weeks are skipped, std uses ddof=1, and a
+    period with no values has NaN mean/max/std and count 0. Weeks must arrive
+    in increasing order.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.columns = {name: i for i, name in enumerate(self.names)}
+        self.levels = {level: _Level(len(self.names)) for level in LEVELS}
+        self.last_week = None
+        self.index_name = None
+
+    @classmethod
+    def from_matrix(cls, values, weeks, names=None):
+        """
+        Build from an N series x weeks array in one vectorised pass
+        """
+        x = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        weeks = pd.DatetimeIndex(weeks)
+        if len(weeks) != x.shape[1]:
+            raise ValueError(f"{x.shape[1]} weeks of values but {len(weeks)} week labels")
+        if not weeks.is_monotonic_increasing:
+            raise ValueError("weeks must be in increasing order")
+        pyramid = cls(names if names is not None else range(x.shape[0]))
+        pyramid.index_name = weeks.name
+        if not len(weeks):
+            return pyramid
+
+        valid = np.isfinite(x)
+        x0 = np.where(valid, x, 0.0)
+        for level in LEVELS:
+            codes = period_codes(weeks, level)
+            starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+            group = np.cumsum(np.r_[True, codes[1:] != codes[:-1]]) - 1
+
+            count = np.add.reduceat(valid, starts, axis=1).astype(np.float64)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mean = np.add.reduceat(x0, starts, axis=1) / count
+            dev = np.where(valid, x - mean[:, group], 0.0)
+            m2 = np.add.reduceat(dev * dev, starts, axis=1)
+            maximum = np.fmax.reduceat(x, starts, axis=1)
+            pyramid.levels[level].set(codes[starts], count.T, mean.T, m2.T, maximum.T)
+
+        pyramid.last_week = weeks[-1]
+        return pyramid
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Build from a weeks x series DataFrame such as load_terms() returns
+        """
+        return cls.from_matrix(df.to_numpy(dtype=np.float64).T, df.index, df.columns)
+
+    @classmethod
+    def from_store(cls, store, region=None, terms=None):
+        """
+        Build from one region of a TrendsStore; MISSING weeks count as gaps
+        """
+        from trends_store import MISSING
+
+        terms = list(terms) if terms is not None else store.terms
+        raw = store.values[[store.term_offset(t) for t in terms], store.region_offset(region)]
+        values = np.where(raw == MISSING, np.nan, raw.astype(np.float64))
+        return cls.from_matrix(values, store.weeks, terms)
+
+    def update(self, week, values):
+        """
+        Fold one week (array in `names` order, or a Series/dict keyed by name)
+        into every level
+        """
+        if isinstance(values, dict):
+            values = pd.Series(values)
+        if isinstance(values, pd.Series):
+            values = values.reindex(self.names).to_numpy(dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape != (len(self.names),):
+            raise ValueError(f"expected {len(self.names)} values, got shape {values.shape}")
+
+        week = pd.Timestamp(week)
+        if self.last_week is not None and week <= self.last_week:
+            raise ValueError(f"week {week.date()} is not after {self.last_week.date()}")
+        self.last_week = week
+
+        valid = np.isfinite(values)
+        for level, state in self.levels.items():
+            code = pd.Period(week, FREQ[level]).ordinal
+            row = state.rows.get(code)
+            if row is None:
+                row = state.append(code)
+
+            count = state.count[row]
+            mean = state.mean[row]
+            count[valid] += 1
+            delta = values[valid] - np.nan_to_num(mean[valid])
+            mean[valid] = np.nan_to_num(mean[valid]) + delta / count[valid]
+            state.m2[row][valid] += delta * (values[valid] - mean[valid])
+            state.max[row] = np.fmax(state.max[row], values)
+
+    def _row(self, level, period):
+        code = pd.Period(period, FREQ[level]).ordinal
+        return self.levels[level].rows.get(code)
+
+    def get(self, level, period, name=None, stat='mean'):
+        """
+        One period's statistic: a scalar for `name`, else a Series over all names
+
+        `period` is anything pd.Period understands at that level: 2024,
+        '2024-03', '2024Q1', a Timestamp...
+        """
+        row = self._row(level, period)
+        if row is None:
+            values = np.zeros(len(self.names)) if stat == 'count' else np.full(len(self.names), np.nan)
+        else:
+            values = self.levels[level].stat(stat, row)
+        if name is not None:
+            return values[self.columns[name]]
+        return pd.Series(values, index=self.names)
+
+    def frame(self, level, stat='mean', start=None, end=None, names=None):
+        """
+        Periods x series DataFrame indexed by period end, like resample().<stat>()
+
+        start/end bound the periods (inclusive) and accept the same forms as get().
+        """
+        state = self.levels[level]
+        keep = np.ones(len(state.codes), dtype=bool)
+        if start is not None:
+            keep &= state.codes >= pd.Period(start, FREQ[level]).ordinal
+        if end is not None:
+            keep &= state.codes <= pd.Period(end, FREQ[level]).ordinal
+        rows = np.flatnonzero(keep)
+
+        values = state.stat(stat, rows)
+        names = list(names) if names is not None else self.names
+        cols = [self.columns[n] for n in names]
+        index = period_ends(state.codes[rows], level)
+        index.name = self.index_name
+        return pd.DataFrame(values[:, cols], index=index, columns=names)
+
+    def save(self, path):
+        """
+        Binary snapshot of every level's running state
+        """
+        path = Path(path)
+        arrays = {'names': np.array(self.names, dtype=str),
+                  'last_week': np.datetime64(self.last_week if self.last_week is not None else 'NaT', 'ns'),
+                  'index_name': np.array([] if self.index_name is None else [self.index_name], dtype=str)}
+        for level, state in self.levels.items():
+            for field in ['codes', 'count', 'mean', 'm2', 'max']:
+                arrays[f'{level}_{field}'] = getattr(state, field)
+        tmp = path.with_name(path.stem + '.tmp.npz')
+        np.savez(tmp, **arrays)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as npz:
+            pyramid = cls([str(n) for n in npz['names']])
+            for level, state in pyramid.levels.items():
+                state.set(*(npz[f'{level}_{field}'] for field in ['codes', 'count', 'mean', 'm2', 'max']))
+            last_week = npz['last_week'][()]
+            if 'index_name' in npz.files and len(npz['index_name']):
+                pyramid.index_name = str(npz['index_name'][0])
+        pyramid.last_week = None if np.isnat(last_week) else pd.Timestamp(last_week)
+        return pyramid
@@ -1,55 +1,60 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from datetime import datetime
-from scipy import stats
-from scipy.signal import find_peaks
+#!/usr/bin/env python3
+"""
+AI Bubble Analysis - First Principles Approach
+Google Trends analysis of "AI bubble" searches against AI development terms
+
+Each numbered section is a function taking the Trends frame (and the results
+of earlier sections) and returning its figures, so the analysis can be
+imported and reused headless. Plotting libraries and scipy are imported only
+when a section or figure needs them.
+"""
+
+import sys
 import warnings
-warnings.filterwarnings('ignore')
-
-# Load the data
-df = pd.read_csv('multiTimeline-googleTrends.csv', skiprows=1)
-df['Week'] = pd.to_datetime(df['Week'])
-df.set_index('Week', inplace=True)
-
-# Rename columns for easier access
-df.columns = ['ai_bubble', 'ai_startup', 'prompt_engineering', 'ai_roadmap', 'langchain']
-
-# Convert to numeric (Google Trends data is 0-100 scale)
-for col in df.columns:
-    df[col] = pd.to_numeric(df[col], errors='coerce')
-
-print("="*80)
-print("AI BUBBLE ANALYSIS - FIRST PRINCIPLES APPROACH")
-print("="*80)
-print(f"\nData Range: {df.index[0].date()} to {df.index[-1].date()}")
-print(f"Total weeks analyzed: {len(df)}")
-
-# 1. TREND TRAJECTORY ANALYSIS
-print("\n" + "="*80)
-print("1. TREND TRAJECTORY ANALYSIS")
-print("="*80)
-
-# Calculate key statistics for AI bubble searches
-ai_bubble_data = df['ai_bubble']
-recent_6_months = ai_bubble_data[-26:]
-recent_3_months = ai_bubble_data[-13:]
-last_year = ai_bubble_data[-52:]
-
-print(f"\nAI Bubble Search Trends:")
-print(f"  - All-time average: {ai_bubble_data.mean():.2f}")
-print(f"  - Last year average: {last_year.mean():.2f}")
-print(f"  - Last 6 months average: {recent_6_months.mean():.2f}")
-print(f"  - Last 3 months average: {recent_3_months.mean():.2f}")
-print(f"  - Current value (most recent): {ai_bubble_data.iloc[-1]}")
-print(f"  - Peak value: {ai_bubble_data.max()} (on {ai_bubble_data.idxmax().date()})")
-
-# Identify major inflection points
-peaks, _ = find_peaks(ai_bubble_data.values, prominence=5)
-if len(peaks) > 0:
-    print(f"\nMajor peaks detected at:")
-    for peak in peaks[-5:]:  # Show last 5 peaks
-        print(f"  - {df.index[peak].date()}: Value = {ai_bubble_data.iloc[peak]}")
+from pathlib import Path
+
+import numpy as np
+
+COMMON_DIR = str(Path(__file__).resolve().parents[3] / 'common')
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
+
+from aggregate_pyramid import AggregatePyramid
+from batch_scoring import classify_phases, trend_table
+from figures import FigureJob, render_figures
+from instrument import section, traced
+from monte_carlo import band, fan_chart, simulate_ar, weekly_index, N_PATHS
+from peak_stream import detect_peaks
+from score_bootstrap import bootstrap_frame, format_interval, BLOCK_WEEKS, N_BOOT, TREND_WINDOW
+from trends_store import load_terms
+from cross_correlation import lag_correlation_matrix, best_lags
+
+TERMS = ['ai_bubble', 'ai_startup', 'prompt_engineering', 'ai_roadmap', 'langchain']
+
+
+@traced('LOAD DATA')
+def load_data():
+    """
+    Load the five analysis terms
+
+    Google Trends data is 0-100 scale, parsed once into uint8 columns and served
+    from an on-disk cache on warm runs, or sliced out of the memory-mapped store
+    named by $TRENDS_STORE.
+    """
+    df = load_terms(TERMS)
+
+    # Widen for the arithmetic below (uint8 diffs wrap around and log() drops to float16);
+    # missing weeks (blank CSV cells, MISSING store cells) stay NaN in float64
+    if df.isna().to_numpy().any():
+        return df.astype(np.float64)
+    return df.astype(np.int64)
+
+
+def print_header(title):
+    print("\n" + "="*80)
+    print(title)
+    print("="*80)
+
 
 # Calculate growth rates
 def calculate_growth_rate(series, periods):
@@ -57,38 +62,6 @@ def calculate_growth_rate(series, periods):
         return np.nan
     return ((series.iloc[-1] / series.iloc[-periods]) - 1) * 100 if series.iloc[-periods] != 0 else np.inf
 
-print(f"\nGrowth Rates:")
-print(f"  - 1-month growth: {calculate_growth_rate(ai_bubble_data, 4):.1f}%")
-print(f"  - 3-month growth: {calculate_growth_rate(ai_bubble_data, 13):.1f}%")
-print(f"  - 6-month growth: {calculate_growth_rate(ai_bubble_data, 26):.1f}%")
-print(f"  - 1-year growth: {calculate_growth_rate(ai_bubble_data, 52):.1f}%")
-
-# 2. CORRELATION ANALYSIS
-print("\n" + "="*80)
-print("2. CORRELATION WITH AI DEVELOPMENT INDICATORS")
-print("="*80)
-
-# Calculate correlation matrix
-correlation_matrix = df.corr()
-print("\nCorrelation with AI Bubble searches:")
-for col in df.columns:
-    if col != 'ai_bubble':
-        corr = correlation_matrix.loc['ai_bubble', col]
-        print(f"  - {col}: {corr:.3f}")
-
-# Lag correlation analysis
-print("\nLag Correlation Analysis (AI bubble vs other indicators with lag):")
-for lag in [0, 4, 8, 12]:  # 0, 1, 2, 3 months lag
-    print(f"\n  Lag {lag} weeks:")
-    for col in ['ai_startup', 'prompt_engineering', 'langchain']:
-        if len(df) > lag:
-            corr = df['ai_bubble'].corr(df[col].shift(lag))
-            print(f"    - {col}: {corr:.3f}")
-
-# 3. BUBBLE LIFECYCLE PATTERN RECOGNITION
-print("\n" + "="*80)
-print("3. BUBBLE LIFECYCLE PATTERN RECOGNITION")
-print("="*80)
 
 # Define bubble phases based on search intensity
 def classify_bubble_phase(value, percentile_25, percentile_50, percentile_75, percentile_90):
@@ -103,211 +76,355 @@ def classify_bubble_phase(value, percentile_25, percentile_50, percentile_75, pe
     else:
         return "Peak Fear/Panic"
 
-percentiles = ai_bubble_data.quantile([0.25, 0.50, 0.75, 0.90])
-current_phase = classify_bubble_phase(
-    ai_bubble_data.iloc[-1],
-    percentiles[0.25],
-    percentiles[0.50],
-    percentiles[0.75],
-    percentiles[0.90]
-)
-
-print(f"\nBubble Lifecycle Analysis:")
-print(f"  - 25th percentile: {percentiles[0.25]:.1f}")
-print(f"  - 50th percentile (median): {percentiles[0.50]:.1f}")
-print(f"  - 75th percentile: {percentiles[0.75]:.1f}")
-print(f"  - 90th percentile: {percentiles[0.90]:.1f}")
-print(f"  - Current value: {ai_bubble_data.iloc[-1]}")
-print(f"  - Current Phase: {current_phase}")
-
-# Analyze phase transitions
-print("\nPhase Transition Timeline:")
-phases_by_year = {}
-for year in range(2021, 2026):
-    year_data = ai_bubble_data[str(year)]
-    if len(year_data) > 0:
-        avg_value = year_data.mean()
-        phase = classify_bubble_phase(avg_value, percentiles[0.25], percentiles[0.50], percentiles[0.75], percentiles[0.90])
+
+@traced('1. TREND TRAJECTORY ANALYSIS')
+def trend_trajectory(df):
+    """
+    1. TREND TRAJECTORY ANALYSIS
+    """
+    print_header("1. TREND TRAJECTORY ANALYSIS")
+
+    # Calculate key statistics for AI bubble searches
+    ai_bubble_data = df['ai_bubble']
+    recent_6_months = ai_bubble_data[-26:]
+    recent_3_months = ai_bubble_data[-13:]
+    last_year = ai_bubble_data[-52:]
+
+    print(f"\nAI Bubble Search Trends:")
+    print(f"  - All-time average: {ai_bubble_data.mean():.2f}")
+    print(f"  - Last year average: {last_year.mean():.2f}")
+    print(f"  - Last 6 months average: {recent_6_months.mean():.2f}")
+    print(f"  - Last 3 months average: {recent_3_months.mean():.2f}")
+    print(f"  - Current value (most recent): {ai_bubble_data.iloc[-1]}")
+    print(f"  - Peak value: {ai_bubble_data.max()} (on {ai_bubble_data.idxmax().date()})")
+
+    # Identify major inflection points
+    peaks = detect_peaks(ai_bubble_data.values, prominence=5)
+    if len(peaks) > 0:
+        print(f"\nMajor peaks detected at:")
+        for peak in peaks[-5:]:  # Show last 5 peaks
+            print(f"  - {df.index[peak].date()}: Value = {ai_bubble_data.iloc[peak]}")
+
+    growth_rates = {periods: calculate_growth_rate(ai_bubble_data, periods)
+                    for periods in [4, 13, 26, 52]}
+    print(f"\nGrowth Rates:")
+    print(f"  - 1-month growth: {growth_rates[4]:.1f}%")
+    print(f"  - 3-month growth: {growth_rates[13]:.1f}%")
+    print(f"  - 6-month growth: {growth_rates[26]:.1f}%")
+    print(f"  - 1-year growth: {growth_rates[52]:.1f}%")
+
+    return {'peaks': peaks, 'growth_rates': growth_rates}
+
+
+@traced('2. CORRELATION WITH AI DEVELOPMENT INDICATORS')
+def correlation_analysis(df):
+    """
+    2. CORRELATION WITH AI DEVELOPMENT INDICATORS
+    """
+    print_header("2. CORRELATION WITH AI DEVELOPMENT INDICATORS")
+
+    # Calculate correlation matrix
+    correlation_matrix = df.corr()
+    print("\nCorrelation with AI Bubble searches:")
+    for col in df.columns:
+        if col != 'ai_bubble':
+            corr = correlation_matrix.loc['ai_bubble', col]
+            print(f"  - {col}: {corr:.3f}")
+
+    # Lag correlation analysis: every lag within +/-52 weeks for every term in
+    # one pass (negative lags: the term trails AI bubble searches)
+    max_lag = min(52, len(df) - 1)
+    lag_corr = lag_correlation_matrix(df['ai_bubble'], df.drop(columns='ai_bubble'),
+                                      lags=range(-max_lag, max_lag + 1))
+
+    print("\nLag Correlation Analysis (AI bubble vs other indicators with lag):")
+    for lag in [0, 4, 8, 12]:  # 0, 1, 2, 3 months lag
+        print(f"\n  Lag {lag} weeks:")
+        for col in ['ai_startup', 'prompt_engineering', 'langchain']:
+            if len(df) > lag:
+                print(f"    - {col}: {lag_corr.loc[col, lag]:.3f}")
+
+    print(f"\nStrongest lead/lag within +/-{max_lag} weeks:")
+    for col, row in best_lags(lag_corr).iterrows():
+        print(f"  - {col}: {row['best_corr']:.3f} at {row['best_lag']} weeks ({row['relation']})")
+
+    return {'correlation_matrix': correlation_matrix, 'lag_correlation': lag_corr}
+
+
+@traced('3. BUBBLE LIFECYCLE PATTERN RECOGNITION')
+def lifecycle_phases(df, pyramid=None):
+    """
+    3. BUBBLE LIFECYCLE PATTERN RECOGNITION
+    """
+    if pyramid is None:
+        pyramid = AggregatePyramid.from_frame(df)
+
+    print_header("3. BUBBLE LIFECYCLE PATTERN RECOGNITION")
+
+    ai_bubble_data = df['ai_bubble']
+    percentiles = ai_bubble_data.quantile([0.25, 0.50, 0.75, 0.90])
+    current_phase = classify_bubble_phase(
+        ai_bubble_data.iloc[-1],
+        percentiles[0.25],
+        percentiles[0.50],
+        percentiles[0.75],
+        percentiles[0.90]
+    )
+
+    print(f"\nBubble Lifecycle Analysis:")
+    print(f"  - 25th percentile: {percentiles[0.25]:.1f}")
+    print(f"  - 50th percentile (median): {percentiles[0.50]:.1f}")
+    print(f"  - 75th percentile: {percentiles[0.75]:.1f}")
+    print(f"  - 90th percentile: {percentiles[0.90]:.1f}")
+    print(f"  - Current value: {ai_bubble_data.iloc[-1]}")
+    print(f"  - Current Phase: {current_phase}")
+
+    # Analyze phase transitions
+    print("\nPhase Transition Timeline:")
+    counts = pyramid.frame('year', 'count', start=2021, end=2025)['ai_bubble']
+    yearly = pyramid.frame('year', start=2021, end=2025)['ai_bubble'][counts > 0]
+    year_phases = classify_phases(yearly, percentiles.to_numpy())
+    phases_by_year = {}
+    for year, avg_value, phase in zip(yearly.index.year, yearly, year_phases):
         phases_by_year[year] = (avg_value, phase)
         print(f"  - {year}: {phase} (avg: {avg_value:.1f})")
 
-# 4. SENTIMENT VELOCITY ANALYSIS
-print("\n" + "="*80)
-print("4. SENTIMENT VELOCITY ANALYSIS")
-print("="*80)
-
-# Calculate rolling statistics
-window = 4  # 1 month
-ai_bubble_rolling_mean = ai_bubble_data.rolling(window=window).mean()
-ai_bubble_rolling_std = ai_bubble_data.rolling(window=window).std()
-
-# Calculate momentum (rate of change)
-momentum_1m = ai_bubble_data.diff(4)  # 1-month momentum
-momentum_3m = ai_bubble_data.diff(13)  # 3-month momentum
-
-print(f"\nMomentum Indicators:")
-print(f"  - Current 1-month momentum: {momentum_1m.iloc[-1]:.1f}")
-print(f"  - Current 3-month momentum: {momentum_3m.iloc[-1]:.1f}")
-print(f"  - Average 1-month momentum (last 6 months): {momentum_1m[-26:].mean():.2f}")
-
-# Volatility analysis
-recent_volatility = ai_bubble_rolling_std[-26:].mean()
-historical_volatility = ai_bubble_rolling_std.mean()
-print(f"\nVolatility Analysis:")
-print(f"  - Historical volatility (std): {historical_volatility:.2f}")
-print(f"  - Recent volatility (last 6 months): {recent_volatility:.2f}")
-print(f"  - Volatility ratio (recent/historical): {recent_volatility/historical_volatility:.2f}")
-
-# Acceleration analysis
-acceleration = momentum_1m.diff(4)  # Change in momentum
-print(f"\nAcceleration Analysis:")
-print(f"  - Current acceleration: {acceleration.iloc[-1]:.2f}")
-print(f"  - Is accelerating: {acceleration.iloc[-1] > 0}")
-
-# 5. TECHNICAL MATURITY VS HYPE DIVERGENCE
-print("\n" + "="*80)
-print("5. TECHNICAL MATURITY VS HYPE DIVERGENCE")
-print("="*80)
-
-# Create composite technical indicator
-technical_indicators = df[['prompt_engineering', 'langchain', 'ai_roadmap']].mean(axis=1)
-startup_activity = df['ai_startup']
-
-# Calculate divergence
-recent_period = -26  # Last 6 months
-bubble_growth = (ai_bubble_data.iloc[-1] / ai_bubble_data.iloc[recent_period] - 1) * 100
-technical_growth = (technical_indicators.iloc[-1] / technical_indicators.iloc[recent_period] - 1) * 100
-startup_growth = (startup_activity.iloc[-1] / startup_activity.iloc[recent_period] - 1) * 100
-
-print(f"\n6-Month Growth Comparison:")
-print(f"  - AI Bubble searches: {bubble_growth:.1f}%")
-print(f"  - Technical indicators (avg): {technical_growth:.1f}%")
-print(f"  - AI Startup searches: {startup_growth:.1f}%")
-print(f"  - Divergence (Bubble - Technical): {bubble_growth - technical_growth:.1f}%")
-
-# Analyze convergence/divergence over time
-print(f"\nDivergence Analysis:")
-if bubble_growth > technical_growth * 2:
-    print("  - Status: SIGNIFICANT DIVERGENCE - Bubble concerns growing much faster than technical adoption")
-elif bubble_growth > technical_growth * 1.5:
-    print("  - Status: MODERATE DIVERGENCE - Bubble concerns outpacing technical growth")
-elif bubble_growth > technical_growth:
-    print("  - Status: MILD DIVERGENCE - Bubble concerns slightly ahead of technical growth")
-else:
-    print("  - Status: CONVERGENT - Technical growth keeping pace or exceeding bubble concerns")
-
-# 6. PREDICTIVE MODELING
-print("\n" + "="*80)
-print("6. PREDICTIVE MODELING & TREND PROJECTION")
-print("="*80)
-
-# Simple linear regression for trend
-from scipy.stats import linregress
-x = np.arange(len(ai_bubble_data))
-slope, intercept, r_value, p_value, std_err = linregress(x[-52:], ai_bubble_data[-52:])
-
-print(f"\nLinear Trend Analysis (Last Year):")
-print(f"  - Slope: {slope:.3f} (points per week)")
-print(f"  - R-squared: {r_value**2:.3f}")
-print(f"  - P-value: {p_value:.6f}")
-print(f"  - Trend significance: {'Significant' if p_value < 0.05 else 'Not significant'}")
-
-# Exponential fit for recent data
-recent_x = np.arange(26)
-recent_y = ai_bubble_data[-26:].values
-if np.all(recent_y > 0):
-    z = np.polyfit(recent_x, np.log(recent_y + 1), 1)
-    exp_growth_rate = z[0]
-    print(f"\nExponential Growth Analysis (Last 6 Months):")
-    print(f"  - Exponential growth rate: {exp_growth_rate:.4f}")
-    print(f"  - Weekly growth %: {(np.exp(exp_growth_rate) - 1) * 100:.2f}%")
-
-# Projection
-weeks_ahead = 13  # 3 months
-linear_projection = ai_bubble_data.iloc[-1] + (slope * weeks_ahead)
-exp_projection = ai_bubble_data.iloc[-1] * (np.exp(exp_growth_rate) ** weeks_ahead) if 'exp_growth_rate' in locals() else linear_projection
-
-print(f"\n3-Month Projections:")
-print(f"  - Linear projection: {linear_projection:.1f}")
-print(f"  - Exponential projection: {exp_projection:.1f}")
-print(f"  - Current value: {ai_bubble_data.iloc[-1]}")
-
-# FINAL SYNTHESIS
-print("\n" + "="*80)
-print("FINAL SYNTHESIS & PROBABILITY ASSESSMENT")
-print("="*80)
-
-# Bubble indicators scoring
-bubble_score = 0
-bubble_indicators = []
-
-# 1. High current value
-if ai_bubble_data.iloc[-1] > percentiles[0.75]:
-    bubble_score += 20
-    bubble_indicators.append("✓ High search volume (above 75th percentile)")
-else:
-    bubble_indicators.append("✗ Moderate search volume")
-
-# 2. Rapid growth
-if bubble_growth > 100:
-    bubble_score += 25
-    bubble_indicators.append("✓ Rapid growth in bubble concerns (>100% in 6 months)")
-elif bubble_growth > 50:
-    bubble_score += 15
-    bubble_indicators.append("✓ Significant growth in bubble concerns (>50% in 6 months)")
-else:
-    bubble_indicators.append("✗ Moderate growth in bubble concerns")
-
-# 3. Divergence from fundamentals
-if bubble_growth > technical_growth * 1.5:
-    bubble_score += 20
-    bubble_indicators.append("✓ Bubble concerns outpacing technical development")
-else:
-    bubble_indicators.append("✗ Balanced growth with technical indicators")
-
-# 4. Acceleration
-if acceleration.iloc[-1] > 0 and momentum_1m.iloc[-1] > 0:
-    bubble_score += 15
-    bubble_indicators.append("✓ Accelerating concern trajectory")
-else:
-    bubble_indicators.append("✗ Stable or decelerating trajectory")
-
-# 5. Peak phase
-if current_phase in ["High Alert", "Peak Fear/Panic"]:
-    bubble_score += 20
-    bubble_indicators.append("✓ In high alert/peak fear phase")
-else:
-    bubble_indicators.append("✗ Not yet in peak fear phase")
-
-print("\nBubble Indicators Assessment:")
-for indicator in bubble_indicators:
-    print(f"  {indicator}")
-
-print(f"\n📊 BUBBLE PROBABILITY SCORE: {bubble_score}/100")
-
-# Future trend prediction
-trend_increase_probability = 0
-
-# Factors for increasing trend
-if slope > 0 and p_value < 0.05:
-    trend_increase_probability += 30
-if momentum_1m.iloc[-1] > 0:
-    trend_increase_probability += 20
-if acceleration.iloc[-1] > 0:
-    trend_increase_probability += 20
-if ai_bubble_data.iloc[-1] < 50:  # Room to grow
-    trend_increase_probability += 15
-if technical_indicators.iloc[-1] > technical_indicators.iloc[-26]:  # Technical growth continues
-    trend_increase_probability += 15
-
-print(f"\n📈 PROBABILITY OF TREND INCREASE: {trend_increase_probability}%")
-
-# Final verdict
-print("\n" + "="*80)
-print("FINAL VERDICT")
-print("="*80)
-
-print(f"""
+    return {'percentiles': percentiles, 'current_phase': current_phase,
+            'phases_by_year': phases_by_year}
+
+
+@traced('4. SENTIMENT VELOCITY ANALYSIS')
+def sentiment_velocity(df):
+    """
+    4. SENTIMENT VELOCITY ANALYSIS
+    """
+    print_header("4. SENTIMENT VELOCITY ANALYSIS")
+
+    ai_bubble_data = df['ai_bubble']
+
+    # Calculate rolling statistics
+    window = 4  # 1 month
+    ai_bubble_rolling_mean = ai_bubble_data.rolling(window=window).mean()
+    ai_bubble_rolling_std = ai_bubble_data.rolling(window=window).std()
+
+    # Calculate momentum (rate of change)
+    momentum_1m = ai_bubble_data.diff(4)  # 1-month momentum
+    momentum_3m = ai_bubble_data.diff(13)  # 3-month momentum
+
+    print(f"\nMomentum Indicators:")
+    print(f"  - Current 1-month momentum: {momentum_1m.iloc[-1]:.1f}")
+    print(f"  - Current 3-month momentum: {momentum_3m.iloc[-1]:.1f}")
+    print(f"  - Average 1-month momentum (last 6 months): {momentum_1m[-26:].mean():.2f}")
+
+    # Volatility analysis
+    recent_volatility = ai_bubble_rolling_std[-26:].mean()
+    historical_volatility = ai_bubble_rolling_std.mean()
+    print(f"\nVolatility Analysis:")
+    print(f"  - Historical volatility (std): {historical_volatility:.2f}")
+    print(f"  - Recent volatility (last 6 months): {recent_volatility:.2f}")
+    print(f"  - Volatility ratio (recent/historical): {recent_volatility/historical_volatility:.2f}")
+
+    # Acceleration analysis
+    acceleration = momentum_1m.diff(4)  # Change in momentum
+    print(f"\nAcceleration Analysis:")
+    print(f"  - Current acceleration: {acceleration.iloc[-1]:.2f}")
+    print(f"  - Is accelerating: {acceleration.iloc[-1] > 0}")
+
+    return {'rolling_mean': ai_bubble_rolling_mean, 'rolling_std': ai_bubble_rolling_std,
+            'momentum_1m': momentum_1m, 'momentum_3m': momentum_3m,
+            'acceleration': acceleration}
+
+
+@traced('5. TECHNICAL MATURITY VS HYPE DIVERGENCE')
+def hype_divergence(df):
+    """
+    5. TECHNICAL MATURITY VS HYPE DIVERGENCE
+    """
+    print_header("5. TECHNICAL MATURITY VS HYPE DIVERGENCE")
+
+    ai_bubble_data = df['ai_bubble']
+
+    # Create composite technical indicator
+    technical_indicators = df[['prompt_engineering', 'langchain', 'ai_roadmap']].mean(axis=1)
+    startup_activity = df['ai_startup']
+
+    # Calculate divergence
+    recent_period = -26  # Last 6 months
+    bubble_growth = (ai_bubble_data.iloc[-1] / ai_bubble_data.iloc[recent_period] - 1) * 100
+    technical_growth = (technical_indicators.iloc[-1] / technical_indicators.iloc[recent_period] - 1) * 100
+    startup_growth = (startup_activity.iloc[-1] / startup_activity.iloc[recent_period] - 1) * 100
+
+    print(f"\n6-Month Growth Comparison:")
+    print(f"  - AI Bubble searches: {bubble_growth:.1f}%")
+    print(f"  - Technical indicators (avg): {technical_growth:.1f}%")
+    print(f"  - AI Startup searches: {startup_growth:.1f}%")
+    print(f"  - Divergence (Bubble - Technical): {bubble_growth - technical_growth:.1f}%")
+
+    # Analyze convergence/divergence over time
+    print(f"\nDivergence Analysis:")
+    if bubble_growth > technical_growth * 2:
+        print("  - Status: SIGNIFICANT DIVERGENCE - Bubble concerns growing much faster than technical adoption")
+    elif bubble_growth > technical_growth * 1.5:
+        print("  - Status: MODERATE DIVERGENCE - Bubble concerns outpacing technical growth")
+    elif bubble_growth > technical_growth:
+        print("  - Status: MILD DIVERGENCE - Bubble concerns slightly ahead of technical growth")
+    else:
+        print("  - Status: CONVERGENT - Technical growth keeping pace or exceeding bubble concerns")
+
+    return {'technical_indicators': technical_indicators, 'bubble_growth': bubble_growth,
+            'technical_growth': technical_growth, 'startup_growth': startup_growth}
+
+
+@traced('6. PREDICTIVE MODELING & TREND PROJECTION')
+def predictive_modeling(df):
+    """
+    6. PREDICTIVE MODELING & TREND PROJECTION
+    """
+    print_header("6. PREDICTIVE MODELING & TREND PROJECTION")
+
+    ai_bubble_data = df['ai_bubble']
+
+    # Linear trend over the last year, exponential fit over the last 6 months
+    # and 3-month projections, from the same batch fit used across all terms
+    weeks_ahead = 13  # 3 months
+    trend = trend_table(df[['ai_bubble']], trend_weeks=52, exp_weeks=26,
+                        weeks_ahead=weeks_ahead).loc['ai_bubble']
+    slope, p_value = trend['slope'], trend['p_value']
+
+    print(f"\nLinear Trend Analysis (Last Year):")
+    print(f"  - Slope: {slope:.3f} (points per week)")
+    print(f"  - R-squared: {trend['r_squared']:.3f}")
+    print(f"  - P-value: {p_value:.6f}")
+    print(f"  - Trend significance: {'Significant' if p_value < 0.05 else 'Not significant'}")
+
+    # Exponential fit for recent data (only when every recent week is non-zero)
+    exp_growth_rate = None if np.isnan(trend['exp_growth_rate']) else trend['exp_growth_rate']
+    if exp_growth_rate is not None:
+        print(f"\nExponential Growth Analysis (Last 6 Months):")
+        print(f"  - Exponential growth rate: {exp_growth_rate:.4f}")
+        print(f"  - Weekly growth %: {trend['weekly_growth_pct']:.2f}%")
+
+    # Projection
+    linear_projection = trend['linear_projection']
+    exp_projection = trend['exp_projection']
+
+    print(f"\n3-Month Projections:")
+    print(f"  - Linear projection: {linear_projection:.1f}")
+    print(f"  - Exponential projection: {exp_projection:.1f}")
+    print(f"  - Current value: {ai_bubble_data.iloc[-1]}")
+
+    # Simulated paths: AR(1) on log-intensity with bootstrapped residuals
+    paths = simulate_ar(ai_bubble_data, horizon=weeks_ahead, n_paths=N_PATHS)
+    projection_fan = fan_chart(paths, index=weekly_index(df.index[-1], weeks_ahead))
+    low, median, high = band(projection_fan, weeks_ahead)
+    print(f"  - Simulated ({N_PATHS:,} paths): median {median:.1f}, 90% range {low:.1f}-{high:.1f}")
+
+    return {'slope': slope, 'r_squared': trend['r_squared'], 'p_value': p_value,
+            'exp_growth_rate': exp_growth_rate, 'linear_projection': linear_projection,
+            'exp_projection': exp_projection, 'projection_fan': projection_fan}
+
+
+@traced('FINAL SYNTHESIS & PROBABILITY ASSESSMENT')
+def final_synthesis(df, results):
+    """
+    FINAL SYNTHESIS & PROBABILITY ASSESSMENT
+    """
+    print_header("FINAL SYNTHESIS & PROBABILITY ASSESSMENT")
+
+    ai_bubble_data = df['ai_bubble']
+    percentiles = results['percentiles']
+    bubble_growth = results['bubble_growth']
+    technical_growth = results['technical_growth']
+    acceleration = results['acceleration']
+    momentum_1m = results['momentum_1m']
+    current_phase = results['current_phase']
+    technical_indicators = results['technical_indicators']
+
+    # Bubble indicators scoring
+    bubble_score = 0
+    bubble_indicators = []
+
+    # 1. High current value
+    if ai_bubble_data.iloc[-1] > percentiles[0.75]:
+        bubble_score += 20
+        bubble_indicators.append("✓ High search volume (above 75th percentile)")
+    else:
+        bubble_indicators.append("✗ Moderate search volume")
+
+    # 2. Rapid growth
+    if bubble_growth > 100:
+        bubble_score += 25
+        bubble_indicators.append("✓ Rapid growth in bubble concerns (>100% in 6 months)")
+    elif bubble_growth > 50:
+        bubble_score += 15
+        bubble_indicators.append("✓ Significant growth in bubble concerns (>50% in 6 months)")
+    else:
+        bubble_indicators.append("✗ Moderate growth in bubble concerns")
+
+    # 3. Divergence from fundamentals
+    if bubble_growth > technical_growth * 1.5:
+        bubble_score += 20
+        bubble_indicators.append("✓ Bubble concerns outpacing technical development")
+    else:
+        bubble_indicators.append("✗ Balanced growth with technical indicators")
+
+    # 4. Acceleration
+    if acceleration.iloc[-1] > 0 and momentum_1m.iloc[-1] > 0:
+        bubble_score += 15
+        bubble_indicators.append("✓ Accelerating concern trajectory")
+    else:
+        bubble_indicators.append("✗ Stable or decelerating trajectory")
+
+    # 5. Peak phase
+    if current_phase in ["High Alert", "Peak Fear/Panic"]:
+        bubble_score += 20
+        bubble_indicators.append("✓ In high alert/peak fear phase")
+    else:
+        bubble_indicators.append("✗ Not yet in peak fear phase")
+
+    print("\nBubble Indicators Assessment:")
+    for indicator in bubble_indicators:
+        print(f"  {indicator}")
+
+    print(f"\n📊 BUBBLE PROBABILITY SCORE: {bubble_score}/100")
+
+    # Future trend prediction
+    trend_increase_probability = 0
+
+    # Factors for increasing trend
+    if results['slope'] > 0 and results['p_value'] < 0.05:
+        trend_increase_probability += 30
+    if momentum_1m.iloc[-1] > 0:
+        trend_increase_probability += 20
+    if acceleration.iloc[-1] > 0:
+        trend_increase_probability += 20
+    if ai_bubble_data.iloc[-1] < 50:  # Room to grow
+        trend_increase_probability += 15
+    if technical_indicators.iloc[-1] > technical_indicators.iloc[-26]:  # Technical growth continues
+        trend_increase_probability += 15
+
+    print(f"\n📈 PROBABILITY OF TREND INCREASE: {trend_increase_probability}%")
+
+    return {'bubble_score': bubble_score, 'bubble_indicators': bubble_indicators,
+            'trend_increase_probability': trend_increase_probability}
+
+
+@traced('FINAL VERDICT')
+def final_verdict(df, results):
+    """
+    FINAL VERDICT
+    """
+    print_header("FINAL VERDICT")
+
+    ai_bubble_data = df['ai_bubble']
+    bubble_score = results['bubble_score']
+    trend_increase_probability = results['trend_increase_probability']
+    bubble_growth = results['bubble_growth']
+    technical_growth = results['technical_growth']
+    current_phase = results['current_phase']
+    slope = results['slope']
+
+    print(f"""
 Based on first-principles analysis of Google Trends data from 2020-2025:
 
 1. **ARE WE IN AN AI BUBBLE?**
@@ -333,56 +450,147 @@ Based on first-principles analysis of Google Trends data from 2020-2025:
 CONCLUSION: {"Strong evidence suggests we are IN an AI bubble awareness phase, with high probability of continued search growth." if bubble_score > 60 and trend_increase_probability > 50 else "Moderate evidence of bubble concerns, but not yet at critical levels."}
 """)
 
-# Create visualizations
-fig, axes = plt.subplots(3, 2, figsize=(15, 12))
-
-# Plot 1: AI Bubble Trend
-axes[0, 0].plot(df.index, df['ai_bubble'], color='red', linewidth=2)
-axes[0, 0].fill_between(df.index, 0, df['ai_bubble'], alpha=0.3, color='red')
-axes[0, 0].set_title('AI Bubble Search Trend (2020-2025)')
-axes[0, 0].set_ylabel('Search Interest')
-axes[0, 0].grid(True, alpha=0.3)
-
-# Plot 2: All Indicators
-for col in df.columns:
-    axes[0, 1].plot(df.index, df[col], label=col.replace('_', ' ').title(), alpha=0.7)
-axes[0, 1].set_title('All AI-Related Search Trends')
-axes[0, 1].set_ylabel('Search Interest')
-axes[0, 1].legend(loc='upper left')
-axes[0, 1].grid(True, alpha=0.3)
-
-# Plot 3: Recent Focus (2024-2025)
-recent_data = df['2024':]
-axes[1, 0].plot(recent_data.index, recent_data['ai_bubble'], color='red', linewidth=2, marker='o')
-axes[1, 0].set_title('AI Bubble Searches - Recent Acceleration (2024-2025)')
-axes[1, 0].set_ylabel('Search Interest')
-axes[1, 0].grid(True, alpha=0.3)
-
-# Plot 4: Momentum Analysis
-axes[1, 1].bar(momentum_1m[-52:].index, momentum_1m[-52:].values,
-               color=['green' if x > 0 else 'red' for x in momentum_1m[-52:].values])
-axes[1, 1].set_title('Weekly Momentum (1-Month Change)')
-axes[1, 1].set_ylabel('Momentum')
-axes[1, 1].axhline(y=0, color='black', linestyle='-', linewidth=0.5)
-axes[1, 1].grid(True, alpha=0.3)
-
-# Plot 5: Correlation Heatmap
-import seaborn as sns
-sns.heatmap(correlation_matrix, annot=True, fmt='.2f', cmap='coolwarm',
-            center=0, ax=axes[2, 0], cbar_kws={'label': 'Correlation'})
-axes[2, 0].set_title('Correlation Matrix')
-
-# Plot 6: Bubble vs Technical Divergence
-axes[2, 1].plot(df.index, df['ai_bubble'], label='AI Bubble', color='red', linewidth=2)
-axes[2, 1].plot(df.index, technical_indicators, label='Technical Indicators (Avg)',
-                color='blue', linewidth=2)
-axes[2, 1].set_title('Bubble Concerns vs Technical Development')
-axes[2, 1].set_ylabel('Search Interest')
-axes[2, 1].legend()
-axes[2, 1].grid(True, alpha=0.3)
-
-plt.tight_layout()
-plt.savefig('ai_bubble_analysis.png', dpi=150, bbox_inches='tight')
-print("\n📊 Visualization saved as 'ai_bubble_analysis.png'")
-
-plt.show()
\ No newline at end of file
+
+def plot_analysis(df, results):
+    """
+    3x2 grid of the trend, indicators, momentum, correlations and divergence
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    momentum_1m = results['momentum_1m']
+    technical_indicators = results['technical_indicators']
+
+    # Create visualizations
+    fig, axes = plt.subplots(3, 2, figsize=(15, 12))
+
+    # Plot 1: AI Bubble Trend
+    axes[0, 0].plot(df.index, df['ai_bubble'], color='red', linewidth=2)
+    axes[0, 0].fill_between(df.index, 0, df['ai_bubble'], alpha=0.3, color='red')
+    axes[0, 0].set_title('AI Bubble Search Trend (2020-2025)')
+    axes[0, 0].set_ylabel('Search Interest')
+    axes[0, 0].grid(True, alpha=0.3)
+
+    # Plot 2: All Indicators
+    for col in df.columns:
+        axes[0, 1].plot(df.index, df[col], label=col.replace('_', ' ').title(), alpha=0.7)
+    axes[0, 1].set_title('All AI-Related Search Trends')
+    axes[0, 1].set_ylabel('Search Interest')
+    axes[0, 1].legend(loc='upper left')
+    axes[0, 1].grid(True, alpha=0.3)
+
+    # Plot 3: Recent Focus (2024-2025)
+    recent_data = df['2024':]
+    axes[1, 0].plot(recent_data.index, recent_data['ai_bubble'], color='red', linewidth=2, marker='o')
+    axes[1, 0].set_title('AI Bubble Searches - Recent Acceleration (2024-2025)')
+    axes[1, 0].set_ylabel('Search Interest')
+    axes[1, 0].grid(True, alpha=0.3)
+
+    # Plot 4: Momentum Analysis
+    axes[1, 1].bar(momentum_1m[-52:].index, momentum_1m[-52:].values,
+                   color=['green' if x > 0 else 'red' for x in momentum_1m[-52:].values])
+    axes[1, 1].set_title('Weekly Momentum (1-Month Change)')
+    axes[1, 1].set_ylabel('Momentum')
+    axes[1, 1].axhline(y=0, color='black', linestyle='-', linewidth=0.5)
+    axes[1, 1].grid(True, alpha=0.3)
+
+    # Plot 5: Correlation Heatmap
+    sns.heatmap(results['correlation_matrix'], annot=True, fmt='.2f', cmap='coolwarm',
+                center=0, ax=axes[2, 0], cbar_kws={'label': 'Correlation'})
+    axes[2, 0].set_title('Correlation Matrix')
+
+    # Plot 6: Bubble vs Technical Divergence
+    axes[2, 1].plot(df.index, df['ai_bubble'], label='AI Bubble', color='red', linewidth=2)
+    axes[2, 1].plot(df.index, technical_indicators, label='Technical Indicators (Avg)',
+                    color='blue', linewidth=2)
+    axes[2, 1].set_title('Bubble Concerns vs Technical Development')
+    axes[2, 1].set_ylabel('Search Interest')
+    axes[2, 1].legend()
+    axes[2, 1].grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    return fig
+
+
+def figure_job(df, results, output='ai_bubble_analysis.png'):
+    """
+    plot_analysis as a FigureJob for the cached, parallel render stage
+    """
+    return FigureJob('ai_bubble_analysis', plot_analysis, (df, results), output=output)
+
+
+@traced('BOOTSTRAP CONFIDENCE INTERVALS')
+def bootstrap_intervals(df, n_boot=N_BOOT, workers=None):
+    """
+    Block-bootstrap intervals around the headline probabilities
+    """
+    print_header("BOOTSTRAP CONFIDENCE INTERVALS")
+
+    row = bootstrap_frame(df, n_boot=n_boot, workers=workers)
+    print(f"\nRe-scored {n_boot} resamples ({BLOCK_WEEKS}-week blocks of residuals around the "
+          f"{TREND_WINDOW}-week trend):")
+    print(f"  📊 BUBBLE PROBABILITY SCORE: {format_interval(row, 'bubble_score')}")
+    print(f"  📈 PROBABILITY OF TREND INCREASE: {format_interval(row, 'trend_increase_probability')}")
+    return row
+
+
+def run_analysis(df=None):
+    """
+    Run every section in order and return the frame with their combined results
+    """
+    if df is None:
+        df = load_data()
+
+    print("="*80)
+    print("AI BUBBLE ANALYSIS - FIRST PRINCIPLES APPROACH")
+    print("="*80)
+    print(f"\nData Range: {df.index[0].date()} to {df.index[-1].date()}")
+    print(f"Total weeks analyzed: {len(df)}")
+
+    # Calendar aggregates, built once and shared by the sections that need them
+    pyramid = AggregatePyramid.from_frame(df)
+
+    results = {'pyramid': pyramid}
+    results.update(trend_trajectory(df))
+    results.update(correlation_analysis(df))
+    results.update(lifecycle_phases(df, pyramid))
+    results.update(sentiment_velocity(df))
+    results.update(hype_divergence(df))
+    results.update(predictive_modeling(df))
+    results.update(final_synthesis(df, results))
+    final_verdict(df, results)
+    return df, results
+
+
+def main(argv=None):
+    """
+    Run the analysis from the command line
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description='AI bubble Google Trends analysis')
+    parser.add_argument('--no-plot', action='store_true',
+                        help='headless run: skip the figure and never import matplotlib')
+    parser.add_argument('--output', default='ai_bubble_analysis.png',
+                        help='figure path (default: %(default)s)')
+    parser.add_argument('--bootstrap', type=int, default=0, metavar='N',
+                        help='also report confidence intervals from N block-bootstrap resamples')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='bootstrap processes (default: one per CPU)')
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore')
+    df, results = run_analysis()
+    if args.bootstrap:
+        bootstrap_intervals(df, args.bootstrap, args.workers)
+
+    if not args.no_plot:
+        with section('FIGURES'):
+            render_figures([figure_job(df, results, args.output)])
+        print(f"\n📊 Visualization saved as '{args.output}'")
+
+    return results
+
+
+if __name__ == "__main__":
+    results = main()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Batch Bubble Scoring
+Evaluates the scoring rules of ai_bubble_analysis.py (bubble score ladder,
+trend-increase probability, lifecycle phase) and ai_bubble_refined_analysis.py
+(five-indicator checklist, increase factors) as array operations over an
+N series x weeks matrix, so every term and region is scored in one call
+"""
+
+import numpy as np
+import pandas as pd
+
+PHASES = ["Skepticism/Ignorance", "Early Awareness", "Growing Concern",
+          "High Alert", "Peak Fear/Panic"]
+# Monthly-average ladder from section 2 of the refined script
+MONTHLY_PHASES = ["Pre-awareness", "Early Concern", "Growing Anxiety", "High Alert", "Peak Fear"]
+MONTHLY_THRESHOLDS = [2, 5, 10, 20]
+TECHNICAL_TERMS = ['prompt_engineering', 'langchain', 'ai_roadmap']
+
+
+def _as_matrix(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values[None, :] if values.ndim == 1 else values
+
+
+def linear_fit(y):
+    """
+    Row-wise least-squares line against week number 0..weeks-1, skipping NaN
+    weeks, with the quantities scipy.stats.linregress reports
+
+    Every row shares the design; the sums are matrix products over the valid
+    mask, so a whole universe is fitted without a per-series loop. Constant
+    rows get slope 0, r 0 and p 1; rows with fewer than three valid weeks get
+    NaN p-value and standard error.
+    """
+    from scipy import special
+
+    y = _as_matrix(y)
+    valid = np.isfinite(y)
+    w = valid.astype(np.float64)
+    x = np.arange(y.shape[1], dtype=np.float64)
+
+    n = w.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = (w @ x) / n
+        y_mean = np.where(valid, y, 0.0).sum(axis=1) / n
+    x_dev = (x[None, :] - x_mean[:, None]) * w
+    y_dev = np.where(valid, y - y_mean[:, None], 0.0)
+
+    sxx = (x_dev ** 2).sum(axis=1)
+    sxy = (x_dev * y_dev).sum(axis=1)
+    syy = (y_dev ** 2).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = sxy / sxx
+        r = np.where(syy == 0, 0.0, sxy / np.sqrt(sxx * syy))
+    r = np.where(n >= 2, np.clip(r, -1.0, 1.0), np.nan)
+    intercept = y_mean - slope * x_mean
+
+    dof = n - 2
+    tiny = 1.0e-20
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = r * np.sqrt(dof / ((1.0 - r + tiny) * (1.0 + r + tiny)))
+        stderr = np.sqrt((1 - r ** 2) * syy / sxx / dof)
+    p_value = np.where(dof > 0, 2 * special.stdtr(np.maximum(dof, 1), -np.abs(t)), np.nan)
+    stderr = np.where(dof > 0, stderr, np.nan)
+    return {'slope': slope, 'intercept': intercept, 'r_value': r, 'p_value': p_value,
+            'stderr': stderr, 'n': n}
+
+
+def linear_trend(y):
+    """
+    Row-wise least-squares slope and two-sided p-value against week number,
+    the same quantities scipy.stats.linregress reports
+    """
+    fit = linear_fit(y)
+    return fit['slope'], fit['p_value']
+
+
+def exp_growth_rate(y):
+    """
+    Row-wise weekly growth rate of log(y + 1), the slope ai_bubble_analysis.py
+    takes from np.polyfit; NaN for rows with any zero or missing week, which
+    the script does not fit
+    """
+    y = _as_matrix(y)
+    fits = np.all(y > 0, axis=1)
+    with np.errstate(invalid='ignore'):
+        rate = linear_fit(np.log(np.where(fits[:, None], y, 1.0) + 1))['slope']
+    return np.where(fits, rate, np.nan)
+
+
+def trend_table(values, names=None, trend_weeks=52, exp_weeks=26, weeks_ahead=13):
+    """
+    Section 6 of ai_bubble_analysis.py for every series: the linear trend of
+    the last trend_weeks, the exponential rate of the last exp_weeks and both
+    weeks_ahead projections, one row per series
+
+    values is an N series x weeks array or a weeks x series DataFrame. The
+    exponential projection falls back to the linear one where no rate was fitted.
+    """
+    if isinstance(values, pd.DataFrame):
+        names = list(values.columns) if names is None else names
+        values = values.to_numpy(dtype=np.float64).T
+    x = _as_matrix(values)
+
+    fit = linear_fit(x[:, -trend_weeks:])
+    rate = exp_growth_rate(x[:, -exp_weeks:])
+    current = x[:, -1]
+    linear_projection = current + fit['slope'] * weeks_ahead
+    exp_projection = np.where(np.isnan(rate), linear_projection,
+                              current * np.exp(rate) ** weeks_ahead)
+
+    return pd.DataFrame({
+        'slope': fit['slope'],
+        'intercept': fit['intercept'],
+        'r_squared': fit['r_value'] ** 2,
+        'p_value': fit['p_value'],
+        'stderr': fit['stderr'],
+        'exp_growth_rate': rate,
+        'weekly_growth_pct': (np.exp(rate) - 1) * 100,
+        'current': current,
+        'linear_projection': linear_projection,
+        'exp_projection': exp_projection,
+    }, index=pd.Index(names if names is not None else range(len(x)), name='series'))
+
+
+def row_quantiles(x, qs):
+    """
+    Per-row linear-interpolation quantiles ignoring NaN (pandas' default),
+    via one sort instead of np.nanquantile's per-row loop
+    """
+    ordered = np.sort(x, axis=1)                       # NaN sorts last
+    valid = np.isfinite(x).sum(axis=1)
+    positions = (valid[:, None] - 1) * np.asarray(qs)[None, :]
+    lo = np.floor(positions).astype(np.int64)
+    hi = np.minimum(lo + 1, np.maximum(valid[:, None] - 1, 0))
+    lo = np.maximum(lo, 0)
+    rows = np.arange(x.shape[0])[:, None]
+    frac = positions - np.floor(positions)
+    result = ordered[rows, lo] + (ordered[rows, hi] - ordered[rows, lo]) * frac
+    result[valid == 0] = np.nan
+    return result
+
+
+def phase_codes(values, thresholds):
+    """
+    Index of each value on an ascending threshold ladder (0 below the first
+    threshold, len(thresholds) at or above the last), for values of any shape
+
+    thresholds is either one ladder shared by every value or, for matrices,
+    one ladder per row (N x k against N x ...). Matches the scripts' if/elif
+    ladders exactly, including NaN comparing as not-below (the top rung).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    t = np.asarray(thresholds, dtype=np.float64)
+    if t.ndim == 2:
+        # Per-row ladders: line the rungs up on a trailing axis after the row's values
+        t = t.reshape(t.shape[:1] + (1,) * (values.ndim - 1) + t.shape[1:])
+    return (~(values[..., None] < t)).sum(axis=-1)
+
+
+def classify_phases(values, percentiles):
+    """
+    Vectorised classify_bubble_phase: values (N,) or (N x periods) against
+    per-series percentiles (N x 4 for the 25th/50th/75th/90th), or against
+    one shared set of four
+    """
+    return np.asarray(PHASES)[phase_codes(values, percentiles)]
+
+
+def classify_monthly_phases(values):
+    """
+    Vectorised form of the refined script's monthly if/elif phase ladder,
+    for a single series or a months x series matrix
+    """
+    return np.asarray(MONTHLY_PHASES)[phase_codes(values, MONTHLY_THRESHOLDS)]
+
+
+def period_growth(values, axis=-1):
+    """
+    Percent change between consecutive periods along axis (quarter over
+    quarter for quarterly means); NaN where the earlier period is not positive,
+    the periods the refined script skips
+    """
+    x = np.asarray(values, dtype=np.float64)
+    prev = np.take(x, np.arange(x.shape[axis] - 1), axis=axis)
+    curr = np.take(x, np.arange(1, x.shape[axis]), axis=axis)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(prev > 0, ((curr / prev) - 1) * 100, np.nan)
+
+
+def v1_scores(bubble, technical):
+    """
+    Bubble score, trend-increase probability and phase per series, following
+    the FINAL SYNTHESIS section of ai_bubble_analysis.py
+
+    bubble is N x weeks; technical is the matching N x weeks (or one weeks-long
+    row shared by all series) average of the technical terms.
+    """
+    x = _as_matrix(bubble)
+    tech = np.broadcast_to(_as_matrix(technical), x.shape)
+    current = x[:, -1]
+
+    percentiles = row_quantiles(x, [0.25, 0.50, 0.75, 0.90])
+    phase = classify_phases(current, percentiles)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bubble_growth = (x[:, -1] / x[:, -26] - 1) * 100
+        technical_growth = (tech[:, -1] / tech[:, -26] - 1) * 100
+    momentum_1m = x[:, -1] - x[:, -5]
+    acceleration = momentum_1m - (x[:, -5] - x[:, -9])
+
+    score = (
+        np.where(current > percentiles[:, 2], 20, 0)
+        + np.select([bubble_growth > 100, bubble_growth > 50], [25, 15], default=0)
+        + np.where(bubble_growth > technical_growth * 1.5, 20, 0)
+        + np.where((acceleration > 0) & (momentum_1m > 0), 15, 0)
+        + np.where(np.isin(phase, ["High Alert", "Peak Fear/Panic"]), 20, 0)
+    )
+
+    slope, p_value = linear_trend(x[:, -52:])
+    increase = (
+        np.where((slope > 0) & (p_value < 0.05), 30, 0)
+        + np.where(momentum_1m > 0, 20, 0)
+        + np.where(acceleration > 0, 20, 0)
+        + np.where(current < 50, 15, 0)
+        + np.where(tech[:, -1] > tech[:, -26], 15, 0)
+    )
+
+    return {
+        'bubble_score': score,
+        'trend_increase_probability': increase,
+        'phase': phase,
+        'bubble_growth': bubble_growth,
+        'technical_growth': technical_growth,
+    }
+
+
+def refined_scores(bubble, technical, startup, weeks, since='2023-01-01'):
+    """
+    Bubble probability and search-increase probability per series, following
+    sections 8-10 of ai_bubble_refined_analysis.py
+
+    The year-over-year test compares the calendar year of the last week with
+    the year before it (2025 vs 2024 on the bundled export).
+    """
+    x = _as_matrix(bubble)
+    tech = np.broadcast_to(_as_matrix(technical), x.shape)
+    start = np.broadcast_to(_as_matrix(startup), x.shape)
+    weeks = pd.DatetimeIndex(weeks)
+
+    relevant = x[:, weeks >= pd.Timestamp(since)]
+    current = x[:, -1]
+    peak = np.nanmax(relevant, axis=1)
+    year = weeks[-1].year
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg_this_year = np.nanmean(x[:, weeks.year == year], axis=1)
+        avg_last_year = np.nanmean(x[:, weeks.year == year - 1], axis=1)
+        yoy_ratio = avg_this_year / avg_last_year
+        if relevant.shape[1] > 52:
+            rising_volatility = (np.nanstd(relevant[:, -13:], axis=1, ddof=1)
+                                 > np.nanstd(relevant[:, -52:], axis=1, ddof=1))
+        else:
+            rising_volatility = np.zeros(len(x), dtype=bool)
+
+        indicators = {
+            'Exponential Growth': (avg_last_year > 0) & (yoy_ratio > 2),
+            'Near Peak Values': current > peak * 0.8,
+            'Sustained High Level': np.nanmean(relevant[:, -4:], axis=1) > 20,
+            'Divergence from Fundamentals': current > tech[:, -1] * 2,
+            'Increasing Volatility': rising_volatility,
+        }
+        weekly_change = np.nanmean(np.diff(x[:, -8:], axis=1), axis=1)
+
+    factors = {
+        'Positive momentum': weekly_change > 0,
+        'Below historical peak': current < peak,
+        'Technical growth continues': tech[:, -1] > tech[:, -13],
+        'Recent acceleration': current > x[:, -4],
+        'Startup activity rising': start[:, -1] > start[:, -13],
+    }
+
+    return {
+        'bubble_probability': 20 * np.sum(list(indicators.values()), axis=0),
+        'increase_probability': 20 * np.sum(list(factors.values()), axis=0),
+        'weekly_change': weekly_change,
+        'indicators': indicators,
+        'factors': factors,
+    }
+
+
+def score_matrix(bubble, technical, startup, weeks, names=None, since='2023-01-01'):
+    """
+    Both scripts' headline numbers for every series as one table
+    """
+    v1 = v1_scores(bubble, technical)
+    refined = refined_scores(bubble, technical, startup, weeks, since)
+    n = len(v1['phase'])
+
+    table = pd.DataFrame({
+        'bubble_score': v1['bubble_score'],
+        'trend_increase_probability': v1['trend_increase_probability'],
+        'phase': v1['phase'],
+        'refined_bubble_probability': refined['bubble_probability'],
+        'refined_increase_probability': refined['increase_probability'],
+    }, index=pd.Index(names if names is not None else range(n), name='series'))
+    for name, present in refined['indicators'].items():
+        table[name] = present
+    return table
+
+
+def score_store(store, terms=None, regions=None, technical_terms=TECHNICAL_TERMS,
+                startup_term='ai_startup', since='2023-01-01', chunk_size=256):
+    """
+    Score every (term, region) pair of a TrendsStore in one call
+
+    Each term is scored as the 'bubble' series of its region, against that
+    region's technical index and startup series. Weeks the store marks
+    MISSING count as NaN. Terms are read chunk_size at a time so only a slice
+    of the mapped store is ever widened to float.
+    """
+    from trends_store import MISSING
+
+    terms = list(terms) if terms is not None else store.terms
+    regions = list(regions) if regions is not None else store.regions
+    region_idx = [store.region_offset(r) for r in regions]
+
+    def block(term_list):
+        raw = store.values[[store.term_offset(t) for t in term_list]][:, region_idx]
+        return np.where(raw == MISSING, np.nan, raw.astype(np.float64))
+
+    with np.errstate(invalid='ignore'):
+        technical = np.nanmean(block(technical_terms), axis=0)          # regions x weeks
+    startup = block([startup_term])[0]
+
+    tables = []
+    for start in range(0, len(terms), chunk_size):
+        chunk = terms[start:start + chunk_size]
+        bubble = block(chunk).reshape(len(chunk) * len(regions), -1)   # term-major
+        table = score_matrix(bubble, np.tile(technical, (len(chunk), 1)),
+                             np.tile(startup, (len(chunk), 1)), store.weeks, since=since)
+        table.index = pd.MultiIndex.from_product([chunk, regions], names=['term', 'region'])
+        tables.append(table)
+    return pd.concat(tables)
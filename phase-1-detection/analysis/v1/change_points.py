@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Change-Point Detection
+Finds regime shifts in weekly search series with PELT (Killick, Fearnhead &
+Eckley 2012), so phase boundaries come from the data rather than fixed dates
+"""
+
+import numpy as np
+import pandas as pd
+
+MIN_SEGMENT = 4          # a month: shorter "regimes" are single-week news spikes
+
+
+def noise_variance(x):
+    """
+    Robust week-to-week noise variance: MAD of first differences, which level
+    shifts barely move
+    """
+    diffs = np.diff(x)
+    if not len(diffs):
+        return 0.0
+    mad = np.median(np.abs(diffs - np.median(diffs)))
+    return (mad / 0.6745) ** 2 / 2
+
+
+def default_penalty(x):
+    """
+    BIC-style penalty, 2 sigma^2 log(n), on the robust noise variance (at
+    least 1 so flat integer series are never split on rounding)
+    """
+    return 2 * max(noise_variance(x), 1.0) * np.log(max(len(x), 2))
+
+
+def pelt(x, penalty=None, min_size=MIN_SEGMENT):
+    """
+    Change points of a piecewise-constant mean, minimising the within-segment
+    sum of squares plus penalty per change
+
+    Returns the start index of every segment after the first. Segment costs
+    come from prefix sums in O(1), and candidates that can no longer begin an
+    optimal last segment are pruned, so the run time is close to linear in
+    len(x) when the series really has regimes. NaN weeks are filled from the
+    previous week; a series with no values at all has no change points.
+    """
+    x = pd.Series(np.asarray(x, dtype=np.float64)).ffill().bfill().to_numpy()
+    n = len(x)
+    if n < 2 * min_size or not np.isfinite(x).all():
+        return []
+    penalty = default_penalty(x) if penalty is None else penalty
+
+    s1 = np.concatenate([[0.0], np.cumsum(x)])
+    s2 = np.concatenate([[0.0], np.cumsum(x * x)])
+
+    def cost(starts, end):
+        length = end - starts
+        total = s1[end] - s1[starts]
+        return (s2[end] - s2[starts]) - total * total / length
+
+    best = np.full(n + 1, np.inf)
+    best[0] = -penalty
+    last_change = np.zeros(n + 1, dtype=np.int64)
+    candidates = np.array([0], dtype=np.int64)
+
+    for end in range(min_size, n + 1):
+        # Only candidates at least min_size back can start the final segment
+        usable = candidates[candidates <= end - min_size]
+        if len(usable):
+            totals = best[usable] + cost(usable, end) + penalty
+            pick = np.argmin(totals)
+            best[end] = totals[pick]
+            last_change[end] = usable[pick]
+            # PELT pruning: a start that is already worse than best[end] never recovers
+            keep = best[usable] + cost(usable, end) <= best[end]
+            candidates = np.concatenate([usable[keep], candidates[candidates > end - min_size]])
+        if end + min_size <= n:
+            candidates = np.append(candidates, end)
+
+    changes = []
+    end = n
+    while end > 0:
+        end = last_change[end]
+        if end > 0:
+            changes.append(int(end))
+    return changes[::-1]
+
+
+def pelt_matrix(values, penalty=None, min_size=MIN_SEGMENT, chunk_size=4096):
+    """
+    pelt() for every row of an N series x weeks array, one list of change
+    points per row
+
+    The dynamic programme advances all rows of a chunk together, one array
+    operation per week. Pruned candidates are masked per row, and the
+    columns scanned start at the oldest candidate any row still keeps, so a
+    universe costs about one PELT pass per chunk rather than per series.
+    """
+    x = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    x = pd.DataFrame(x.T).ffill().bfill().to_numpy().T
+    n = x.shape[1]
+    if n < 2 * min_size:
+        return [[] for _ in range(len(x))]
+    # Rows with no values at all stay NaN after filling; they get no change points
+    empty = ~np.isfinite(x).all(axis=1)
+    if empty.any():
+        x = np.where(empty[:, None], 0.0, x)
+    if penalty is None:
+        penalty = np.array([default_penalty(row) for row in x])
+    penalty = np.broadcast_to(np.asarray(penalty, dtype=np.float64), (len(x),))
+
+    changes = []
+    for first in range(0, len(x), chunk_size):
+        block, pen = x[first:first + chunk_size], penalty[first:first + chunk_size]
+        rows = np.arange(len(block))
+        zero = np.zeros((len(block), 1))
+        s1 = np.concatenate([zero, np.cumsum(block, axis=1)], axis=1)
+        s2 = np.concatenate([zero, np.cumsum(block * block, axis=1)], axis=1)
+
+        best = np.full((len(block), n + 1), np.inf)
+        best[:, 0] = -pen
+        last_change = np.zeros((len(block), n + 1), dtype=np.int64)
+        active = np.zeros((len(block), n + 1), dtype=bool)
+        active[:, 0] = True
+        lo = 0
+
+        for end in range(min_size, n + 1):
+            starts = np.arange(lo, end - min_size + 1)
+            length = end - starts
+            total = s1[:, end, None] - s1[:, starts]
+            fit = best[:, starts] + (s2[:, end, None] - s2[:, starts]) - total * total / length
+            fit[~active[:, starts]] = np.inf
+            pick = np.argmin(fit, axis=1)
+            best[:, end] = fit[rows, pick] + pen
+            last_change[:, end] = starts[pick]
+            active[:, starts] &= fit <= best[:, end, None]
+            if end + min_size <= n:
+                active[:, end] = True
+            # Skip the columns every row has pruned
+            alive = active[:, lo:end - min_size + 2].any(axis=0)
+            lo += int(np.argmax(alive)) if alive.any() else 0
+
+        for row in last_change:
+            found = []
+            end = n
+            while end > 0:
+                end = row[end]
+                if end > 0:
+                    found.append(int(end))
+            changes.append(found[::-1])
+    return [[] if blank else found for blank, found in zip(empty, changes)]
+
+
+def _regimes(index, values, changes):
+    starts = np.array([0] + list(changes), dtype=np.int64)
+    ends = np.append(starts[1:], len(values))
+    valid = np.isfinite(values)
+    with np.errstate(invalid='ignore'):
+        means = (np.add.reduceat(np.where(valid, values, 0.0), starts)
+                 / np.add.reduceat(valid, starts))
+    return {'start': index[starts], 'end': index[ends - 1], 'weeks': ends - starts, 'mean': means}
+
+
+def segments(series, penalty=None, min_size=MIN_SEGMENT):
+    """
+    Detected regimes of one weekly Series: start/end week, length, mean and
+    the change in mean from the previous regime
+    """
+    values = series.to_numpy(dtype=np.float64)
+    table = pd.DataFrame(_regimes(series.index, values, pelt(values, penalty, min_size)))
+    table['change'] = table['mean'].diff()
+    return table
+
+
+def segments_frame(df, penalty=None, min_size=MIN_SEGMENT):
+    """
+    segments() for every column of a weeks x series frame, stacked with a
+    'series' column, from one pelt_matrix() pass
+    """
+    values = df.to_numpy(dtype=np.float64).T
+    columns = {'series': [], 'start': [], 'end': [], 'weeks': [], 'mean': []}
+    for name, row, changes in zip(df.columns, values, pelt_matrix(values, penalty, min_size)):
+        regimes = _regimes(df.index, row, changes)
+        columns['series'].append(np.full(len(regimes['mean']), name, dtype=object))
+        for key, value in regimes.items():
+            columns[key].append(np.asarray(value))
+    table = pd.DataFrame({key: np.concatenate(parts) for key, parts in columns.items()})
+    table['change'] = table.groupby('series', sort=False)['mean'].diff()
+    return table
+
+
+def surge_start(table, baseline):
+    """
+    Start of the trailing run of regimes whose mean exceeds baseline (e.g. the
+    series' average), or None when the current regime is not above it
+    """
+    above = (table['mean'] > baseline).to_numpy()
+    if not above[-1]:
+        return None
+    run = len(above) - np.argmin(above[::-1]) if not above.all() else 0
+    return table['start'].iloc[run]
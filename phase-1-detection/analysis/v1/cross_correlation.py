@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Lagged Cross-Correlation Engine
+Correlates one target series against many terms at every lag in one pass,
+using FFT cross-correlations of the running sums Pearson's r needs
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _as_term_matrix(others, names=None):
+    """
+    Normalise a DataFrame (weeks x terms) or array (terms x weeks) to a
+    float64 terms x weeks matrix plus its term names
+    """
+    if isinstance(others, pd.DataFrame):
+        return others.to_numpy(dtype=np.float64).T, list(others.columns)
+    if isinstance(others, pd.Series):
+        return others.to_numpy(dtype=np.float64)[None, :], [others.name]
+
+    matrix = np.asarray(others, dtype=np.float64)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    if names is None:
+        names = list(range(matrix.shape[0]))
+    return matrix, list(names)
+
+
+def _xcorr(a_hat, b_hat, nfft, n):
+    """
+    Sum over s of a[s + k] * b[s] for k = 0..n-1, from precomputed rffts
+    """
+    return np.fft.irfft(a_hat * np.conj(b_hat), nfft)[..., :n]
+
+
+def lag_correlation_matrix(target, others, lags=range(0, 53), names=None,
+                           chunk_size=2048):
+    """
+    Pearson correlation of target with every term shifted by every lag
+
+    Entry [term, lag] equals target.corr(term.shift(lag)) in pandas: a
+    positive lag pairs target[t] with term[t - lag] (the term leads), a
+    negative lag pairs it with term[t + |lag|] (the term trails). NaNs are
+    dropped pairwise exactly as pandas does, by cross-correlating the
+    validity masks alongside the values.
+
+    Terms are processed in chunks of chunk_size rows so memory stays bounded
+    when scanning thousands of series.
+    """
+    x = np.asarray(target, dtype=np.float64)
+    matrix, names = _as_term_matrix(others, names)
+    n = x.shape[0]
+    if matrix.shape[1] != n:
+        raise ValueError(f"target has {n} weeks but terms have {matrix.shape[1]}")
+
+    lags = np.asarray(list(lags), dtype=np.int64)
+    if lags.size and np.abs(lags).max() >= n:
+        raise ValueError(f"lags must be shorter than the series ({n} weeks)")
+
+    nfft = 1 << int(np.ceil(np.log2(2 * n)))
+    x_mask = np.isfinite(x)
+    x0 = np.where(x_mask, x, 0.0)
+    x_hat = [np.fft.rfft(v, nfft) for v in (x_mask.astype(np.float64), x0, x0 * x0)]
+    # Prefix sums of the target for the NaN-free fast path
+    cx = np.concatenate([[0.0], np.cumsum(x0)])
+    cxx = np.concatenate([[0.0], np.cumsum(x0 * x0)])
+
+    pos = lags >= 0
+    k = np.abs(lags)
+    result = np.empty((matrix.shape[0], lags.size))
+
+    for start in range(0, matrix.shape[0], chunk_size):
+        y = matrix[start:start + chunk_size]
+        y_mask = np.isfinite(y)
+
+        if x_mask.all() and y_mask.all():
+            # No gaps: only the cross term needs an FFT, the window sums
+            # come straight from prefix sums
+            y_hat = np.fft.rfft(y, nfft, axis=1)
+            sxy = _xcorr(x_hat[1], y_hat, nfft, n)[:, k]
+            if (~pos).any():
+                sxy = np.where(pos, sxy, _xcorr(y_hat, x_hat[1], nfft, n)[:, k])
+            cy = np.concatenate([np.zeros((y.shape[0], 1)), np.cumsum(y, axis=1)], axis=1)
+            cyy = np.concatenate([np.zeros((y.shape[0], 1)), np.cumsum(y * y, axis=1)], axis=1)
+            # Lag k >= 0 uses target[k:] and term[:n-k]; lag -k the reverse
+            x_lo, x_hi = np.where(pos, k, 0), np.where(pos, n, n - k)
+            y_lo, y_hi = np.where(pos, 0, k), np.where(pos, n - k, n)
+            sums = {
+                'n': np.broadcast_to((n - k).astype(np.float64), sxy.shape),
+                'sx': cx[x_hi] - cx[x_lo], 'sxx': cxx[x_hi] - cxx[x_lo],
+                'sy': cy[:, y_hi] - cy[:, y_lo], 'syy': cyy[:, y_hi] - cyy[:, y_lo],
+                'sxy': sxy,
+            }
+        else:
+            y0 = np.where(y_mask, y, 0.0)
+            y_hat = [np.fft.rfft(v, nfft, axis=1)
+                     for v in (y_mask.astype(np.float64), y0, y0 * y0)]
+            mx, sx, sxx = x_hat
+            my, sy, syy = y_hat
+
+            # Each sum restricted to pairs where both sides are present.
+            # Positive lags: target ahead of term. Negative: roles swapped.
+            fwd = {
+                'n': _xcorr(mx, my, nfft, n), 'sx': _xcorr(sx, my, nfft, n),
+                'sy': _xcorr(mx, sy, nfft, n), 'sxx': _xcorr(sxx, my, nfft, n),
+                'syy': _xcorr(mx, syy, nfft, n), 'sxy': _xcorr(sx, sy, nfft, n),
+            }
+            if (~pos).any():
+                bwd = {
+                    'n': _xcorr(my, mx, nfft, n), 'sx': _xcorr(my, sx, nfft, n),
+                    'sy': _xcorr(sy, mx, nfft, n), 'sxx': _xcorr(my, sxx, nfft, n),
+                    'syy': _xcorr(syy, mx, nfft, n), 'sxy': _xcorr(sy, sx, nfft, n),
+                }
+                sums = {key: np.where(pos, fwd[key][:, k], bwd[key][:, k]) for key in fwd}
+            else:
+                sums = {key: value[:, k] for key, value in fwd.items()}
+
+        count = np.round(sums['n'])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = sums['sxy'] - sums['sx'] * sums['sy'] / count
+            var_x = sums['sxx'] - sums['sx'] ** 2 / count
+            var_y = sums['syy'] - sums['sy'] ** 2 / count
+            # FFT round-off leaves ~1e-12 residue on constant windows; treat as zero
+            var_x[var_x <= 1e-9 * np.maximum(sums['sxx'], 1.0)] = np.nan
+            var_y[var_y <= 1e-9 * np.maximum(sums['syy'], 1.0)] = np.nan
+            r = cov / np.sqrt(var_x * var_y)
+        r[count < 2] = np.nan
+        result[start:start + chunk_size] = np.clip(r, -1.0, 1.0)
+
+    return pd.DataFrame(result, index=pd.Index(names, name='term'),
+                        columns=pd.Index(lags, name='lag'))
+
+
+def best_lags(corr_matrix):
+    """
+    Strongest correlation (by absolute value) per term and the lag it occurs at
+
+    A positive best_lag means the term leads the target by that many weeks,
+    a negative one means it trails.
+    """
+    values = corr_matrix.to_numpy()
+    filled = np.where(np.isnan(values), -np.inf, np.abs(values))
+    best = filled.argmax(axis=1)
+    rows = np.arange(values.shape[0])
+    best_corr = values[rows, best]
+    best_lag = corr_matrix.columns.to_numpy()[best]
+    all_nan = np.isnan(values).all(axis=1)
+
+    table = pd.DataFrame({
+        'best_lag': np.where(all_nan, 0, best_lag),
+        'best_corr': np.where(all_nan, np.nan, best_corr),
+    }, index=corr_matrix.index)
+    table['relation'] = np.select(
+        [all_nan, table['best_lag'] > 0, table['best_lag'] < 0],
+        ['undefined', 'leads', 'trails'], default='coincident'
+    )
+    return table
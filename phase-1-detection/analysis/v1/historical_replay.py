@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Historical Replay of the Refined Analysis
+Reconstructs what ai_bubble_refined_analysis.py would have reported at every
+week since 2023 in a single pass, from prefix sums and running maxima rather
+than re-running the script on each truncated history
+"""
+
+import numpy as np
+import pandas as pd
+
+from batch_scoring import classify_monthly_phases, TECHNICAL_TERMS
+
+# The refined script indexes 13 weeks back into the post-2023 window, so it
+# can only produce a report once that window holds at least this many weeks
+MIN_WEEKS = 13
+
+
+def _prefix(values):
+    """
+    Cumulative sums and counts of the finite entries, with a leading zero column
+    so window [lo, hi] sums to c[:, hi + 1] - c[:, lo]
+    """
+    valid = np.isfinite(values)
+    zero = np.zeros((values.shape[0], 1))
+    sums = np.concatenate([zero, np.cumsum(np.where(valid, values, 0.0), axis=1)], axis=1)
+    counts = np.concatenate([zero, np.cumsum(valid, axis=1)], axis=1)
+    return sums, counts
+
+
+def _window(prefix, lo, hi):
+    return prefix[:, hi + 1] - prefix[:, lo]
+
+
+def _group_start(keys):
+    """
+    For each position, the index where its run of equal keys begins
+    """
+    keys = np.asarray(keys)
+    change = np.r_[True, keys[1:] != keys[:-1]]
+    return np.maximum.accumulate(np.where(change, np.arange(len(keys)), 0))
+
+
+def replay_matrix(bubble, technical, startup, weeks, since='2023-01-01'):
+    """
+    Expanding-window replay for N series at once (all arrays N x weeks)
+
+    Returns a dict of N x weeks arrays; column t holds the figures the refined
+    script would print if its data ended at week t. Columns before the script
+    could run (fewer than MIN_WEEKS weeks since `since`) are NaN / empty.
+    """
+    x = np.atleast_2d(np.asarray(bubble, dtype=np.float64))
+    tech = np.broadcast_to(np.atleast_2d(np.asarray(technical, dtype=np.float64)), x.shape)
+    start = np.broadcast_to(np.atleast_2d(np.asarray(startup, dtype=np.float64)), x.shape)
+    weeks = pd.DatetimeIndex(weeks)
+    n_series, n_weeks = x.shape
+
+    s0 = int(np.searchsorted(weeks, pd.Timestamp(since)))
+    t = np.arange(n_weeks)
+    seen = t - s0 + 1                                  # weeks in df_relevant at cutoff t
+    ready = seen >= MIN_WEEKS
+    t = np.where(ready, t, n_weeks - 1)                # keep indices valid; masked below
+
+    s, c = _prefix(x)
+    s2, _ = _prefix(x * x)
+
+    def trailing(prefix, window):
+        return _window(prefix, np.maximum(s0, t - window + 1), t)
+
+    def trailing_std(window):
+        total, count = trailing(s, window), trailing(c, window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var = (trailing(s2, window) - total ** 2 / count) / (count - 1)
+        return np.sqrt(np.maximum(var, 0.0))
+
+    current = x[:, t]
+    relevant = x[:, s0:]
+    peak = np.full(x.shape, np.nan)
+    if relevant.shape[1]:
+        peak[:, s0:] = np.fmax.accumulate(relevant, axis=1)
+    peak = peak[:, t]
+
+    # Year-to-date average of the cutoff's year vs the full previous year
+    years = weeks.year.to_numpy()
+    year_start = _group_start(years)
+    prev_year = (year_start > 0) & (years[np.maximum(year_start - 1, 0)] == years - 1)
+    prev_start = np.where(prev_year, year_start[np.maximum(year_start - 1, 0)], 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg_this_year = _window(s, year_start[t], t) / _window(c, year_start[t], t)
+        avg_last_year = np.where(
+            prev_year[t],
+            _window(s, prev_start[t], np.maximum(year_start[t] - 1, 0))
+            / _window(c, prev_start[t], np.maximum(year_start[t] - 1, 0)),
+            np.nan
+        )
+
+        # Month-to-date average feeds the monthly phase ladder
+        month_start = np.maximum(_group_start(weeks.year * 12 + weeks.month), s0)[t]
+        month_avg = _window(s, month_start, t) / _window(c, month_start, t)
+
+        rising_volatility = (seen[t] > 52) & (trailing_std(13) > trailing_std(52))
+        indicators = {
+            'Exponential Growth': (avg_last_year > 0) & (avg_this_year / avg_last_year > 2),
+            'Near Peak Values': current > peak * 0.8,
+            'Sustained High Level': trailing(s, 4) / trailing(c, 4) > 20,
+            'Divergence from Fundamentals': current > tech[:, t] * 2,
+            'Increasing Volatility': rising_volatility,
+        }
+
+        # Mean of week-on-week changes over the last 8 weeks, NaN pairs skipped
+        diffs = np.diff(x, axis=1, prepend=np.nan)
+        d, dc = _prefix(diffs)
+        lo = np.maximum(s0, t - 7) + 1
+        weekly_change = _window(d, lo, t) / _window(dc, lo, t)
+
+    factors = {
+        'Positive momentum': weekly_change > 0,
+        'Below historical peak': current < peak,
+        'Technical growth continues': tech[:, t] > tech[:, np.maximum(t - 12, 0)],
+        'Recent acceleration': current > x[:, np.maximum(t - 3, 0)],
+        'Startup activity rising': start[:, t] > start[:, np.maximum(t - 12, 0)],
+    }
+
+    bubble_probability = 20.0 * np.sum(list(indicators.values()), axis=0)
+    increase_probability = 20.0 * np.sum(list(factors.values()), axis=0)
+    phase = classify_monthly_phases(month_avg)
+
+    mask = ~ready[None, :].repeat(n_series, axis=0)
+    for values in (bubble_probability, increase_probability, weekly_change,
+                   current, peak, month_avg):
+        values[mask] = np.nan
+    phase = np.where(mask, '', phase)
+
+    return {
+        'bubble_probability': bubble_probability,
+        'increase_probability': increase_probability,
+        'phase': phase,
+        'month_avg': month_avg,
+        'weekly_change': weekly_change,
+        'current_value': current,
+        'peak_value': peak,
+        'indicators': indicators,
+        'factors': factors,
+    }
+
+
+def replay_refined(df, since='2023-01-01', bubble='ai_bubble', startup='ai_startup',
+                   technical_terms=TECHNICAL_TERMS):
+    """
+    Week-by-week replay for the standard Trends frame used by the v1 scripts
+
+    One row per week from the first week the refined script could report on,
+    with its bubble_probability, increase_probability, monthly phase, verdict
+    and confidence, plus the inputs behind them.
+    """
+    technical = df[technical_terms].mean(axis=1)
+    result = replay_matrix(df[bubble].to_numpy(), technical.to_numpy(),
+                           df[startup].to_numpy(), df.index, since)
+
+    table = pd.DataFrame({
+        'bubble_probability': result['bubble_probability'][0],
+        'increase_probability': result['increase_probability'][0],
+        'phase': result['phase'][0],
+        'month_avg': result['month_avg'][0],
+        'weekly_change': result['weekly_change'][0],
+        'current_value': result['current_value'][0],
+        'peak_value': result['peak_value'][0],
+    }, index=df.index)
+    for name, present in result['indicators'].items():
+        table[name] = present[0]
+
+    table = table[table['phase'] != '']
+    prob, inc = table['bubble_probability'], table['increase_probability']
+    table['verdict'] = np.select([prob >= 80, prob >= 60], ['DEFINITELY', 'LIKELY'], default='POSSIBLY')
+    table['confidence'] = np.select(
+        [(prob >= 70) & (inc >= 70), (prob >= 50) | (inc >= 50)],
+        ['HIGH', 'MODERATE'], default='LOW'
+    )
+    return table
+
+
+def save_replay(table, path):
+    """
+    Write a replay table as Parquet (.parquet, needs pyarrow) or CSV
+    """
+    path = str(path)
+    if path.endswith('.parquet'):
+        table.to_parquet(path)
+    else:
+        table.to_csv(path)
+
+
+def main():
+    """
+    Replay the bundled Trends export and write the weekly table
+    """
+    import argparse
+    from trends_store import load_terms
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('output', nargs='?', default='refined_replay.csv',
+                        help='.parquet or .csv destination (default: %(default)s)')
+    args = parser.parse_args()
+
+    df = load_terms(['ai_bubble', 'ai_startup', 'prompt_engineering', 'ai_roadmap', 'langchain'])
+    table = replay_refined(df.astype(np.float64))
+    save_replay(table, args.output)
+    print(f"Replayed {len(table)} weeks ({table.index[0].date()} to {table.index[-1].date()})")
+    print(f"Replay saved to: {args.output}")
+    return table
+
+
+if __name__ == "__main__":
+    table = main()
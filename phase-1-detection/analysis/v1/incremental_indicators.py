@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Incremental Indicator State
+Carries the velocity indicators from the v1 analyses (rolling mean/std,
+momentum, acceleration, moving averages) forward one week at a time for many
+series at once, instead of recomputing them over the full history
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Batch definitions these mirror, per series x:
+#   rolling_mean = x.rolling(4).mean()      ai_bubble_ma4  = x.rolling(4).mean()
+#   rolling_std  = x.rolling(4).std()       ai_bubble_ma13 = x.rolling(13).mean()
+#   momentum_1m  = x.diff(4)                momentum_3m    = x.diff(13)
+#   acceleration = x.diff(4).diff(4)        = x[t] - 2 x[t-4] + x[t-8]
+ROLLING_WINDOW = 4
+SHORT_MA = 4
+LONG_MA = 13
+MOMENTUM_1M = 4
+MOMENTUM_3M = 13
+
+# x[t-13] is the oldest value any indicator reads, so 14 weeks of history suffice
+HISTORY = max(LONG_MA, MOMENTUM_3M + 1, 2 * MOMENTUM_1M + 1)
+
+INDICATORS = ['value', 'rolling_mean', 'rolling_std', 'momentum_1m',
+              'momentum_3m', 'acceleration', 'ma4', 'ma13']
+
+
+class IndicatorState:
+    """
+    Ring buffer of the last HISTORY weeks for N series
+
+    Each update() costs O(N) regardless of how much history came before it,
+    and produces the same numbers the batch pandas code would for that week
+    (NaN until a window has filled, NaN whenever a window holds a NaN).
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.buffer = np.full((len(self.names), HISTORY), np.nan)
+        self.head = 0          # slot the next week is written to
+        self.weeks_seen = 0
+        self.last_week = None
+
+    def _window(self, size, offset=0):
+        """
+        The `size` most recent weeks ending `offset` weeks ago, oldest first
+        """
+        end = self.head - offset
+        slots = np.arange(end - size, end) % HISTORY
+        return self.buffer[:, slots]
+
+    def _lagged(self, weeks_ago):
+        return self.buffer[:, (self.head - 1 - weeks_ago) % HISTORY]
+
+    def update(self, values, week=None):
+        """
+        Push one week of values (array in `names` order, or a Series/dict keyed
+        by name) and return that week's indicators as a DataFrame
+        """
+        if isinstance(values, dict):
+            values = pd.Series(values)
+        if isinstance(values, pd.Series):
+            values = values.reindex(self.names).to_numpy(dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape != (len(self.names),):
+            raise ValueError(f"expected {len(self.names)} values, got shape {values.shape}")
+
+        if week is not None:
+            week = pd.Timestamp(week)
+            if self.last_week is not None and week <= self.last_week:
+                raise ValueError(f"week {week.date()} is not after {self.last_week.date()}")
+            self.last_week = week
+
+        self.buffer[:, self.head] = values
+        self.head = (self.head + 1) % HISTORY
+        self.weeks_seen += 1
+        return self.current()
+
+    def current(self):
+        """
+        Indicators for the most recently pushed week
+        """
+        value = self._lagged(0)
+        rolling = self._window(ROLLING_WINDOW)
+        momentum_1m = value - self._lagged(MOMENTUM_1M)
+
+        with np.errstate(invalid='ignore'):
+            indicators = {
+                'value': value,
+                'rolling_mean': rolling.mean(axis=1),
+                'rolling_std': rolling.std(axis=1, ddof=1),
+                'momentum_1m': momentum_1m,
+                'momentum_3m': value - self._lagged(MOMENTUM_3M),
+                'acceleration': momentum_1m - (self._lagged(MOMENTUM_1M) - self._lagged(2 * MOMENTUM_1M)),
+                'ma4': self._window(SHORT_MA).mean(axis=1),
+                'ma13': self._window(LONG_MA).mean(axis=1),
+            }
+        return pd.DataFrame(indicators, index=pd.Index(self.names, name='series'))[INDICATORS]
+
+    @classmethod
+    def from_history(cls, df):
+        """
+        Warm-start from a weeks x series DataFrame; only the last HISTORY rows are read
+        """
+        state = cls(df.columns)
+        for week, row in df.iloc[-HISTORY:].iterrows():
+            state.update(row.to_numpy(dtype=np.float64), week=week)
+        state.weeks_seen = len(df)
+        return state
+
+    def to_dict(self):
+        """
+        Plain-Python snapshot, safe to JSON-encode
+        """
+        # Store oldest-first so the snapshot does not depend on the ring position
+        ordered = self._window(HISTORY)
+        return {
+            'names': self.names,
+            'history': [[None if np.isnan(v) else float(v) for v in row] for row in ordered],
+            'weeks_seen': self.weeks_seen,
+            'last_week': None if self.last_week is None else self.last_week.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(data['names'])
+        history = np.array([[np.nan if v is None else v for v in row] for row in data['history']],
+                           dtype=np.float64).reshape(len(state.names), HISTORY)
+        state.buffer[:] = history
+        state.head = 0
+        state.weeks_seen = data['weeks_seen']
+        state.last_week = None if data['last_week'] is None else pd.Timestamp(data['last_week'])
+        return state
+
+    def save(self, path):
+        """
+        Binary snapshot for large universes (JSON of 10k x 14 floats is slow)
+        """
+        path = Path(path)
+        tmp = path.with_name(path.stem + '.tmp.npz')
+        np.savez(tmp, names=np.array(self.names, dtype=str), history=self._window(HISTORY),
+                 weeks_seen=self.weeks_seen,
+                 last_week=np.datetime64(self.last_week if self.last_week is not None else 'NaT', 'ns'))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as npz:
+            state = cls([str(n) for n in npz['names']])
+            state.buffer[:] = npz['history']
+            state.weeks_seen = int(npz['weeks_seen'])
+            last_week = npz['last_week'][()]
+        state.head = 0
+        state.last_week = None if np.isnat(last_week) else pd.Timestamp(last_week)
+        return state
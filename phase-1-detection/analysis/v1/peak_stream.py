@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Streaming Peak Detection
+Confirms peaks in a weekly series one point at a time, with the same rules
+as scipy.signal.find_peaks(x, prominence=..., wlen=...), so live monitors
+flag surges without re-scanning the whole history each week
+"""
+
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+PROMINENCE = 5
+# Base window of the streaming detectors: bases within 26 weeks either side,
+# so state is O(52) per series and every peak is settled within 26 weeks
+WLEN = 52
+
+
+class StreamingPeakDetector:
+    """
+    Incremental find_peaks for one series
+
+    A peak is a local maximum (the middle of a flat top) whose prominence,
+    its height above the higher of the lowest points on each side before the
+    series climbs above it, reaches `prominence`. A peak is confirmed as soon
+    as the series falls `prominence` below it. It is dropped as soon as the
+    series climbs above it first, since its prominence can then no longer
+    grow.
+
+    Without wlen the left bases come from a stack of earlier higher levels.
+    The stack only holds a strictly decreasing run of values, so it has at
+    most 101 entries on the 0-100 Trends scale. With wlen, as in find_peaks,
+    bases are looked for only within wlen // 2 weeks of the peak. State is
+    then O(wlen), and a peak is settled at most wlen // 2 weeks after it.
+    Run over a whole series, the confirmed peaks are exactly find_peaks'
+    with the same wlen. wlen=None matches find_peaks' default, but a peak then stays pending
+    until the series falls prominence below it, however long that takes.
+    Weeks must not be NaN.
+
+    Confirmed peaks are only returned by update(), never kept.
+    """
+
+    def __init__(self, prominence=PROMINENCE, wlen=WLEN):
+        self.prominence = prominence
+        self.half = None if wlen is None else int(np.ceil(wlen)) // 2
+        self.t = 0                      # index of the next point
+        self._pending = []              # [index, value, left_min, right_min, week]
+        self._stack = []                # [value, min of the points since the previous entry]
+        self._recent = deque(maxlen=None if self.half is None else 2 * self.half + 2)
+        self._prev = None
+        self._rise = None               # (start, left_min) of a flat top that began with a rise
+
+    def _left_min(self, value):
+        """
+        Lowest point between the previous point higher than value and now,
+        for the point just pushed
+        """
+        if self.half is not None:
+            return None                 # found from _recent once the peak's middle is known
+        low = np.inf
+        while self._stack and self._stack[-1][0] <= value:
+            top, below = self._stack.pop()
+            low = min(low, top, below)
+        self._stack.append([value, low])
+        return min(low, value)
+
+    def _window_left_min(self, peak, value):
+        low = value
+        for index, x in reversed(self._recent):
+            if index > peak:
+                continue
+            if index < peak - self.half or x > value:
+                break
+            low = min(low, x)
+        return low
+
+    def update(self, value, week=None):
+        """
+        Push the next point; returns the peaks this point confirmed, each a
+        dict of index, week, value, prominence (so far) and latency in weeks
+        """
+        value = float(value)
+        t = self.t
+        self.t += 1
+        left_min = self._left_min(value)
+        if self.half is not None:
+            self._recent.append((t, value))
+
+        confirmed = []
+        keep = []
+        for peak in self._pending:
+            index, height, base, right_min, label = peak
+            if value > height or (self.half is not None and t > index + self.half):
+                continue                # right side closed without a deep enough dip
+            peak[3] = min(right_min, value)
+            found = self._confirm(peak, t)
+            if found:
+                confirmed.append(found)
+            else:
+                keep.append(peak)
+        self._pending = keep
+
+        prev = self._prev
+        if prev is not None:
+            if value > prev:
+                self._rise = (t, left_min)
+            elif value < prev and self._rise is not None:
+                start, base = self._rise
+                peak = (start + t - 1) // 2
+                if self.half is not None:
+                    base = self._window_left_min(peak, prev)
+                # The right side so far: the rest of the flat top, then this point if in the window
+                right_min = prev if t - 1 > peak else np.inf
+                if self.half is None or t <= peak + self.half:
+                    right_min = min(right_min, value)
+                if prev - base >= self.prominence:
+                    # The point that ends a flat top may already be deep enough to confirm it
+                    candidate = [peak, prev, base, right_min, self._week(week, t, peak)]
+                    found = self._confirm(candidate, t)
+                    if found:
+                        confirmed.append(found)
+                    else:
+                        self._pending.append(candidate)
+                self._rise = None
+        self._prev = value
+        return confirmed
+
+    def _confirm(self, candidate, t):
+        index, height, base, right_min, label = candidate
+        prominence = height - max(base, right_min)
+        if prominence < self.prominence:
+            return None
+        return {'index': index, 'week': label, 'value': height,
+                'prominence': prominence, 'latency': t - index}
+
+    def _week(self, week, t, peak):
+        # Only the label of the current point is known; peaks on flat tops sit behind it
+        if week is None:
+            return None
+        return pd.Timestamp(week) - pd.Timedelta(weeks=t - peak)
+
+
+class PeakMonitor:
+    """
+    One StreamingPeakDetector per series, fed a week of all series at a time
+    """
+
+    def __init__(self, names, prominence=PROMINENCE, wlen=WLEN):
+        self.names = list(names)
+        self.detectors = {name: StreamingPeakDetector(prominence, wlen) for name in self.names}
+
+    def update(self, values, week=None):
+        """
+        Push one week (array in `names` order, or a Series/dict keyed by
+        name); returns (name, peak) pairs confirmed this week
+        """
+        if isinstance(values, dict):
+            values = pd.Series(values)
+        if isinstance(values, pd.Series):
+            values = values.reindex(self.names).to_numpy(dtype=np.float64)
+        found = []
+        for name, value in zip(self.names, values):
+            found.extend((name, peak) for peak in self.detectors[name].update(value, week))
+        return found
+
+
+def detect_peaks(values, prominence=PROMINENCE, wlen=None):
+    """
+    Run the streaming detector over a whole series; the same indices
+    find_peaks(values, prominence=prominence, wlen=wlen)[0] returns
+    """
+    detector = StreamingPeakDetector(prominence, wlen)
+    found = []
+    for value in np.asarray(values, dtype=np.float64):
+        found.extend(peak['index'] for peak in detector.update(value))
+    return np.array(sorted(found), dtype=np.int64)
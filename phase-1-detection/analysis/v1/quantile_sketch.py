@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Streaming Quantile Sketch
+KLL sketches for N series fed in lockstep, keeping the phase percentiles
+(25th/50th/75th/90th) of an unbounded weekly history current in bounded
+memory; sketches of the same series built on different shards or regions merge
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from batch_scoring import classify_phases
+
+PHASE_QUANTILES = [0.25, 0.50, 0.75, 0.90]
+DEFAULT_K = 200
+# Level h holds k * (2/3)^(levels-1-h) items, so a sketch never retains more than ~3k per series
+CAPACITY_DECAY = 2 / 3
+
+
+class QuantileSketch:
+    """
+    One KLL sketch (Karnin, Lang & Liberty 2016) per series
+
+    Level h stores items that each stand for 2^h inputs. When a level
+    overflows it is sorted and every other item, starting at a random offset,
+    is promoted to the level above. Every series receives one value per
+    update, so all rows share the same level sizes and compaction is a single
+    array operation across series.
+
+    Error bound: a quantile estimate's rank is within eps * n of the true rank,
+    where eps is about 1.65% at 99% confidence for the default k=200
+    (O(1/k) in general) and n is the number of values seen. Retained items
+    stay under ~3k per series however long the history grows. Until a level
+    first overflows, every value is kept and quantiles match pandas' linear
+    interpolation exactly. NaN weeks are carried through compaction but never
+    counted as values, as pandas' quantile skips them.
+    """
+
+    def __init__(self, names, k=DEFAULT_K, seed=0):
+        if k < 8:
+            raise ValueError(f"k must be at least 8, got {k}")
+        self.names = list(names)
+        self.k = k
+        self.seed = seed
+        self.n = 0
+        self.levels = [np.empty((len(self.names), 0))]
+        self.rng = np.random.default_rng(seed)
+        # Weeks not yet copied into level 0, so single-week updates don't
+        # re-copy the whole level each time
+        self._pending = []
+        self._pending_width = 0
+
+    def capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * CAPACITY_DECAY ** depth)))
+
+    @property
+    def retained(self):
+        """
+        Items held per series, the sketch's memory footprint
+        """
+        self._flush()
+        return sum(level.shape[1] for level in self.levels)
+
+    def _compact(self, h):
+        items = self.levels[h]
+        # An odd item out stays behind so the promoted items carry exactly twice the weight
+        keep = items[:, items.shape[1] - items.shape[1] % 2:]
+        items = np.sort(items[:, :items.shape[1] - keep.shape[1]], axis=1)       # NaN sorts last
+        offset = self.rng.integers(0, 2, len(self.names))
+        columns = offset[:, None] + 2 * np.arange(items.shape[1] // 2)[None, :]
+        promoted = np.take_along_axis(items, columns, axis=1)
+
+        if h + 1 == len(self.levels):
+            self.levels.append(np.empty((len(self.names), 0)))
+        self.levels[h] = keep
+        self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted], axis=1)
+
+    def _flush(self):
+        if self._pending:
+            self.levels[0] = np.concatenate([self.levels[0]] + self._pending, axis=1)
+            self._pending = []
+            self._pending_width = 0
+            self._compress()
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            if self.levels[h].shape[1] > self.capacity(h):
+                self._compact(h)
+            h += 1
+
+    def _as_block(self, values):
+        if isinstance(values, pd.DataFrame):
+            values = values.reindex(columns=self.names).to_numpy(dtype=np.float64).T
+        elif isinstance(values, dict):
+            values = pd.Series(values)
+        if isinstance(values, pd.Series):
+            values = values.reindex(self.names).to_numpy(dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[:, None]
+        if values.shape[0] != len(self.names):
+            raise ValueError(f"expected {len(self.names)} series, got shape {values.shape}")
+        return values
+
+    def update(self, values):
+        """
+        Add one week (array in `names` order, or a Series/dict keyed by name),
+        or a block of weeks as an N series x weeks array / weeks x series DataFrame
+        """
+        block = self._as_block(values)
+        self._pending.append(block)
+        self._pending_width += block.shape[1]
+        self.n += block.shape[1]
+        if self.levels[0].shape[1] + self._pending_width > self.capacity(0):
+            self._flush()
+        return self
+
+    def merge(self, other):
+        """
+        Fold in a sketch of the same series built elsewhere (another shard,
+        region or time range); the error bound holds for the combined count
+        """
+        if other.names != self.names:
+            raise ValueError("can only merge sketches of the same series in the same order")
+        self._flush()
+        other._flush()
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty((len(self.names), 0)))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level], axis=1)
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _weighted(self):
+        """
+        Every retained item sorted per series, with the running count of
+        non-NaN inputs it stands for
+        """
+        self._flush()
+        items = np.concatenate(self.levels, axis=1)
+        weights = np.concatenate([np.full(level.shape[1], 2.0 ** h)
+                                  for h, level in enumerate(self.levels)])
+        order = np.argsort(items, axis=1)
+        items = np.take_along_axis(items, order, axis=1)
+        cumulative = np.cumsum(np.where(np.isfinite(items), weights[order], 0.0), axis=1)
+        return items, cumulative
+
+    def quantiles(self, qs=PHASE_QUANTILES):
+        """
+        Series x qs DataFrame of estimated quantiles, interpolated linearly
+        between order statistics like Series.quantile
+        """
+        qs = list(qs)
+        result = np.full((len(self.names), len(qs)), np.nan)
+        if self.retained:
+            items, cumulative = self._weighted()
+            count = cumulative[:, -1]
+            rows = np.arange(len(self.names))
+            last = items.shape[1] - 1
+
+            def order_stat(rank):
+                # The item covering 0-based rank `rank` is the first whose running count passes it
+                position = (cumulative <= rank[:, None]).sum(axis=1)
+                return items[rows, np.minimum(position, last)]
+
+            for j, q in enumerate(qs):
+                rank = q * (count - 1)
+                lo = np.floor(rank)
+                hi = np.minimum(lo + 1, np.maximum(count - 1, 0))
+                lower, upper = order_stat(lo), order_stat(hi)
+                result[:, j] = np.where(count > 0, lower + (upper - lower) * (rank - lo), np.nan)
+        return pd.DataFrame(result, index=pd.Index(self.names, name='series'), columns=qs)
+
+    def phase_thresholds(self):
+        """
+        The 25th/50th/75th/90th percentiles classify_bubble_phase takes
+        """
+        return self.quantiles(PHASE_QUANTILES)
+
+    def classify(self, values):
+        """
+        Lifecycle phase of each series' value (e.g. this week's) against its
+        own sketched history
+        """
+        values = self._as_block(values)[:, -1]
+        return pd.Series(classify_phases(values, self.phase_thresholds().to_numpy()),
+                         index=pd.Index(self.names, name='series'))
+
+    @classmethod
+    def from_history(cls, df, k=DEFAULT_K, seed=0):
+        """
+        Sketch a weeks x series DataFrame in one block
+        """
+        return cls(df.columns, k=k, seed=seed).update(df)
+
+    @classmethod
+    def from_store(cls, store, region=None, terms=None, k=DEFAULT_K, seed=0):
+        """
+        Sketch one region of a TrendsStore; MISSING weeks are skipped like NaN
+        """
+        from trends_store import MISSING
+
+        terms = list(terms) if terms is not None else store.terms
+        raw = store.values[[store.term_offset(t) for t in terms], store.region_offset(region)]
+        values = np.where(raw == MISSING, np.nan, raw.astype(np.float64))
+        return cls(terms, k=k, seed=seed).update(values)
+
+    def save(self, path):
+        """
+        Binary snapshot of every level
+        """
+        self._flush()
+        path = Path(path)
+        arrays = {'names': np.array(self.names, dtype=str),
+                  'params': np.array([self.k, self.seed, self.n], dtype=np.int64)}
+        for h, level in enumerate(self.levels):
+            arrays[f'level_{h}'] = level
+        tmp = path.with_name(path.stem + '.tmp.npz')
+        np.savez(tmp, **arrays)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as npz:
+            k, seed, n = (int(v) for v in npz['params'])
+            sketch = cls([str(name) for name in npz['names']], k=k, seed=seed)
+            n_levels = sum(1 for key in npz.files if key.startswith('level_'))
+            sketch.levels = [npz[f'level_{h}'] for h in range(n_levels)]
+        sketch.n = n
+        # Fresh but reproducible compaction coin flips for the restored sketch
+        sketch.rng = np.random.default_rng([seed, n])
+        return sketch
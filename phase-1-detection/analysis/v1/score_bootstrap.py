@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Bootstrap Confidence Intervals for the Bubble Scores
+Re-scores thousands of block-bootstrap resamples of the weekly series with
+both v1 scripts' rules and reports intervals around their point estimates,
+resamples vectorised through batch_scoring and chunks spread over a process pool
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from batch_scoring import refined_scores, v1_scores, TECHNICAL_TERMS
+
+N_BOOT = 2000
+BLOCK_WEEKS = 8          # two months: keeps the momentum and acceleration structure intact
+TREND_WINDOW = 13        # weeks in the centred trend the residuals are taken around
+CONFIDENCE = 0.90
+# Resampled rows scored per array operation (rows x weeks floats per input series)
+ROWS_PER_TASK = 4096
+
+SCORES = ['bubble_score', 'trend_increase_probability',
+          'refined_bubble_probability', 'refined_increase_probability']
+
+
+def _as_rows(values, n_rows):
+    values = np.asarray(values, dtype=np.float64)
+    return np.broadcast_to(values[None, :] if values.ndim == 1 else values, (n_rows, values.shape[-1]))
+
+
+def centred_trend(x, window=TREND_WINDOW):
+    """
+    Row-wise centred rolling mean, shrinking at the ends, NaN weeks skipped
+    """
+    frame = pd.DataFrame(np.asarray(x, dtype=np.float64).T)
+    return frame.rolling(window, center=True, min_periods=1).mean().to_numpy().T
+
+
+def block_indices(n_resamples, n_weeks, block=BLOCK_WEEKS, seed=0):
+    """
+    Week indices of n_resamples circular moving-block bootstrap series
+    """
+    rng = np.random.default_rng(seed)
+    n_blocks = -(-n_weeks // block)
+    starts = rng.integers(0, n_weeks, (n_resamples, n_blocks, 1))
+    return ((starts + np.arange(block)) % n_weeks).reshape(n_resamples, -1)[:, :n_weeks]
+
+
+def _all_scores(bubble, technical, startup, weeks, since):
+    v1 = v1_scores(bubble, technical)
+    refined = refined_scores(bubble, technical, startup, weeks, since)
+    return np.stack([v1['bubble_score'], v1['trend_increase_probability'],
+                     refined['bubble_probability'], refined['increase_probability']]).astype(np.float64)
+
+
+def _resample_chunk(inputs, weeks, chunk, n_resamples, block, seed, since):
+    """
+    Worker side: scores (4 x series x resamples) for one chunk of resamples of a
+    group of series
+
+    The three inputs share block indices, so resamples keep the weekly
+    co-movement between bubble, technical and startup searches. Indices depend
+    only on (seed, chunk), so the result is the same whatever the grouping.
+    """
+    idx = block_indices(n_resamples, len(weeks), block, seed=[seed, chunk])
+    resampled = []
+    for x in inputs:
+        trend = centred_trend(x)
+        residual = x - trend
+        # series x resamples x weeks, clipped to the Trends 0-100 scale
+        resampled.append(np.clip(trend[:, None, :] + residual[:, idx], 0, 100)
+                         .reshape(-1, len(weeks)))
+    n_series = inputs[0].shape[0]
+    scores = _all_scores(*resampled, weeks, since)
+    return scores.reshape(len(SCORES), n_series, n_resamples)
+
+
+def bootstrap_scores(bubble, technical, startup, weeks, names=None, n_boot=N_BOOT,
+                     block=BLOCK_WEEKS, confidence=CONFIDENCE, seed=0, workers=None,
+                     since='2023-01-01'):
+    """
+    Point estimates and bootstrap intervals of the v1 bubble score and
+    trend-increase probability and the refined bubble / increase probabilities,
+    one row per series
+
+    Each resample keeps the series' centred 13-week trend and replaces its
+    residuals with circular blocks of `block` weeks drawn from the same series.
+    Resamples are scored in chunks of up to ROWS_PER_TASK rows, on `workers`
+    processes (default: one per CPU; 1 runs in-process). Cost is linear in
+    series x n_boot.
+    """
+    bubble = np.asarray(bubble, dtype=np.float64)
+    bubble = bubble[None, :] if bubble.ndim == 1 else bubble
+    n_series = bubble.shape[0]
+    technical = np.ascontiguousarray(_as_rows(technical, n_series))
+    startup = np.ascontiguousarray(_as_rows(startup, n_series))
+    weeks = pd.DatetimeIndex(weeks)
+
+    chunk_size = min(n_boot, ROWS_PER_TASK)
+    group_size = max(1, ROWS_PER_TASK // chunk_size)
+    tasks = []
+    for start in range(0, n_series, group_size):
+        rows = slice(start, start + group_size)
+        for chunk, first in enumerate(range(0, n_boot, chunk_size)):
+            tasks.append((rows, ((bubble[rows], technical[rows], startup[rows]), weeks, chunk,
+                                 min(chunk_size, n_boot - first), block, seed, since)))
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    samples = np.empty((len(SCORES), n_series, n_boot))
+    if workers == 1:
+        results = [_resample_chunk(*args) for _, args in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_resample_chunk, *zip(*(args for _, args in tasks))))
+    filled = {}
+    for (rows, args), result in zip(tasks, results):
+        first = filled.get(rows.start, 0)
+        samples[:, rows, first:first + result.shape[2]] = result
+        filled[rows.start] = first + result.shape[2]
+
+    point = _all_scores(bubble, technical, startup, weeks, since)
+    tail = (1 - confidence) / 2
+    lo, hi = np.quantile(samples, [tail, 1 - tail], axis=2)
+
+    table = pd.DataFrame(index=pd.Index(names if names is not None else range(n_series), name='series'))
+    for i, score in enumerate(SCORES):
+        table[score] = point[i]
+        table[f'{score}_lo'] = lo[i]
+        table[f'{score}_hi'] = hi[i]
+        table[f'{score}_mean'] = samples[i].mean(axis=1)
+    table.attrs.update(n_boot=n_boot, block=block, confidence=confidence)
+    return table
+
+
+def bootstrap_frame(df, n_boot=N_BOOT, block=BLOCK_WEEKS, confidence=CONFIDENCE, seed=0,
+                    workers=None, bubble='ai_bubble', startup='ai_startup',
+                    technical_terms=TECHNICAL_TERMS, since='2023-01-01'):
+    """
+    Bootstrap intervals for the standard Trends frame used by the v1 scripts
+    """
+    table = bootstrap_scores(df[bubble].to_numpy(), df[technical_terms].mean(axis=1).to_numpy(),
+                             df[startup].to_numpy(), df.index, names=[bubble], n_boot=n_boot,
+                             block=block, confidence=confidence, seed=seed, workers=workers,
+                             since=since)
+    return table.loc[bubble]
+
+
+def format_interval(row, score, confidence=CONFIDENCE):
+    """
+    'point (90% CI lo-hi)' for one score of a bootstrap_frame row
+    """
+    return (f"{row[score]:.0f} ({confidence:.0%} CI {row[f'{score}_lo']:.0f}-"
+            f"{row[f'{score}_hi']:.0f}, bootstrap mean {row[f'{score}_mean']:.1f})")
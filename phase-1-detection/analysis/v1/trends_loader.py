@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Google Trends Loader
+Parses multiTimeline exports once into compact dtypes and keeps a binary cache
+so repeated loads of the same export skip text parsing entirely
+"""
+
+import hashlib
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = Path(__file__).resolve().parents[2] / 'data'
+TRENDS_CSV = DATA_DIR / 'multiTimeline-googleTrends.csv'
+
+# Bump when the cache layout changes so stale files are ignored
+CACHE_VERSION = 1
+CACHE_DIR = Path(os.environ.get('TRENDS_CACHE_DIR',
+                                Path.home() / '.cache' / 'ai-bubble-or-not' / 'trends'))
+
+
+def column_slug(header):
+    """
+    Turn a Trends header like 'AI bubble: (United States)' into 'ai_bubble'
+    """
+    term = header.split(':')[0]
+    return re.sub(r'[^0-9a-z]+', '_', term.lower()).strip('_')
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """
+    SHA-1 of a file's bytes, used to validate a cache after an mtime change
+    """
+    digest = hashlib.sha1()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_trends_csv(path, columns=None):
+    """
+    Parse a multiTimeline export into a DataFrame indexed by week
+
+    Trends reports values below 1 as '<1'; those become 0. Columns that parse
+    cleanly are stored as uint8 (values are 0-100), anything with gaps stays
+    float32 so NaN survives.
+    """
+    df = pd.read_csv(path, skiprows=1, dtype=str)
+    index = pd.DatetimeIndex(pd.to_datetime(df.iloc[:, 0]), name='Week')
+    raw = df.iloc[:, 1:]
+
+    if columns is None:
+        columns = [column_slug(header) for header in raw.columns]
+    elif len(columns) != raw.shape[1]:
+        raise ValueError(f"{path}: expected {len(columns)} columns, found {raw.shape[1]}")
+
+    data = {}
+    for name, header in zip(columns, raw.columns):
+        values = pd.to_numeric(raw[header].str.strip().replace('<1', '0'), errors='coerce')
+        if values.isna().any():
+            data[name] = values.to_numpy(dtype=np.float32)
+        else:
+            data[name] = values.to_numpy().astype(np.uint8)
+
+    return pd.DataFrame(data, index=index)
+
+
+def _cache_path(path, cache_dir):
+    key = hashlib.sha1(str(path).encode()).hexdigest()[:16]
+    return Path(cache_dir) / f'{path.stem}-{key}.npz'
+
+
+def _read_cache(cache_file, stat, path):
+    """
+    Return the cached arrays if they still describe the source file, else None
+    """
+    try:
+        with np.load(cache_file, allow_pickle=False) as npz:
+            cached = {name: npz[name] for name in npz.files}
+    except (OSError, ValueError, KeyError):
+        return None
+
+    meta = cached['meta']
+    if int(meta[0]) != CACHE_VERSION:
+        return None
+    if int(meta[1]) != stat.st_mtime_ns or int(meta[2]) != stat.st_size:
+        # Touched but possibly unchanged (e.g. re-downloaded): fall back to the hash
+        if str(cached['digest']) != file_digest(path):
+            return None
+        # Same content: record the new mtime/size so later loads skip the hash
+        cached['meta'] = _meta(stat)
+        try:
+            _save_cache(cache_file, cached)
+        except OSError:
+            pass
+    return cached
+
+
+def _meta(stat):
+    return np.array([CACHE_VERSION, stat.st_mtime_ns, stat.st_size], dtype=np.int64)
+
+
+def _save_cache(cache_file, arrays):
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_file.with_name(f'{cache_file.stem}.{os.getpid()}.tmp.npz')
+    np.savez(tmp, **arrays)
+    # Atomic swap so concurrent readers never see a half-written cache
+    os.replace(tmp, cache_file)
+
+
+def _write_cache(cache_file, df, stat, digest):
+    arrays = {f'col_{i}': df[col].to_numpy() for i, col in enumerate(df.columns)}
+    _save_cache(cache_file, dict(
+        meta=_meta(stat),
+        digest=np.array(digest),
+        index=df.index.to_numpy(dtype='datetime64[ns]'),
+        columns=np.array(list(df.columns)),
+        **arrays
+    ))
+
+
+def load_trends(path=TRENDS_CSV, columns=None, cache_dir=None, use_cache=True):
+    """
+    Load a Google Trends export as uint8 columns on a datetime64 week index
+
+    The parsed arrays are cached as .npz under cache_dir (default
+    $TRENDS_CACHE_DIR or ~/.cache/ai-bubble-or-not/trends). A cache entry is
+    reused while the source mtime/size match, or while its content hash
+    matches after a touch; otherwise the CSV is parsed again.
+    """
+    path = Path(path).resolve()
+    if not use_cache:
+        return parse_trends_csv(path, columns)
+
+    stat = path.stat()
+    cache_file = _cache_path(path, cache_dir or CACHE_DIR)
+    cached = _read_cache(cache_file, stat, path) if cache_file.exists() else None
+
+    if cached is not None:
+        names = [str(c) for c in cached['columns']]
+        df = pd.DataFrame({name: cached[f'col_{i}'] for i, name in enumerate(names)},
+                          index=pd.DatetimeIndex(cached['index'], name='Week'))
+    else:
+        df = parse_trends_csv(path)
+        try:
+            _write_cache(cache_file, df, stat, file_digest(path))
+        except OSError:
+            # A read-only cache location should never break the analysis
+            pass
+
+    if columns is not None:
+        if len(columns) != df.shape[1]:
+            raise ValueError(f"{path}: expected {len(columns)} columns, found {df.shape[1]}")
+        df.columns = list(columns)
+    return df
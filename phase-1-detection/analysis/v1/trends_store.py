@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Memory-Mapped Trends Store
+Keeps thousands of Google Trends series as one uint8 term x region x week array
+on disk, so analyses slice the terms they need without loading the rest
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from trends_loader import load_trends, TRENDS_CSV
+
+STORE_VERSION = 1
+# Trends values are whole numbers 0-100, so 255 is free to mark weeks a region never reported
+MAX_VALUE = 100
+MISSING = 255
+
+
+class TrendsStore:
+    """
+    A directory holding values.npy (uint8, terms x regions x weeks), weeks.npy
+    and an index.json mapping term/region names to their offsets
+    """
+
+    def __init__(self, path, values, weeks, terms, regions):
+        self.path = Path(path)
+        self.values = values
+        self.weeks = pd.DatetimeIndex(weeks, name='Week')
+        self.terms = list(terms)
+        self.regions = list(regions)
+        self.term_offsets = {name: i for i, name in enumerate(self.terms)}
+        self.region_offsets = {name: i for i, name in enumerate(self.regions)}
+
+    @classmethod
+    def create(cls, path, terms, regions, weeks):
+        """
+        Allocate an empty store on disk, every cell set to MISSING
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        weeks = pd.DatetimeIndex(weeks).to_numpy(dtype='datetime64[ns]')
+
+        values = np.lib.format.open_memmap(
+            path / 'values.npy', mode='w+', dtype=np.uint8,
+            shape=(len(terms), len(regions), len(weeks))
+        )
+        values[:] = MISSING
+        np.save(path / 'weeks.npy', weeks)
+        with open(path / 'index.json', 'w') as fh:
+            json.dump({'version': STORE_VERSION, 'terms': list(terms),
+                       'regions': list(regions)}, fh)
+
+        return cls(path, values, weeks, terms, regions)
+
+    @classmethod
+    def open(cls, path, mode='r'):
+        """
+        Map an existing store; mode='r+' allows in-place writes
+        """
+        path = Path(path)
+        with open(path / 'index.json') as fh:
+            index = json.load(fh)
+        if index.get('version') != STORE_VERSION:
+            raise ValueError(f"{path}: unsupported store version {index.get('version')}")
+
+        values = np.load(path / 'values.npy', mmap_mode=mode)
+        weeks = np.load(path / 'weeks.npy')
+        return cls(path, values, weeks, index['terms'], index['regions'])
+
+    def term_offset(self, term):
+        try:
+            return self.term_offsets[term]
+        except KeyError:
+            raise KeyError(f"Unknown term {term!r}") from None
+
+    def region_offset(self, region=None):
+        """
+        Offset of a region; None is only accepted when the store has one region
+        """
+        if region is None:
+            if len(self.regions) == 1:
+                return 0
+            raise ValueError(f"store has {len(self.regions)} regions {self.regions}; "
+                             "pass a region (or set $TRENDS_REGION)")
+        try:
+            return self.region_offsets[region]
+        except KeyError:
+            raise KeyError(f"Unknown region {region!r}") from None
+
+    def series(self, term, region=None):
+        """
+        Zero-copy uint8 view of one term's weekly values in one region
+        """
+        return self.values[self.term_offset(term), self.region_offset(region)]
+
+    def term_block(self, term):
+        """
+        Zero-copy regions x weeks view of one term
+        """
+        return self.values[self.term_offset(term)]
+
+    def write(self, term, region, values, weeks=None):
+        """
+        Store one series, aligning it to the store's week axis when weeks are
+        given; NaN (missing weeks) is stored as MISSING
+
+        Values must be whole numbers 0-100 as Trends reports them; anything
+        else raises ValueError rather than being truncated into the uint8 row.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        missing = np.isnan(values)
+        reported = values[~missing]
+        if ((reported < 0) | (reported > MAX_VALUE)).any():
+            raise ValueError(f"{term!r}/{region!r}: values outside 0-{MAX_VALUE}")
+        if (reported != np.round(reported)).any():
+            raise ValueError(f"{term!r}/{region!r}: values must be whole numbers")
+        values = np.where(missing, MISSING, values).astype(np.uint8)
+        row = self.values[self.term_offset(term), self.region_offset(region)]
+        if weeks is None:
+            row[:] = values
+        else:
+            positions = self.weeks.get_indexer(pd.DatetimeIndex(weeks))
+            if (positions < 0).any():
+                raise ValueError(f"{term!r}/{region!r}: weeks outside the store's range")
+            row[positions] = values
+
+    def frame(self, terms, region=None):
+        """
+        DataFrame of a few terms for the pandas-based analyses
+
+        Only the requested rows are read from disk. Columns stay uint8 unless a
+        week is MISSING, in which case that column becomes float with NaN.
+        """
+        data = {}
+        for term in terms:
+            values = self.series(term, region)
+            if (values == MISSING).any():
+                values = np.where(values == MISSING, np.nan, values)
+            data[term] = values
+        return pd.DataFrame(data, index=self.weeks)
+
+    def flush(self):
+        if isinstance(self.values, np.memmap):
+            self.values.flush()
+
+
+def build_store(path, exports):
+    """
+    Build a store from (region, csv_path) pairs of multiTimeline exports
+
+    Runs two passes: the first collects term names and the union of weeks from
+    each export, the second writes values. Both go through load_trends, so the
+    second pass is served from its cache.
+    """
+    exports = list(exports)
+    terms, regions, weeks = {}, {}, set()
+    for region, csv_path in exports:
+        df = load_trends(csv_path)
+        regions.setdefault(region, None)
+        for term in df.columns:
+            terms.setdefault(term, None)
+        weeks.update(df.index.to_numpy(dtype='datetime64[ns]'))
+
+    store = TrendsStore.create(path, list(terms), list(regions), sorted(weeks))
+    for region, csv_path in exports:
+        df = load_trends(csv_path)
+        for term in df.columns:
+            store.write(term, region, df[term].to_numpy(), weeks=df.index)
+
+    store.flush()
+    return store
+
+
+def load_terms(terms, store_path=None, region=None, csv_path=TRENDS_CSV):
+    """
+    Load the analysis terms, slicing them out of a TrendsStore when one is
+    configured (store_path or $TRENDS_STORE, region or $TRENDS_REGION) and
+    from the single bundled export otherwise
+    """
+    store_path = store_path or os.environ.get('TRENDS_STORE')
+    if store_path:
+        store = TrendsStore.open(store_path)
+        return store.frame(terms, region or os.environ.get('TRENDS_REGION'))
+    return load_trends(csv_path, columns=terms)
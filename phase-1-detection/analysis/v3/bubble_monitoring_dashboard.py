@@ -4,17 +4,40 @@ AI Bubble Real-Time Monitoring Dashboard
 Tracks multiple indicators to assess bubble conditions in real-time
 """
 
+import sys
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
-# Set style for better visualizations
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
+COMMON_DIR = str(Path(__file__).resolve().parents[3] / 'common')
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
+
+from figures import FigureJob, render_figures
+from instrument import traced
+from monte_carlo import fan_chart, simulate_walk, N_PATHS
+from indicator_registry import IndicatorRegistry, run
+
+# Indicators every monitor starts with; plugins register theirs here too
+REGISTRY = IndicatorRegistry()
+
+
+def _pyplot():
+    """
+    Import matplotlib/seaborn on first use, so scoring and reports stay headless
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Set style for better visualizations
+    plt.style.use('seaborn-v0_8-darkgrid')
+    sns.set_palette("husl")
+    return plt
+
 
 class AIBubbleMonitor:
     """
@@ -22,17 +45,38 @@ class AIBubbleMonitor:
     Tracks multiple indicators and provides a composite bubble score
     """
 
-    def __init__(self):
+    # Month-to-month standard deviation of the composite score in the projection
+    PROJECTION_VOLATILITY = 3.0
+
+    # Default P/E ratios (research-based); OpenAI's is implied by its $500B valuation
+    DEFAULT_PE_RATIOS = {
+        'NVIDIA': 53,
+        'Microsoft': 35,
+        'Google': 28,
+        'Meta': 27,
+        'OpenAI_implied': 100
+    }
+
+    def __init__(self, registry=None):
         self.indicators = {}
-        self.weights = {
-            'search_trends': 0.15,
-            'valuation_metrics': 0.25,
-            'sentiment_analysis': 0.15,
-            'vc_funding': 0.15,
-            'market_concentration': 0.15,
-            'roi_delivery': 0.15
-        }
+        # Indicators this monitor evaluates: the built-in six plus any
+        # registered on REGISTRY, or on self.registry for this monitor only
+        self.registry = (registry if registry is not None else REGISTRY).copy()
+        # Inputs the composite uses per indicator, over each indicator's defaults
+        self.inputs = {key: {} for key in self.registry}
+        # Each indicator as last computed from self.inputs, and the ones whose inputs changed since
+        self._cache = {}
+        self._dirty = set()
+
+    @property
+    def weights(self):
+        """
+        Composite weight of each indicator, as registered
+        """
+        return self.registry.weights()
 
+    @REGISTRY.indicator('search_trends', weight=0.15)
+    @traced()
     def calculate_search_trend_score(self, current_level=37, growth_rate=254):
         """
         Score based on Google Trends data for "AI bubble" searches
@@ -64,19 +108,19 @@ class AIBubbleMonitor:
 
         return score
 
-    def calculate_valuation_score(self, pe_ratios=None, market_caps=None):
+    @REGISTRY.indicator('valuation_metrics', weight=0.25)
+    @traced()
+    def calculate_valuation_score(self, pe_ratios=None, market_caps=None, universe=None,
+                                  weighting='cap', sector_norms=None):
         """
-        Score based on valuation metrics
+        Score based on valuation metrics; given a universe (see
+        valuation_engine.load_universe), its cap- or equal-weighted P/E
+        deviation from per-sector norms replaces the pe_ratios average
         """
+        if universe is not None:
+            return self._universe_valuation(universe, weighting, sector_norms)
         if pe_ratios is None:
-            # Default values based on research
-            pe_ratios = {
-                'NVIDIA': 53,
-                'Microsoft': 35,
-                'Google': 28,
-                'Meta': 27,
-                'OpenAI_implied': 100  # Based on $500B valuation
-            }
+            pe_ratios = self.DEFAULT_PE_RATIOS
 
         # Calculate deviation from historical norms (S&P 500 average ~20)
         historical_pe = 20
@@ -105,6 +149,26 @@ class AIBubbleMonitor:
 
         return score
 
+    def _universe_valuation(self, universe, weighting, sector_norms):
+        from valuation_engine import universe_score
+
+        result = universe_score(universe, sector_norms, weighting)
+        breakdown = result['breakdown'].drop(index='All')
+        score = result['score']
+        self.indicators['valuation_metrics'] = {
+            'score': score,
+            'avg_pe': result['average'],
+            'deviation_from_norm': result['deviation'],
+            'weighting': weighting,
+            'tickers': int(result['breakdown'].loc['All', 'n']),
+            'sector_scores': breakdown[f'pe_score_{weighting}'].dropna().to_dict(),
+            'interpretation': self._interpret_score(score)
+        }
+
+        return score
+
+    @REGISTRY.indicator('sentiment_analysis', weight=0.15)
+    @traced()
     def calculate_sentiment_score(self, fund_manager_bubble_pct=54,
                                  expert_warnings=7, media_mentions=85):
         """
@@ -132,6 +196,8 @@ class AIBubbleMonitor:
 
         return score
 
+    @REGISTRY.indicator('vc_funding', weight=0.15)
+    @traced()
     def calculate_vc_funding_score(self, quarterly_investment=88, yoy_growth=67):
         """
         Score based on VC funding patterns
@@ -171,6 +237,8 @@ class AIBubbleMonitor:
 
         return score
 
+    @REGISTRY.indicator('market_concentration', weight=0.15)
+    @traced()
     def calculate_concentration_score(self, top7_market_share=35,
                                      ai_exposure_pct=50):
         """
@@ -202,6 +270,8 @@ class AIBubbleMonitor:
 
         return score
 
+    @REGISTRY.indicator('roi_delivery', weight=0.15)
+    @traced()
     def calculate_roi_score(self, project_failure_rate=95,
                            paid_user_pct=10, revenue_multiple=100):
         """
@@ -253,21 +323,136 @@ class AIBubbleMonitor:
         else:
             return "Extreme bubble"
 
-    def calculate_composite_score(self):
+    def set_inputs(self, indicator, **inputs):
+        """
+        Change some of an indicator's inputs for later composite scores, e.g.
+        set_inputs('vc_funding', quarterly_investment=95); only indicators
+        whose inputs really changed are recomputed by the next
+        calculate_composite_score(), along with the indicators derived from them
+        """
+        if indicator not in self.registry:
+            raise KeyError(f"unknown indicator {indicator!r}; expected one of {list(self.registry)}")
+        current = self.inputs.setdefault(indicator, {})
+        for name, value in inputs.items():
+            try:
+                same = name in current and bool(current[name] == value)
+            except (TypeError, ValueError):         # e.g. arrays, which compare elementwise
+                same = False
+            if not same:
+                current[name] = value
+                self._dirty.add(indicator)
+                self._dirty.update(self.registry.dependents(indicator))
+        return self
+
+    def dirty_indicators(self):
+        """
+        Indicators the next evaluation will recompute
+        """
+        return [key for key in self.registry if key in self._dirty or key not in self._cache]
+
+    def use_search_data(self, df=None, feed=None):
+        """
+        Take the search_trends inputs from Google Trends data (default: the
+        loaded v1 terms) instead of the built-in defaults; a SearchTrendFeed
+        kept across refreshes only recomputes them when the data changes
+        """
+        if feed is None:
+            from search_feed import SearchTrendFeed
+            feed = SearchTrendFeed()
+        return self.set_inputs('search_trends', **feed.inputs(df))
+
+    def use_universe(self, source, weighting='cap', sector_norms=None, **columns):
+        """
+        Score valuation over a whole universe (DataFrame, dict of arrays or
+        Parquet/CSV path of tickers with sector, pe, ps and market_cap; see
+        valuation_engine.load_universe) against per-sector norms, instead of
+        the five-company P/E dict
+        """
+        from valuation_engine import load_universe
+
+        return self.set_inputs('valuation_metrics', universe=load_universe(source, **columns),
+                               weighting=weighting, sector_norms=sector_norms)
+
+    def scenario_defaults(self):
+        """
+        Inputs the composite currently uses, per indicator: each indicator's
+        defaults overridden by set_inputs()
+        """
+        defaults = {}
+        for key in self.registry:
+            defaults[key] = dict(self.registry[key].defaults)
+            defaults[key].update(self.inputs.get(key, {}))
+        if defaults['valuation_metrics']['pe_ratios'] is None:
+            defaults['valuation_metrics']['pe_ratios'] = self.DEFAULT_PE_RATIOS
+        return defaults
+
+    def score_scenarios(self, scenarios, interpret=False):
+        """
+        Composite, phase and risk level for a DataFrame (or dict of arrays) of
+        what-if scenarios in one vectorised pass; inputs a scenario leaves out
+        are the monitor's own (see scenario_grid.score_scenarios)
+        """
+        from scenario_grid import score_scenarios
+
+        return score_scenarios(scenarios, self.weights, self.scenario_defaults(), interpret)
+
+    def sensitivity(self, budget=10.0, spread=0.5, workers=None, **kwargs):
+        """
+        Which inputs and weights move the composite: ranked Sobol indices
+        over nominal +/- spread, computed for about `budget` seconds (see
+        sensitivity.sobol_indices)
+        """
+        from sensitivity import sobol_indices
+
+        return sobol_indices(self, spread=spread, budget=budget, workers=workers, **kwargs)
+
+    def evaluate(self, *names, workers=1):
+        """
+        The named indicators' dicts (default: every weighted one), computing
+        only what they need: dependencies first, and only indicators whose
+        inputs or dependencies changed since last time; the rest come from
+        the cache. workers > 1 runs independent indicators concurrently on
+        threads, which pays off for indicators that fetch or load data.
+        """
+        names = names or tuple(self.weights)
+        order = self.registry.order(names)
+        fresh = set()
+
+        def compute(key):
+            indicator = self.registry[key]
+            if key in self._cache and key not in self._dirty and fresh.isdisjoint(indicator.depends):
+                return
+            kwargs = dict(self.inputs.get(key, {}))
+            kwargs.update((dependency, self._cache[dependency]) for dependency in indicator.depends)
+            self.indicators.pop(key, None)
+            result = indicator.compute(self, **kwargs)
+            if not isinstance(result, dict):
+                # calculate_* methods store their details themselves and return the score
+                result = self.indicators.get(key) or {'score': result,
+                                                      'interpretation': self._interpret_score(result)}
+            self._cache[key] = result
+            fresh.add(key)
+
+        if self._dirty.intersection(order) or not self._cache.keys() >= set(order):
+            run(self.registry, order, compute, workers)
+            self._dirty.difference_update(order)
+        # Rebuilt from the cache in registration order (the report's order): a
+        # direct calculate_* call with other inputs may have replaced an entry
+        self.indicators = {key: self._cache[key] for key in self.registry
+                           if key in self._cache and key not in self._dirty}
+        return {key: self._cache[key] for key in names}
+
+    @traced()
+    def calculate_composite_score(self, workers=1):
         """
         Calculate weighted composite bubble score
         """
-        # Calculate all individual scores with current data
-        self.calculate_search_trend_score()
-        self.calculate_valuation_score()
-        self.calculate_sentiment_score()
-        self.calculate_vc_funding_score()
-        self.calculate_concentration_score()
-        self.calculate_roi_score()
+        weights = self.weights
+        scores = self.evaluate(*weights, workers=workers)
 
         # Calculate weighted average
-        composite = sum(self.indicators[key]['score'] * self.weights[key]
-                       for key in self.weights.keys())
+        composite = sum(scores[key]['score'] * weights[key]
+                       for key in weights.keys())
 
         return composite
 
@@ -290,12 +475,16 @@ class AIBubbleMonitor:
         else:
             return "Imminent Burst Risk"
 
-    def generate_report(self):
+    @traced()
+    def generate_report(self, history=None, universe='default'):
         """
-        Generate comprehensive bubble assessment report
+        Generate comprehensive bubble assessment report, appending the
+        snapshot to a ScoreHistory when one is given
         """
         composite = self.calculate_composite_score()
         phase = self.get_bubble_phase(composite)
+        if history is not None:
+            history.record(self, composite, universe=universe)
 
         print("=" * 80)
         print("AI BUBBLE MONITORING DASHBOARD")
@@ -389,16 +578,30 @@ class AIBubbleMonitor:
 
         return composite, phase
 
+    def project_score(self, composite, months=6, n_paths=N_PATHS, seed=0):
+        """
+        Monthly fan of simulated composite-score paths starting this month
+
+        Drift follows current momentum (+2/month above 60, else +1) and each
+        month adds normal noise of PROJECTION_VOLATILITY points, so next
+        month's 90% band is roughly the +/-5 the chart used to draw; paths
+        stay on the 0-100 scale.
+        """
+        drift = 2 if composite > 60 else 1
+        # Step 1 is the current month, as in the original straight-line projection
+        paths = simulate_walk(composite, months - 1, n_paths, drift=drift,
+                              scale=self.PROJECTION_VOLATILITY, seed=seed)
+        paths = np.concatenate([np.full((n_paths, 1), float(composite)), paths], axis=1)
+        return fan_chart(paths, index=pd.RangeIndex(months, name='month'))
+
     def plot_dashboard(self):
         """
         Create visual dashboard of bubble indicators
         """
+        plt = _pyplot()
         fig, axes = plt.subplots(2, 3, figsize=(15, 10))
         fig.suptitle('AI Bubble Monitoring Dashboard', fontsize=16, fontweight='bold')
 
-        # Ensure all scores are calculated
-        self.calculate_composite_score()
-
         # Plot 1: Composite Score Gauge
         ax = axes[0, 0]
         composite = self.calculate_composite_score()
@@ -477,23 +680,17 @@ class AIBubbleMonitor:
         # Plot 6: Trend Projection
         ax = axes[1, 2]
         months = ['Oct\n2025', 'Nov', 'Dec', 'Jan\n2026', 'Feb', 'Mar']
-        base_score = composite
-        # Projection based on current momentum
-        if composite > 60:
-            trend = [base_score + i*2 for i in range(6)]  # Accelerating
-        else:
-            trend = [base_score + i*1 for i in range(6)]  # Steady growth
+        fan = self.project_score(composite, len(months))
+        trend = list(fan[0.5])
 
         ax.plot(months, trend, 'b-', linewidth=2, marker='o')
-        ax.fill_between(range(6),
-                        [t - 5 for t in trend],
-                        [t + 5 for t in trend],
-                        alpha=0.3, color='blue')
+        ax.fill_between(range(6), fan[0.05], fan[0.95], alpha=0.15, color='blue')
+        ax.fill_between(range(6), fan[0.25], fan[0.75], alpha=0.3, color='blue')
         ax.axhline(80, color='red', linestyle='--', alpha=0.5, label='High Risk')
         ax.axhline(90, color='darkred', linestyle='--', alpha=0.5, label='Extreme Risk')
         ax.set_ylabel('Projected Bubble Score')
         ax.set_title('6-Month Projection')
-        ax.set_ylim(max(0, min(trend) - 10), min(100, max(trend) + 10))
+        ax.set_ylim(max(0, fan[0.05].min() - 10), min(100, fan[0.95].max() + 10))
         ax.legend()
         ax.grid(True, alpha=0.3)
 
@@ -513,7 +710,8 @@ class AIBubbleMonitor:
                                counterclock=False)
 
         # Add center circle to create donut
-        centre_circle = plt.Circle((0, 0), 0.70, fc='white')
+        from matplotlib.patches import Circle
+        centre_circle = Circle((0, 0), 0.70, fc='white')
         ax.add_artist(centre_circle)
 
         # Add needle
@@ -534,28 +732,57 @@ class AIBubbleMonitor:
         ax.axis('equal')
 
 
-def main():
+def figure_job(monitor, output='ai_bubble_dashboard.png'):
+    """
+    monitor.plot_dashboard as a FigureJob for the cached, parallel render stage
+    """
+    return FigureJob('bubble_monitoring_dashboard', monitor.plot_dashboard, output=output)
+
+
+def main(argv=None):
     """
     Run the bubble monitoring dashboard
     """
+    import argparse
+
+    parser = argparse.ArgumentParser(description='AI bubble monitoring dashboard')
+    parser.add_argument('--no-plot', action='store_true',
+                        help='headless run: skip the dashboard figure and never import matplotlib')
+    parser.add_argument('--output', default='ai_bubble_dashboard.png',
+                        help='figure path (default: %(default)s)')
+    parser.add_argument('--history', default=None,
+                        help='SQLite score history to append this run to (see score_history.py)')
+    parser.add_argument('--universe', default='default',
+                        help='universe the run is recorded under in --history (default: %(default)s)')
+    parser.add_argument('--no-trends', action='store_true',
+                        help='keep the built-in search inputs instead of computing them from the Trends data')
+    args = parser.parse_args(argv)
+
     print("\n" + "="*80)
     print("INITIALIZING AI BUBBLE MONITORING SYSTEM...")
     print("="*80 + "\n")
 
     # Create monitor instance
     monitor = AIBubbleMonitor()
+    if not args.no_trends:
+        monitor.use_search_data()
 
     # Generate report
-    composite_score, phase = monitor.generate_report()
+    if args.history:
+        from score_history import ScoreHistory
 
-    # Generate and save visualization
-    print("\nGenerating visual dashboard...")
-    fig = monitor.plot_dashboard()
+        with ScoreHistory(args.history) as history:
+            composite_score, phase = monitor.generate_report(history, args.universe)
+            print(f"Snapshot appended to: {args.history} ({len(history)} in history)")
+    else:
+        composite_score, phase = monitor.generate_report()
 
-    # Save the dashboard
-    output_path = 'ai_bubble_dashboard.png'
-    fig.savefig(output_path, dpi=150, bbox_inches='tight')
-    print(f"Dashboard saved to: {output_path}")
+    # Generate and save visualization
+    if not args.no_plot:
+        print("\nGenerating visual dashboard...")
+        # Rendered in an Agg worker; reused from the figure cache when the scores are unchanged
+        render_figures([figure_job(monitor, args.output)])
+        print(f"Dashboard saved to: {args.output}")
 
     # Historical context
     print("\n" + "="*80)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Indicator Registry
+Plugin registry of AIBubbleMonitor indicators: each declares its inputs (its
+keyword parameters and their defaults), the indicators it is derived from
+and its composite weight, and is evaluated in dependency order with
+independent indicators run concurrently
+"""
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class Indicator:
+    """
+    One registered indicator
+
+    compute(monitor, **kwargs) gets the indicator's inputs (its keyword
+    parameters, defaults overridden by monitor.set_inputs) and, under each
+    dependency's name, that indicator's dict. It returns the indicator dict
+    ({'score': ..., details}), or stores it in monitor.indicators[name] and
+    returns the score as the calculate_* methods do; a bare score becomes
+    {'score', 'interpretation'}. weight=None leaves it out of the composite.
+    """
+
+    def __init__(self, name, compute, depends=(), weight=None):
+        self.name = name
+        self.compute = compute
+        self.depends = tuple(depends)
+        self.weight = weight
+        self._defaults = None
+
+    @property
+    def defaults(self):
+        """
+        The inputs the indicator declares, with their default values
+        """
+        if self._defaults is None:
+            import inspect
+
+            parameters = list(inspect.signature(self.compute).parameters.values())[1:]
+            self._defaults = {p.name: p.default for p in parameters
+                              if p.name not in self.depends
+                              and p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)}
+        return self._defaults
+
+    def __repr__(self):
+        return f"Indicator({self.name!r}, depends={list(self.depends)}, weight={self.weight})"
+
+
+class IndicatorRegistry:
+    """
+    Indicators by name, in registration order (the order the composite adds
+    them and the report prints them)
+    """
+
+    def __init__(self, indicators=()):
+        self._indicators = {indicator.name: indicator for indicator in indicators}
+        # Until the next register: evaluation order per targets, and the
+        # indicators derived directly from each one
+        self._orders = {}
+        self._derived = None
+
+    def register(self, name, compute, depends=(), weight=None):
+        """
+        Add an indicator, or replace the one of the same name in place
+        """
+        self._indicators[name] = Indicator(name, compute, depends, weight)
+        self._orders.clear()
+        self._derived = None
+        return self._indicators[name]
+
+    def indicator(self, name, depends=(), weight=None):
+        """
+        Decorator form of register; returns the function unchanged, so
+        methods stay callable directly:
+
+            @REGISTRY.indicator('ai_capex', depends=['vc_funding'], weight=0.1)
+            def ai_capex(monitor, vc_funding, capex_growth=40): ...
+        """
+        def wrap(compute):
+            self.register(name, compute, depends, weight)
+            return compute
+        return wrap
+
+    def copy(self):
+        return IndicatorRegistry(self._indicators.values())
+
+    def __getitem__(self, name):
+        return self._indicators[name]
+
+    def __contains__(self, name):
+        return name in self._indicators
+
+    def __iter__(self):
+        return iter(self._indicators)
+
+    def __len__(self):
+        return len(self._indicators)
+
+    def weights(self):
+        """
+        {name: weight} of the indicators in the composite
+        """
+        return {name: indicator.weight for name, indicator in self._indicators.items()
+                if indicator.weight is not None}
+
+    def dependents(self, name):
+        """
+        Every indicator derived from name, directly or through others
+        """
+        if self._derived is None:
+            self._derived = {}
+            for other, indicator in self._indicators.items():
+                for dependency in indicator.depends:
+                    self._derived.setdefault(dependency, []).append(other)
+        found = set()
+        frontier = [name]
+        while frontier:
+            for other in self._derived.get(frontier.pop(), ()):
+                if other not in found:
+                    found.add(other)
+                    frontier.append(other)
+        return found
+
+    def order(self, targets):
+        """
+        The targets and everything they depend on, each after its
+        dependencies; raises KeyError for an unknown indicator and
+        ValueError for a dependency cycle
+        """
+        targets = tuple(targets)
+        order = self._orders.get(targets)
+        if order is not None:
+            return order
+
+        order, state = [], {}            # state: 1 while on the path, 2 once placed
+
+        def visit(name, path):
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                cycle = path[path.index(name):] + [name]
+                raise ValueError(f"indicator dependency cycle: {' -> '.join(cycle)}")
+            if name not in self._indicators:
+                raise KeyError(f"unknown indicator {name!r}"
+                               + (f" (needed by {path[-1]!r})" if path else ""))
+            state[name] = 1
+            for dependency in self._indicators[name].depends:
+                visit(dependency, path + [name])
+            state[name] = 2
+            order.append(name)
+
+        for name in targets:
+            visit(name, [])
+        self._orders[targets] = order
+        return order
+
+
+def run(registry, order, compute, workers=1):
+    """
+    Call compute(name) for every name of order (as registry.order returns
+    it), each once its dependencies have finished; with workers > 1 the
+    indicators whose dependencies are done run concurrently on a thread pool
+    """
+    if workers == 1 or len(order) < 2:
+        for name in order:
+            compute(name)
+        return
+
+    waiting = {name: set(registry[name].depends) for name in order}
+    dependents = {name: [] for name in order}
+    for name in order:
+        for dependency in waiting[name]:
+            dependents[dependency].append(name)
+    ready = [name for name in order if not waiting[name]]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        running = {}
+        while ready or running:
+            for name in ready:
+                running[pool.submit(compute, name)] = name
+            ready = []
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                future.result()          # re-raise an indicator's error here
+                for dependent in dependents[name]:
+                    waiting[dependent].discard(name)
+                    if not waiting[dependent]:
+                        ready.append(dependent)
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+What-If Scenario Grid
+Evaluates AIBubbleMonitor's six indicators, composite score, bubble phase
+and risk level for arrays of scenarios at once, threshold ladders applied
+with searchsorted instead of if/elif chains, so millions of input
+combinations score in one call
+"""
+
+import numpy as np
+import pandas as pd
+
+# (upper bounds, scores): a value below bounds[i] scores scores[i], at or
+# above every bound the last score, exactly as the calculate_* if/elif chains
+SEARCH_GROWTH_LADDER = ([50, 100, 200, 300], [20, 40, 60, 80, 100])
+VALUATION_LADDER = ([25, 50, 100, 150], [20, 40, 60, 80, 95])
+VC_INVESTMENT_LADDER = ([20, 40, 60, 80], [20, 40, 60, 80, 95])
+VC_GROWTH_LADDER = ([20, 40, 60, 80], [20, 40, 60, 80, 95])
+CONCENTRATION_LADDER = ([20, 25, 30, 35], [20, 40, 60, 80, 95])
+REVENUE_MULTIPLE_LADDER = ([20, 40, 60, 80], [20, 40, 60, 80, 95])
+HISTORICAL_PE = 20
+
+INTERPRETATIONS = (["No bubble", "Minimal concern", "Moderate concern", "High concern",
+                    "Extreme bubble"], [20, 40, 60, 80])
+PHASES = (["No Bubble", "Early Formation", "Middle Stage", "Late-Middle Stage", "Late Stage",
+           "Peak Formation", "Imminent Burst Risk"], [20, 35, 50, 65, 80, 90])
+RISK_LEVELS = (["LOW", "MODERATE", "HIGH", "EXTREME"], [40, 60, 80])
+
+# Weights each calculate_* method gives its components, in argument order
+# (valuation_metrics is a single ladder)
+SUB_WEIGHTS = {
+    'search_trends': (0.4, 0.6),
+    'sentiment_analysis': (0.5, 0.3, 0.2),
+    'vc_funding': (0.6, 0.4),
+    'market_concentration': (0.6, 0.4),
+    'roi_delivery': (0.4, 0.3, 0.3),
+}
+
+# Scenario columns each indicator reads; P/E ratios come from 'pe_<company>' columns
+INDICATOR_INPUTS = {
+    'search_trends': ['current_level', 'growth_rate'],
+    'valuation_metrics': ['pe_ratios'],
+    'sentiment_analysis': ['fund_manager_bubble_pct', 'expert_warnings', 'media_mentions'],
+    'vc_funding': ['quarterly_investment', 'yoy_growth'],
+    'market_concentration': ['top7_market_share', 'ai_exposure_pct'],
+    'roi_delivery': ['project_failure_rate', 'paid_user_pct', 'revenue_multiple'],
+}
+
+
+def ladder(values, bounds_scores):
+    """
+    Score of each value on a threshold ladder; NaN lands on the top rung, as
+    it falls through every `<` test of the scalar code
+    """
+    bounds, scores = bounds_scores
+    return np.asarray(scores, dtype=np.float64)[np.searchsorted(bounds, values, side='right')]
+
+
+def label(values, labels_bounds):
+    """
+    Label of each value on a ladder of lower bounds, as a Categorical (one
+    byte per scenario rather than one string)
+    """
+    labels, bounds = labels_bounds
+    return pd.Categorical.from_codes(np.searchsorted(bounds, values, side='right'), labels)
+
+
+def search_trend_scores(current_level, growth_rate, weights=SUB_WEIGHTS['search_trends']):
+    level_score = np.minimum(np.asarray(current_level, dtype=np.float64) / 100 * 100, 100)
+    return level_score * weights[0] + ladder(growth_rate, SEARCH_GROWTH_LADDER) * weights[1]
+
+
+def valuation_scores(pe_ratios):
+    """
+    pe_ratios: scenarios x companies; NaN companies are left out of the average
+    """
+    pe = np.atleast_2d(np.asarray(pe_ratios, dtype=np.float64))
+    deviations = np.maximum(0, (pe - HISTORICAL_PE) / HISTORICAL_PE * 100)
+    with np.errstate(invalid='ignore'):
+        return ladder(np.nanmean(deviations, axis=1), VALUATION_LADDER)
+
+
+def sentiment_scores(fund_manager_bubble_pct, expert_warnings, media_mentions,
+                     weights=SUB_WEIGHTS['sentiment_analysis']):
+    expert_score = np.minimum(np.asarray(expert_warnings, dtype=np.float64) * 10, 100)
+    return (np.asarray(fund_manager_bubble_pct, dtype=np.float64) * weights[0]
+            + expert_score * weights[1]
+            + np.asarray(media_mentions, dtype=np.float64) * weights[2])
+
+
+def vc_funding_scores(quarterly_investment, yoy_growth, weights=SUB_WEIGHTS['vc_funding']):
+    return (ladder(quarterly_investment, VC_INVESTMENT_LADDER) * weights[0]
+            + ladder(yoy_growth, VC_GROWTH_LADDER) * weights[1])
+
+
+def concentration_scores(top7_market_share, ai_exposure_pct,
+                         weights=SUB_WEIGHTS['market_concentration']):
+    ai_score = np.minimum(np.asarray(ai_exposure_pct, dtype=np.float64) * 2, 100)
+    return ladder(top7_market_share, CONCENTRATION_LADDER) * weights[0] + ai_score * weights[1]
+
+
+def roi_scores(project_failure_rate, paid_user_pct, revenue_multiple,
+               weights=SUB_WEIGHTS['roi_delivery']):
+    return (np.asarray(project_failure_rate, dtype=np.float64) * weights[0]
+            + (100 - np.asarray(paid_user_pct, dtype=np.float64)) * weights[1]
+            + ladder(revenue_multiple, REVENUE_MULTIPLE_LADDER) * weights[2])
+
+
+SCORERS = {
+    'search_trends': search_trend_scores,
+    'valuation_metrics': valuation_scores,
+    'sentiment_analysis': sentiment_scores,
+    'vc_funding': vc_funding_scores,
+    'market_concentration': concentration_scores,
+    'roi_delivery': roi_scores,
+}
+
+
+def require_pe_inputs(defaults):
+    """
+    Scenarios vary valuation through the P/E ratios; a monitor scoring a
+    whole universe (use_universe) has no vectorised counterpart here
+    """
+    if defaults['valuation_metrics'].get('universe') is not None:
+        raise ValueError("valuation is scored from a universe; scenarios and sensitivity "
+                         "need the pe_ratios inputs (set_inputs('valuation_metrics', universe=None))")
+
+
+def _pe_matrix(pe_columns, n, defaults, has_pe_ratios):
+    """
+    Scenarios x companies P/E ratios: the default pe_ratios dict in every row,
+    with the companies given as 'pe_<company>' columns overridden
+    """
+    if has_pe_ratios:
+        raise ValueError("give P/E ratios as 'pe_<company>' columns or as 'pe_ratios', not both")
+    default = defaults['valuation_metrics']['pe_ratios']
+    if not isinstance(default, dict):
+        raise ValueError("'pe_<company>' columns need the default pe_ratios as a {company: P/E} dict")
+    unknown = set(pe_columns) - set(default)
+    if unknown:
+        raise KeyError(f"unknown P/E companies {sorted('pe_' + name for name in unknown)}; "
+                       f"the defaults have {['pe_' + name for name in default]}")
+    pe = np.empty((n, len(default)), dtype=np.float64)
+    for i, (company, value) in enumerate(default.items()):
+        pe[:, i] = pe_columns.get(company, value)
+    return pe
+
+
+def _columns(scenarios, defaults):
+    """
+    Every input as a float array (P/E ratios as rows x companies): the
+    scenario's own column where given, else the default as a scalar (one P/E
+    row), and the number of scenarios. Scores of inputs left at their defaults
+    are computed once and broadcast.
+    """
+    require_pe_inputs(defaults)
+    if isinstance(scenarios, pd.DataFrame):
+        columns = {name: scenarios[name].to_numpy() for name in scenarios.columns}
+        index = scenarios.index
+    else:
+        columns = {name: np.asarray(value) for name, value in dict(scenarios).items()}
+        index = None
+
+    n = max((len(value) for value in columns.values() if np.ndim(value)), default=1)
+    pe_columns = {name[3:]: columns.pop(name) for name in list(columns)
+                  if name.startswith('pe_') and name != 'pe_ratios'}
+    if pe_columns:
+        columns['pe_ratios'] = _pe_matrix(pe_columns, n, defaults, 'pe_ratios' in columns)
+    elif 'pe_ratios' in columns and columns['pe_ratios'].dtype == object:
+        columns['pe_ratios'] = pd.DataFrame(list(columns['pe_ratios'])).to_numpy(dtype=np.float64)
+
+    inputs = {}
+    for indicator, names in INDICATOR_INPUTS.items():
+        for name in names:
+            value = columns.get(name, defaults[indicator][name])
+            if name == 'pe_ratios':
+                if isinstance(value, dict):
+                    value = list(value.values())
+                inputs[name] = np.atleast_2d(np.asarray(value, dtype=np.float64))
+            else:
+                inputs[name] = np.asarray(value, dtype=np.float64)
+    unknown = set(columns) - set(inputs)
+    if unknown:
+        raise KeyError(f"unknown scenario inputs {sorted(unknown)}")
+    return inputs, n, index if index is not None else pd.RangeIndex(n, name='scenario')
+
+
+def indicator_scores(inputs, n, sub_weights=None):
+    """
+    {indicator: n scores} from _columns-style inputs; sub_weights overrides
+    SUB_WEIGHTS per indicator (scalars or arrays over the scenarios)
+    """
+    scores = {}
+    for indicator, scorer in SCORERS.items():
+        args = [inputs[name] for name in INDICATOR_INPUTS[indicator]]
+        if sub_weights and indicator in sub_weights:
+            args.append(sub_weights[indicator])
+        scores[indicator] = np.broadcast_to(scorer(*args), (n,))
+    return scores
+
+
+def score_scenarios(scenarios, weights, defaults, interpret=False):
+    """
+    Indicator scores, composite, bubble probability, phase and risk level of
+    every scenario
+
+    scenarios is a DataFrame (one row per scenario) or a dict of arrays
+    and scalars, keyed by the calculate_* argument names. P/E ratios are
+    given as 'pe_<company>' columns, which override those companies in the
+    default pe_ratios, or as a 'pe_ratios' scenarios x companies array.
+    Inputs left out take their value from defaults
+    ({indicator: {argument: value}}, see AIBubbleMonitor.scenario_defaults).
+    The composite adds the weighted indicators in the monitor's order, so each
+    row equals the monitor's calculate_composite_score with those inputs.
+    interpret=True adds each indicator's interpretation label.
+    """
+    inputs, n, index = _columns(scenarios, defaults)
+    scores = indicator_scores(inputs, n)
+    table = pd.DataFrame(index=index)
+    composite = 0.0
+    for indicator, weight in weights.items():
+        if indicator not in scores:
+            raise KeyError(f"no vectorised scorer for indicator {indicator!r}; "
+                           f"scenarios cover {list(SCORERS)}")
+        score = scores[indicator]
+        table[indicator] = score
+        composite = composite + score * weight
+        if interpret:
+            table[f'{indicator}_interpretation'] = label(score, INTERPRETATIONS)
+    table['composite'] = composite
+    table['bubble_probability'] = np.minimum(composite * 1.1, 99)
+    table['phase'] = label(composite, PHASES)
+    table['risk'] = label(composite, RISK_LEVELS)
+    return table
+
+
+def grid(**axes):
+    """
+    Every combination of the given input values, one scenario per row, e.g.
+    grid(quarterly_investment=np.arange(0, 150, 5), yoy_growth=[0, 50, 100])
+    """
+    names = list(axes)
+    values = [np.asarray(axes[name]) for name in names]
+    mesh = np.meshgrid(*values, indexing='ij')
+    return pd.DataFrame({name: m.ravel() for name, m in zip(names, mesh)})
+
+
+def random_scenarios(n, ranges, seed=0):
+    """
+    n scenarios drawn uniformly from {input: (low, high)}, for Monte Carlo sweeps
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({name: rng.uniform(low, high, n) for name, (low, high) in ranges.items()})
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Composite Score History
+Append-only SQLite store of AIBubbleMonitor snapshots (composite, phase and
+every indicator's score and details) per universe, indexed by timestamp and
+indicator so range, latest and downsampled queries stay fast at millions of rows
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_UNIVERSE = 'default'
+AGGREGATES = {'mean': 'AVG', 'min': 'MIN', 'max': 'MAX', 'count': 'COUNT'}
+
+# Timestamps are UTC nanoseconds, so they round-trip through pandas exactly.
+# scores is clustered on (indicator, universe, ts): a range of one indicator
+# is a contiguous read. series lists the indicators seen per universe, so
+# queries never scan scores to find them.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    universe TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    composite REAL NOT NULL,
+    phase TEXT
+);
+CREATE INDEX IF NOT EXISTS snapshots_universe_ts ON snapshots (universe, ts);
+CREATE TABLE IF NOT EXISTS scores (
+    indicator TEXT NOT NULL,
+    universe TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    snapshot INTEGER NOT NULL,
+    score REAL NOT NULL,
+    details TEXT,
+    PRIMARY KEY (indicator, universe, ts, snapshot)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS series (
+    universe TEXT NOT NULL,
+    indicator TEXT NOT NULL,
+    PRIMARY KEY (universe, indicator)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS snapshots_no_update BEFORE UPDATE ON snapshots
+BEGIN SELECT RAISE(ABORT, 'score history is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS snapshots_no_delete BEFORE DELETE ON snapshots
+BEGIN SELECT RAISE(ABORT, 'score history is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS scores_no_update BEFORE UPDATE ON scores
+BEGIN SELECT RAISE(ABORT, 'score history is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS scores_no_delete BEFORE DELETE ON scores
+BEGIN SELECT RAISE(ABORT, 'score history is append-only'); END;
+"""
+
+
+def _ns(timestamp):
+    """
+    UTC nanoseconds of a timestamp (naive ones are taken as UTC; None is now)
+    """
+    ts = pd.Timestamp.now(tz='UTC') if timestamp is None else pd.Timestamp(timestamp)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return ts.value
+
+
+def _plain(value):
+    # numpy scalars in indicator details (e.g. np.mean results) as JSON numbers
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+_ENCODER = json.JSONEncoder(default=_plain)
+
+
+class ScoreHistory:
+    """
+    Snapshots of the monitor's composite and indicators, one SQLite file
+
+    Rows are only ever added: triggers reject updates and deletes, so a
+    history can be trusted as an audit trail. Appends commit in one
+    transaction per call (append_many for bulk loads), and the file runs in
+    WAL mode so readers never block the monitor writing.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM snapshots').fetchone()[0]
+
+    def append_many(self, snapshots):
+        """
+        Add snapshots, each a dict of indicators ({name: indicator dict with
+        'score'}), composite and optionally phase, timestamp and universe;
+        returns their ids
+        """
+        snapshot_rows, score_rows, series = [], [], set()
+        with self.conn:
+            # Taking the write lock first makes the id block ours alone
+            self.conn.execute('BEGIN IMMEDIATE')
+            next_id = self.conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM snapshots').fetchone()[0]
+            for snapshot_id, snapshot in enumerate(snapshots, start=next_id):
+                universe = snapshot.get('universe', DEFAULT_UNIVERSE)
+                ts = _ns(snapshot.get('timestamp'))
+                snapshot_rows.append((snapshot_id, universe, ts, float(snapshot['composite']),
+                                      snapshot.get('phase')))
+                for name, indicator in snapshot['indicators'].items():
+                    details = {key: value for key, value in indicator.items() if key != 'score'}
+                    score_rows.append((name, universe, ts, snapshot_id, float(indicator['score']),
+                                       _ENCODER.encode(details)))
+                    series.add((universe, name))
+            self.conn.executemany('INSERT INTO snapshots (id, universe, ts, composite, phase) '
+                                  'VALUES (?, ?, ?, ?, ?)', snapshot_rows)
+            self.conn.executemany('INSERT INTO scores (indicator, universe, ts, snapshot, score, details) '
+                                  'VALUES (?, ?, ?, ?, ?, ?)', score_rows)
+            self.conn.executemany('INSERT OR IGNORE INTO series (universe, indicator) VALUES (?, ?)',
+                                  sorted(series))
+        return [row[0] for row in snapshot_rows]
+
+    def append(self, indicators, composite, phase=None, timestamp=None, universe=DEFAULT_UNIVERSE):
+        """
+        Add one snapshot; returns its id
+        """
+        return self.append_many([{'indicators': indicators, 'composite': composite, 'phase': phase,
+                                  'timestamp': timestamp, 'universe': universe}])[0]
+
+    def record(self, monitor, composite=None, timestamp=None, universe=DEFAULT_UNIVERSE):
+        """
+        Add the monitor's current indicators and composite (computed if not given)
+        """
+        if composite is None:
+            composite = monitor.calculate_composite_score()
+        return self.append(monitor.indicators, composite, monitor.get_bubble_phase(composite),
+                           timestamp, universe)
+
+    def universes(self):
+        return [row[0] for row in self.conn.execute('SELECT DISTINCT universe FROM series')]
+
+    def _window(self, start, end):
+        lo = _ns(start) if start is not None else np.iinfo(np.int64).min
+        hi = _ns(end) if end is not None else np.iinfo(np.int64).max
+        return lo, hi
+
+    def _wide(self, snapshots, scores):
+        """
+        One row per snapshot (key, ts, composite, phase) with a column per
+        indicator, its scores (indicator, key, score) joined on the key: the
+        snapshot id, so snapshots sharing a timestamp stay apart
+        """
+        frame = pd.DataFrame(snapshots, columns=['key', 'ts', 'composite', 'phase'])
+        long = pd.DataFrame(scores, columns=['indicator', 'key', 'score'])
+        if len(long):
+            frame = frame.merge(long.pivot(index='key', columns='indicator', values='score')
+                                [list(dict.fromkeys(long['indicator']))].reset_index(),
+                                on='key', how='left')
+        frame['ts'] = pd.to_datetime(frame['ts'], utc=True)
+        frame.columns.name = None
+        return frame.drop(columns='key').set_index('ts')
+
+    def range(self, start=None, end=None, universe=DEFAULT_UNIVERSE, indicators=None):
+        """
+        Snapshots with start <= timestamp <= end, one row each: composite,
+        phase and the score of every indicator (or just `indicators`)
+        """
+        lo, hi = self._window(start, end)
+        snapshots = self.conn.execute(
+            'SELECT id, ts, composite, phase FROM snapshots WHERE universe = ? AND ts BETWEEN ? AND ? '
+            'ORDER BY ts, id', (universe, lo, hi)).fetchall()
+        names = indicators if indicators is not None else self._indicators(universe)
+        scores = []
+        for name in names:
+            scores += self.conn.execute(
+                'SELECT indicator, snapshot, score FROM scores '
+                'WHERE indicator = ? AND universe = ? AND ts BETWEEN ? AND ? ORDER BY ts, snapshot',
+                (name, universe, lo, hi)).fetchall()
+        return self._wide(snapshots, scores)
+
+    def latest(self, universe=DEFAULT_UNIVERSE, details=False):
+        """
+        The newest snapshot of a universe as a Series (composite, phase,
+        indicator scores), or None when it has none; details=True returns
+        the full indicators dicts as well
+        """
+        row = self.conn.execute(
+            'SELECT id, ts, composite, phase FROM snapshots WHERE universe = ? '
+            'ORDER BY ts DESC, id DESC LIMIT 1', (universe,)).fetchone()
+        if row is None:
+            return None
+        snapshot_id, ts, composite, phase = row
+        scores = []
+        for name in self._indicators(universe):
+            scores += self.conn.execute(
+                'SELECT indicator, score, details FROM scores '
+                'WHERE indicator = ? AND universe = ? AND ts = ? AND snapshot = ?',
+                (name, universe, ts, snapshot_id)).fetchall()
+        latest = pd.Series({'composite': composite, 'phase': phase,
+                            **{name: score for name, score, _ in scores}},
+                           name=pd.Timestamp(ts, tz='UTC'))
+        if details:
+            return latest, {name: {'score': score, **json.loads(text)} for name, score, text in scores}
+        return latest
+
+    def downsample(self, freq, start=None, end=None, universe=DEFAULT_UNIVERSE, how='mean',
+                   indicators=None):
+        """
+        Composite and indicator scores aggregated into freq buckets (e.g.
+        '1h', '1D'), computed inside SQLite over the index: mean, min, max
+        or count per bucket, labelled by bucket start
+        """
+        if how not in AGGREGATES:
+            raise ValueError(f"how must be one of {list(AGGREGATES)}, got {how!r}")
+        bucket = pd.Timedelta(freq).value
+        agg = AGGREGATES[how]
+        lo, hi = self._window(start, end)
+        # Buckets are both the join key and the timestamp
+        snapshots = [(row[0],) + row for row in self.conn.execute(
+            f'SELECT (ts / ?) * ? AS bucket, {agg}(composite), NULL FROM snapshots '
+            'WHERE universe = ? AND ts BETWEEN ? AND ? GROUP BY bucket ORDER BY bucket',
+            (bucket, bucket, universe, lo, hi))]
+        names = indicators if indicators is not None else self._indicators(universe)
+        scores = []
+        for name in names:
+            scores += self.conn.execute(
+                f'SELECT indicator, (ts / ?) * ? AS bucket, {agg}(score) FROM scores '
+                'WHERE indicator = ? AND universe = ? AND ts BETWEEN ? AND ? GROUP BY bucket',
+                (bucket, bucket, name, universe, lo, hi)).fetchall()
+        return self._wide(snapshots, scores).drop(columns='phase')
+
+    def _indicators(self, universe):
+        return [row[0] for row in self.conn.execute(
+            'SELECT indicator FROM series WHERE universe = ?', (universe,))]
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Search-Trend Inputs from the Trends Data
+Derives the monitor's search_trends inputs (current level and year-over-year
+growth of the yearly average) from the loaded Google Trends frame with the v1
+aggregate pyramid, cached per dataset version and extended week by week
+when an export only gains new weeks
+"""
+
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+V1_DIR = str(Path(__file__).resolve().parents[1] / 'v1')
+if V1_DIR not in sys.path:
+    sys.path.insert(0, V1_DIR)
+
+from aggregate_pyramid import AggregatePyramid
+from batch_scoring import period_growth
+
+TERM = 'ai_bubble'
+# Columns of the bundled export, in order (as in the v1 scripts)
+TERMS = ['ai_bubble', 'ai_startup', 'prompt_engineering', 'ai_roadmap', 'langchain']
+
+
+def series_digest(series):
+    """
+    Content hash of a weekly series, weeks included: the dataset version
+    """
+    return hashlib.sha1(pd.util.hash_pandas_object(series, index=True).to_numpy().tobytes()).hexdigest()
+
+
+def inputs_from_pyramid(pyramid, current_level, term=TERM):
+    """
+    calculate_search_trend_score inputs: the latest week's level, and the
+    growth of this calendar year's average over last year's (the refined
+    year-over-year section), both rounded to whole numbers as the
+    hand-copied defaults were
+    """
+    years = pyramid.frame('year', names=[term])[term]
+    growth = period_growth(years.to_numpy())[-1] if len(years) > 1 else np.nan
+    return {'current_level': int(round(current_level)),
+            'growth_rate': int(round(growth)) if np.isfinite(growth) else float(growth)}
+
+
+class SearchTrendFeed:
+    """
+    search_trends inputs for AIBubbleMonitor, kept current from the data
+
+    The aggregate pyramid behind them is saved under cache_dir (default: the
+    Trends cache) together with the dataset version it was built from. The
+    same data again costs one hash. Data that extends the cached weeks
+    unchanged folds in only the new weeks (pyramid.update). Anything else is
+    a rebuild.
+    """
+
+    def __init__(self, cache_dir=None, term=TERM):
+        if cache_dir is None:
+            from trends_loader import CACHE_DIR
+            cache_dir = CACHE_DIR
+        self.cache_dir = Path(cache_dir) / 'monitor'
+        self.term = term
+        self._memo = None                # (version, inputs) of the last call
+
+    @property
+    def _pyramid_path(self):
+        return self.cache_dir / f'search_{self.term}.npz'
+
+    @property
+    def _meta_path(self):
+        return self.cache_dir / f'search_{self.term}.json'
+
+    def _read_meta(self):
+        try:
+            with open(self._meta_path) as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, pyramid, meta):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            pyramid.save(self._pyramid_path)
+            tmp = self._meta_path.with_suffix('.tmp')
+            with open(tmp, 'w') as fh:
+                json.dump(meta, fh)
+            tmp.replace(self._meta_path)
+        except OSError:
+            # A read-only cache location should never break the dashboard
+            pass
+
+    def inputs(self, df=None):
+        """
+        {'current_level', 'growth_rate'} for the given Trends frame (default:
+        load_terms of the bundled export or $TRENDS_STORE)
+        """
+        if df is None:
+            from trends_store import load_terms
+            df = load_terms(TERMS)
+        series = df[self.term].astype(np.float64).dropna()
+        version = series_digest(series)
+        if self._memo is not None and self._memo[0] == version:
+            return dict(self._memo[1])
+
+        meta = self._read_meta()
+        if meta is not None and meta['version'] == version:
+            inputs = meta['inputs']
+        else:
+            pyramid = self._extend(series, meta)
+            if pyramid is None:
+                pyramid = AggregatePyramid.from_frame(series.to_frame(self.term))
+            inputs = inputs_from_pyramid(pyramid, series.iloc[-1], self.term)
+            self._write(pyramid, {'version': version, 'last_week': str(series.index[-1]),
+                                  'inputs': inputs})
+        self._memo = (version, inputs)
+        return dict(inputs)
+
+    def _extend(self, series, meta):
+        """
+        The cached pyramid with the weeks after its last one folded in, or
+        None when the cached weeks were changed or there is no cache
+        """
+        if meta is None or not self._pyramid_path.exists():
+            return None
+        last_week = pd.Timestamp(meta['last_week'])
+        if last_week not in series.index or series_digest(series[:last_week]) != meta['version']:
+            return None
+        try:
+            pyramid = AggregatePyramid.load(self._pyramid_path)
+        except (OSError, ValueError, KeyError):
+            return None
+        new = series[series.index > last_week]
+        for week, value in new.items():
+            pyramid.update(week, [value])
+        return pyramid
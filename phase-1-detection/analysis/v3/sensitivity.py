@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Global Sensitivity of the Composite Score
+Sobol first-order and total indices of AIBubbleMonitor's composite for every
+input, indicator weight and component weight, estimated from batched
+scenario_grid evaluations spread over a process pool within a time budget
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+import pandas as pd
+
+from scenario_grid import INDICATOR_INPUTS, SUB_WEIGHTS, indicator_scores, require_pe_inputs
+
+SPREAD = 0.5             # parameters vary over nominal * (1 +/- SPREAD)
+BUDGET_SECONDS = 10.0
+BASE_SAMPLES = 1024      # Saltelli base rows per task; a task evaluates BASE_SAMPLES * (d + 2) scenarios
+# Inputs on a 0-100 scale, whose ranges are clipped to it
+PERCENT_INPUTS = {'current_level', 'fund_manager_bubble_pct', 'media_mentions', 'top7_market_share',
+                  'ai_exposure_pct', 'project_failure_rate', 'paid_user_pct'}
+
+
+def parameter_space(monitor, spread=SPREAD, ranges=None):
+    """
+    One row per uncertain parameter: kind ('input', 'weight' or
+    'sub_weight'), the indicator it belongs to, the input it scales (for
+    sub-weights), its nominal value and its low/high range
+
+    Inputs are the monitor's current ones (scenario_defaults), one parameter
+    per company for P/E ratios; ranges ({parameter: (low, high)}) overrides
+    the default nominal +/- spread.
+    """
+    defaults = monitor.scenario_defaults()
+    require_pe_inputs(defaults)
+    rows = []
+    for indicator, names in INDICATOR_INPUTS.items():
+        for name in names:
+            value = defaults[indicator][name]
+            if name == 'pe_ratios':
+                rows.extend(('input', f'pe_{company}', indicator, None, pe)
+                            for company, pe in dict(value).items())
+            else:
+                rows.append(('input', name, indicator, None, value))
+    for indicator, weight in monitor.weights.items():
+        rows.append(('weight', f'weight:{indicator}', indicator, None, weight))
+    for indicator, weights in SUB_WEIGHTS.items():
+        for name, weight in zip(INDICATOR_INPUTS[indicator], weights):
+            rows.append(('sub_weight', f'weight:{indicator}/{name}', indicator, name, weight))
+
+    space = pd.DataFrame(rows, columns=['kind', 'parameter', 'indicator', 'component', 'nominal'])
+    space = space.set_index('parameter')
+    nominal = space['nominal'].astype(np.float64)
+    space['low'] = nominal * (1 - spread)
+    space['high'] = nominal * (1 + spread)
+    percent = space.index.isin(PERCENT_INPUTS)
+    space.loc[percent, 'low'] = space.loc[percent, 'low'].clip(0, 100)
+    space.loc[percent, 'high'] = space.loc[percent, 'high'].clip(0, 100)
+    for name, (low, high) in (ranges or {}).items():
+        space.loc[name, ['low', 'high']] = low, high
+    return space
+
+
+def composite_scores(X, space):
+    """
+    Composite of every row of X (rows x parameters, in space's order)
+
+    Indicator weights are renormalised to sum to one, as are the component
+    weights within each indicator, so a parameter moves the relative
+    emphasis rather than inflating the scale.
+    """
+    n = len(X)
+    columns = dict(zip(space.index, X.T))
+    inputs = {}
+    for indicator, names in INDICATOR_INPUTS.items():
+        for name in names:
+            if name == 'pe_ratios':
+                companies = [p for p in space.index if p.startswith('pe_')]
+                inputs[name] = np.column_stack([columns[p] for p in companies])
+            else:
+                inputs[name] = columns[name]
+
+    sub_weights = {}
+    for indicator in SUB_WEIGHTS:
+        parts = [columns[f'weight:{indicator}/{name}'] for name in INDICATOR_INPUTS[indicator]]
+        total = sum(parts)
+        sub_weights[indicator] = [part / total for part in parts]
+    scores = indicator_scores(inputs, n, sub_weights)
+
+    weights = {indicator: columns[f'weight:{indicator}'] for indicator in scores}
+    total = sum(weights.values())
+    return sum(scores[indicator] * (weight / total) for indicator, weight in weights.items())
+
+
+def _sobol_chunk(space, chunk, base_samples, seed):
+    """
+    Worker side: Saltelli design for one chunk of base rows, returned as sums
+    that add up across chunks
+
+    Rows depend only on (seed, chunk), so the estimate for a given number of
+    chunks is the same however they were spread over workers.
+    """
+    rng = np.random.default_rng([seed, chunk])
+    d = len(space)
+    low, high = space['low'].to_numpy(np.float64), space['high'].to_numpy(np.float64)
+    A = low + (high - low) * rng.random((base_samples, d))
+    B = low + (high - low) * rng.random((base_samples, d))
+    # A, B, then A with column i taken from B, for every i: one evaluation pass
+    AB = np.repeat(A[None], d, axis=0)
+    AB[np.arange(d), :, np.arange(d)] = B.T
+    f = composite_scores(np.concatenate([A, B, AB.reshape(-1, d)]), space)
+    # Measured from the nominal score: same expectations, far less noise in the S1 sums
+    f = f - composite_scores(space['nominal'].to_numpy(np.float64)[None, :], space)[0]
+    fA, fB, fAB = f[:base_samples], f[base_samples:2 * base_samples], f[2 * base_samples:].reshape(d, -1)
+    both = np.concatenate([fA, fB])
+    return {'n': base_samples, 'sum': both.sum(), 'sum_sq': (both ** 2).sum(),
+            'first': (fB * (fAB - fA)).sum(axis=1), 'total': ((fA - fAB) ** 2).sum(axis=1)}
+
+
+def _indices(parts):
+    n = sum(p['n'] for p in parts)
+    mean = sum(p['sum'] for p in parts) / (2 * n)
+    variance = (sum(p['sum_sq'] for p in parts) / (2 * n) - mean ** 2) * 2 * n / (2 * n - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        first = sum(p['first'] for p in parts) / n / variance
+        total = sum(p['total'] for p in parts) / (2 * n) / variance
+    return first, total, mean, variance
+
+
+def sobol_indices(monitor, spread=SPREAD, ranges=None, budget=BUDGET_SECONDS, max_evaluations=None,
+                  base_samples=BASE_SAMPLES, workers=None, seed=0):
+    """
+    Ranked table of first-order (S1) and total (ST) Sobol indices of the
+    composite score for every parameter of parameter_space, with standard
+    errors across chunks
+
+    Saltelli sampling with the Saltelli (2010) first-order and Jansen total
+    estimators. Chunks of base_samples rows are scored in one scenario_grid
+    pass each, on `workers` processes (default: one per CPU; 1 runs
+    in-process). New chunks start until `budget` seconds have passed or
+    max_evaluations composites have been computed, and at least two always
+    run. ST ranks what moves the score at all, interactions included; S1 is
+    the share of its variance a parameter explains alone.
+    """
+    space = parameter_space(monitor, spread, ranges)
+    d = len(space)
+    per_chunk = base_samples * (d + 2)
+    max_chunks = max(2, max_evaluations // per_chunk) if max_evaluations else None
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    results = {}
+
+    def more(submitted):
+        if submitted < 2:
+            return True
+        if max_chunks is not None and submitted >= max_chunks:
+            return False
+        return time.perf_counter() - start < budget
+
+    if workers == 1:
+        while more(len(results)):
+            results[len(results)] = _sobol_chunk(space, len(results), base_samples, seed)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            running, submitted = {}, 0
+            while running or more(submitted):
+                while len(running) < workers and more(submitted):
+                    running[pool.submit(_sobol_chunk, space, submitted, base_samples, seed)] = submitted
+                    submitted += 1
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+    parts = [results[chunk] for chunk in sorted(results)]
+
+    first, total, mean, variance = _indices(parts)
+    per_chunk_indices = [_indices([part])[:2] for part in parts]
+    first_se = np.std([p[0] for p in per_chunk_indices], axis=0, ddof=1) / np.sqrt(len(parts))
+    total_se = np.std([p[1] for p in per_chunk_indices], axis=0, ddof=1) / np.sqrt(len(parts))
+
+    table = space[['kind', 'indicator', 'nominal', 'low', 'high']].copy()
+    table['S1'], table['S1_se'] = first, first_se
+    table['ST'], table['ST_se'] = total, total_se
+    table = table.sort_values('ST', ascending=False)
+    table.insert(0, 'rank', np.arange(1, d + 1))
+    nominal = composite_scores(space['nominal'].to_numpy(np.float64)[None, :], space)[0]
+    table.attrs.update(n_evaluations=len(parts) * per_chunk, chunks=len(parts),
+                       seconds=time.perf_counter() - start, mean=nominal + mean, variance=variance)
+    return table
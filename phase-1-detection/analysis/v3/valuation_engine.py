@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Columnar Valuation Engine
+Scores whole equity universes (tickers with sector, P/E, P/S and market cap,
+from arrays, a DataFrame or Parquet) against per-sector historical norms,
+giving cap-weighted and equal-weighted deviation scores and a per-sector
+breakdown in one vectorised pass
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scenario_grid import VALUATION_LADDER, HISTORICAL_PE, ladder
+
+COLUMNS = ['ticker', 'sector', 'pe', 'ps', 'market_cap']
+UNCLASSIFIED = 'Unclassified'
+HISTORICAL_PS = 2.0
+WEIGHTINGS = ['equal', 'cap']
+METRICS = ['pe', 'ps']
+
+# Approximate long-run median (P/E, P/S) per sector; unclassified tickers and
+# sectors missing here fall back to the broad-market 20x earnings the monitor
+# has always used
+SECTOR_NORMS = {
+    'Technology': (22.0, 4.0),
+    'Communication Services': (20.0, 2.5),
+    'Consumer Discretionary': (21.0, 1.5),
+    'Consumer Staples': (20.0, 1.3),
+    'Healthcare': (19.0, 1.8),
+    'Financials': (14.0, 2.0),
+    'Industrials': (19.0, 1.5),
+    'Energy': (15.0, 1.0),
+    'Materials': (17.0, 1.4),
+    'Utilities': (17.0, 1.9),
+    'Real Estate': (30.0, 5.0),
+}
+DEFAULT_NORM = (float(HISTORICAL_PE), HISTORICAL_PS)
+
+
+def load_universe(source, **columns):
+    """
+    A universe as a DataFrame with the COLUMNS: from a DataFrame, a dict of
+    equal-length arrays, or a .parquet/.csv path; keyword arguments map
+    COLUMNS to the source's names (e.g. market_cap='mktcap_usd')
+
+    Only ticker and pe are required. A missing sector is Unclassified, a
+    missing P/S is NaN and a missing market cap weighs every ticker equally.
+    """
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        wanted = [columns.get(name, name) for name in COLUMNS]
+        if path.suffix == '.parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            present = set(pq.read_schema(path).names)
+            # Sectors decode straight to a Categorical and tickers stay Arrow
+            # strings: no Python object per row, which dominates at millions
+            table = pq.read_table(path, columns=[name for name in wanted if name in present],
+                                  read_dictionary=list({columns.get('sector', 'sector')} & present))
+            df = table.to_pandas(types_mapper=lambda t: pd.ArrowDtype(t) if pa.types.is_string(t)
+                                 or pa.types.is_large_string(t) else None)
+        else:
+            df = pd.read_csv(path, usecols=lambda name: name in wanted)
+    elif isinstance(source, pd.DataFrame):
+        if not columns and list(source.columns) == COLUMNS and isinstance(source['sector'].dtype,
+                                                                            pd.CategoricalDtype):
+            return source                # already a universe
+        df = source
+    else:
+        df = pd.DataFrame(source)
+    df = df.rename(columns={source_name: name for name, source_name in columns.items()})
+
+    missing = {'ticker', 'pe'} - set(df.columns)
+    if missing:
+        raise KeyError(f"universe is missing required columns {sorted(missing)}")
+    universe = pd.DataFrame({'ticker': df['ticker'].array})
+    sector = df['sector'] if 'sector' in df else pd.Series(UNCLASSIFIED, index=df.index)
+    sector = pd.Categorical(sector)
+    if (sector.codes < 0).any():
+        if UNCLASSIFIED not in sector.categories:
+            sector = sector.add_categories([UNCLASSIFIED])
+        sector = sector.fillna(UNCLASSIFIED)
+    universe['sector'] = sector
+    for name in ['pe', 'ps']:
+        universe[name] = df[name].to_numpy(dtype=np.float64) if name in df else np.nan
+    universe['market_cap'] = df['market_cap'].to_numpy(dtype=np.float64) if 'market_cap' in df else 1.0
+    return universe
+
+
+def _norm_table(categories, norms=None):
+    # (P/E, P/S) per category, then the default for missing sectors (code -1)
+    norms = SECTOR_NORMS if norms is None else norms
+    return np.array([norms.get(sector, DEFAULT_NORM) for sector in categories] + [DEFAULT_NORM],
+                    dtype=np.float64).reshape(-1, 2)
+
+
+def sector_norms(sectors, norms=None):
+    """
+    Per-ticker (P/E, P/S) norm arrays for a Categorical (or array) of
+    sectors; norms ({sector: (pe, ps)}) replaces SECTOR_NORMS
+    """
+    sectors = pd.Categorical(sectors)       # a no-op for a universe's sector column
+    rows = _norm_table(sectors.categories, norms)[sectors.codes]
+    return rows[:, 0], rows[:, 1]
+
+
+def deviations(universe, norms=None):
+    """
+    Percent premium of each ticker's P/E and P/S over its sector norm,
+    floored at 0 as in AIBubbleMonitor.calculate_valuation_score
+
+    Loss-makers (P/E <= 0) and missing multiples are NaN and left out of the
+    averages for that metric.
+    """
+    pe_norm, ps_norm = sector_norms(universe['sector'], norms)
+    result = {}
+    for name, norm in [('pe', pe_norm), ('ps', ps_norm)]:
+        value = universe[name].to_numpy(dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            deviation = np.maximum(0, (value - norm) / norm * 100)
+        result[name] = np.where(value > 0, deviation, np.nan)
+    return result
+
+
+def _sums(codes, k, deviation, caps):
+    """
+    Per group: tickers with the metric, their summed deviation and their
+    cap-weighted equivalents, skipping NaN deviations
+    """
+    valid = np.isfinite(deviation)
+    value = np.where(valid, deviation, 0.0)
+    weight = np.where(valid, caps, 0.0)
+    return (np.bincount(codes, valid, k), np.bincount(codes, value, k),
+            np.bincount(codes, weight, k), np.bincount(codes, weight * value, k))
+
+
+def sector_breakdown(universe, norms=None):
+    """
+    One row per sector plus an 'All' row: ticker count, total market cap and
+    share, the sector's norms, and the equal- and cap-weighted average P/E
+    and P/S deviation with their scores on the monitor's valuation ladder
+    """
+    universe = load_universe(universe)
+    sectors = universe['sector'].array
+    codes = sectors.codes.astype(np.intp)
+    k = len(sectors.categories)
+    caps = np.nan_to_num(universe['market_cap'].to_numpy(dtype=np.float64))
+    devs = deviations(universe, norms)
+
+    table = pd.DataFrame(index=pd.Index(list(sectors.categories) + ['All'], name='sector'))
+    counts = np.bincount(codes, minlength=k).astype(np.float64)
+    cap_sum = np.bincount(codes, caps, k)
+    table['n'] = np.append(counts, counts.sum()).astype(np.int64)
+    table['market_cap'] = np.append(cap_sum, cap_sum.sum())
+    with np.errstate(invalid='ignore', divide='ignore'):
+        table['cap_share'] = table['market_cap'] / cap_sum.sum()
+    norm_rows = _norm_table(sectors.categories, norms)
+    table['pe_norm'] = np.append(norm_rows[:-1, 0], np.nan)
+    table['ps_norm'] = np.append(norm_rows[:-1, 1], np.nan)
+
+    for name in METRICS:
+        n, total, weight, weighted = (np.append(s, s.sum()) for s in _sums(codes, k, devs[name], caps))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            averages = {'equal': np.where(n > 0, total / n, np.nan),
+                        'cap': np.where(weight > 0, weighted / weight, np.nan)}
+        for weighting in WEIGHTINGS:
+            table[f'{name}_deviation_{weighting}'] = averages[weighting]
+        for weighting in WEIGHTINGS:
+            deviation = averages[weighting]
+            table[f'{name}_score_{weighting}'] = np.where(np.isfinite(deviation),
+                                                         ladder(deviation, VALUATION_LADDER), np.nan)
+    return table
+
+
+def universe_score(universe, norms=None, weighting='cap', metric='pe'):
+    """
+    The universe's valuation score, average deviation and average multiple
+    for one weighting and metric, plus the sector breakdown table
+    """
+    if weighting not in WEIGHTINGS:
+        raise ValueError(f"weighting must be one of {WEIGHTINGS}, got {weighting!r}")
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {METRICS}, got {metric!r}")
+    universe = load_universe(universe)
+    breakdown = sector_breakdown(universe, norms)
+    values = universe[metric].to_numpy(dtype=np.float64)
+    valid = values > 0
+    caps = np.nan_to_num(universe['market_cap'].to_numpy(dtype=np.float64))
+    weights = caps[valid] if weighting == 'cap' else np.ones(valid.sum())
+    average = np.average(values[valid], weights=weights) if weights.sum() > 0 else np.nan
+    return {
+        'score': breakdown.loc['All', f'{metric}_score_{weighting}'],
+        'deviation': breakdown.loc['All', f'{metric}_deviation_{weighting}'],
+        'average': average,
+        'breakdown': breakdown,
+    }
@@ -4,13 +4,29 @@ Sector Rotation Analysis During Tech Bubble Corrections
 Analyzes which sectors historically benefit when tech corrects
 """
 
+import sys
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
 
-plt.style.use('seaborn-v0_8-darkgrid')
+COMMON_DIR = str(Path(__file__).resolve().parents[2] / 'common')
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
+
+from figures import FigureJob, render_figures
+
+
+def _pyplot():
+    """
+    Import matplotlib/seaborn on first use, so the analyses stay headless
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.style.use('seaborn-v0_8-darkgrid')
+    return plt
 
 class SectorRotationAnalyzer:
     """
@@ -341,6 +357,7 @@ class SectorRotationAnalyzer:
         """
         Generate visual analysis of sector rotation
         """
+        plt = _pyplot()
         fig, axes = plt.subplots(2, 2, figsize=(15, 10))
         fig.suptitle('Sector Rotation Analysis - AI Bubble Correction',
                     fontsize=16, fontweight='bold')
@@ -428,10 +445,26 @@ class SectorRotationAnalyzer:
         return fig
 
 
-def main():
+def figure_job(analyzer, output='sector_rotation_analysis.png'):
+    """
+    analyzer.generate_visual_analysis as a FigureJob for the cached, parallel render stage
+    """
+    return FigureJob('sector_rotation_analysis', analyzer.generate_visual_analysis, output=output)
+
+
+def main(argv=None):
     """
     Run sector rotation analysis
     """
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Sector rotation analysis for an AI bubble correction')
+    parser.add_argument('--no-plot', action='store_true',
+                        help='headless run: skip the figure and never import matplotlib')
+    parser.add_argument('--output', default='sector_rotation_analysis.png',
+                        help='figure path (default: %(default)s)')
+    args = parser.parse_args(argv)
+
     analyzer = SectorRotationAnalyzer()
 
     # Run analyses
@@ -450,11 +483,10 @@ def main():
         print()
 
     # Generate and save visualization
-    print("Generating visual analysis...")
-    fig = analyzer.generate_visual_analysis()
-    output_path = 'sector_rotation_analysis.png'
-    fig.savefig(output_path, dpi=150, bbox_inches='tight')
-    print(f"Analysis saved to: {output_path}")
+    if not args.no_plot:
+        print("Generating visual analysis...")
+        render_figures([figure_job(analyzer, args.output)])
+        print(f"Analysis saved to: {args.output}")
 
     # Key takeaways
     print("\n" + "=" * 80)
@@ -0,0 +1,48 @@
+"""
+Shared test fixtures; puts the analysis directories on sys.path so the tests
+import their modules the way the scripts do
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+for directory in ['common', 'phase-1-detection/analysis/v1', 'phase-1-detection/analysis/v3']:
+    path = str(ROOT / directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture(scope='session')
+def trends():
+    """
+    The bundled Google Trends export as float64, parsed straight from the CSV
+    (no cache)
+    """
+    from trends_loader import parse_trends_csv, TRENDS_CSV
+
+    return parse_trends_csv(TRENDS_CSV).astype(np.float64)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(20251018)
+
+
+@pytest.fixture(scope='session')
+def random_export(trends):
+    """
+    Factory of random-walk exports on the bundled weeks and terms: whole
+    numbers in [floor, 100] as the exports hold
+    """
+    def make(rng, floor=1):
+        steps = rng.normal(0, 0.15, trends.shape) + rng.normal(0, 0.01, trends.shape[1])
+        level = np.exp(np.log(rng.uniform(2, 40, trends.shape[1])) + np.cumsum(steps, axis=0))
+        values = np.clip(np.round(level), floor, 100)
+        return pd.DataFrame(values, index=trends.index, columns=trends.columns)
+    return make
@@ -0,0 +1,67 @@
+"""
+Pyramid aggregates against pandas resample(), and the incremental and saved
+pyramid against one built in a single pass
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregate_pyramid import LEVELS, AggregatePyramid
+
+RULE = {'month': 'ME', 'quarter': 'QE', 'year': 'YE'}
+
+
+def with_gaps(df, rng, fraction=0.1):
+    return df.mask(rng.random(df.shape) < fraction)
+
+
+def exports(trends, random_export, rng):
+    return {'bundled': trends, 'random': random_export(rng),
+            'gapped': with_gaps(random_export(rng), rng)}
+
+
+@pytest.mark.parametrize('level', LEVELS)
+def test_frame_matches_resample(trends, random_export, rng, level):
+    for label, df in exports(trends, random_export, rng).items():
+        pyramid = AggregatePyramid.from_frame(df)
+        resampled = df.resample(RULE[level])
+        for stat in ['mean', 'std', 'max', 'count']:
+            expected = getattr(resampled, stat)().astype(np.float64)
+            pd.testing.assert_frame_equal(pyramid.frame(level, stat), expected, check_freq=False,
+                                          rtol=1e-12, obj=f'{label} {level} {stat}')
+
+
+def test_get_and_bounds(trends):
+    pyramid = AggregatePyramid.from_frame(trends)
+    years = trends.resample('YE').mean()
+    assert pyramid.get('year', 2024, 'ai_bubble') == pytest.approx(years.loc['2024', 'ai_bubble'].item())
+    pd.testing.assert_frame_equal(pyramid.frame('year', start=2022, end='2024'), years.loc['2022':'2024'],
+                                  check_freq=False, rtol=1e-12)
+    assert pyramid.get('month', '1999-01', 'ai_bubble', stat='count') == 0
+    assert np.isnan(pyramid.get('month', '1999-01', 'ai_bubble'))
+
+
+def test_update_and_save_load_match_from_frame(trends, random_export, rng, tmp_path):
+    for label, df in exports(trends, random_export, rng).items():
+        split = len(df) // 3
+        pyramid = AggregatePyramid.from_frame(df.iloc[:split])
+        for week, values in df.iloc[split:2 * split].iterrows():
+            pyramid.update(week, values)
+        pyramid.save(tmp_path / f'{label}.npz')
+        pyramid = AggregatePyramid.load(tmp_path / f'{label}.npz')
+        for week, values in df.iloc[2 * split:].iterrows():
+            pyramid.update(week, values.to_dict())
+
+        built = AggregatePyramid.from_frame(df)
+        assert pyramid.last_week == built.last_week
+        for level in LEVELS:
+            for stat in ['mean', 'std', 'max', 'count']:
+                pd.testing.assert_frame_equal(pyramid.frame(level, stat), built.frame(level, stat),
+                                              rtol=1e-10, obj=f'{label} {level} {stat}')
+
+
+def test_update_rejects_old_weeks(trends):
+    pyramid = AggregatePyramid.from_frame(trends)
+    with pytest.raises(ValueError):
+        pyramid.update(trends.index[-1], trends.iloc[-1])
@@ -0,0 +1,63 @@
+"""
+score_matrix against the ladders the two v1 scripts print, on the bundled
+export and on seeded random exports
+"""
+
+import contextlib
+import io
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ai_bubble_analysis
+import ai_bubble_refined_analysis
+from batch_scoring import TECHNICAL_TERMS, score_matrix
+
+
+def script_scores(df):
+    """
+    Headline numbers of both scripts run on df, their output discarded
+    """
+    with warnings.catch_warnings(), contextlib.redirect_stdout(io.StringIO()):
+        warnings.simplefilter('ignore')
+        _, v1 = ai_bubble_analysis.run_analysis(df.astype(np.int64))
+        _, refined = ai_bubble_refined_analysis.run_analysis(df.astype(np.int64))
+    return v1, refined
+
+
+def batch_scores(df):
+    table = score_matrix(df['ai_bubble'].to_numpy(), df[TECHNICAL_TERMS].mean(axis=1).to_numpy(),
+                         df['ai_startup'].to_numpy(), df.index)
+    return table.iloc[0]
+
+
+def check(df):
+    v1, refined = script_scores(df)
+    row = batch_scores(df)
+    assert row['bubble_score'] == v1['bubble_score']
+    assert row['trend_increase_probability'] == v1['trend_increase_probability']
+    assert row['phase'] == v1['current_phase']
+    assert row['refined_bubble_probability'] == refined['bubble_probability']
+    assert row['refined_increase_probability'] == refined['increase_probability']
+    for name, present in refined['bubble_indicators'].items():
+        assert row[name] == present, name
+
+
+def test_bundled_export(trends):
+    check(trends)
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_random_exports(random_export, seed):
+    check(random_export(np.random.default_rng(seed), floor=0 if seed % 2 else 1))
+
+
+def test_rows_match_single_series(trends, random_export, rng):
+    frames = [trends] + [random_export(rng) for _ in range(5)]
+    table = score_matrix(np.vstack([df['ai_bubble'].to_numpy() for df in frames]),
+                         np.vstack([df[TECHNICAL_TERMS].mean(axis=1).to_numpy() for df in frames]),
+                         np.vstack([df['ai_startup'].to_numpy() for df in frames]), trends.index)
+    for i, df in enumerate(frames):
+        pd.testing.assert_series_equal(table.iloc[i], batch_scores(df), check_names=False)
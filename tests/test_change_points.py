@@ -0,0 +1,76 @@
+"""
+PELT against exhaustive optimal partitioning, and the batched path against
+the per-series one
+"""
+
+import numpy as np
+import pandas as pd
+
+from change_points import pelt, pelt_matrix, segments, segments_frame, default_penalty
+
+
+def optimal_partition(x, penalty, min_size):
+    # O(n^2) optimal partitioning: the exact answer PELT's pruning must keep
+    n = len(x)
+    s1 = np.concatenate([[0.0], np.cumsum(x)])
+    s2 = np.concatenate([[0.0], np.cumsum(x * x)])
+    best = np.full(n + 1, np.inf)
+    best[0] = -penalty
+    last = np.zeros(n + 1, dtype=np.int64)
+    for end in range(min_size, n + 1):
+        for start in range(0, end - min_size + 1):
+            if start and start < min_size:
+                continue
+            length = end - start
+            total = s1[end] - s1[start]
+            value = best[start] + (s2[end] - s2[start]) - total * total / length + penalty
+            if value < best[end]:
+                best[end], last[end] = value, start
+    changes, end = [], n
+    while end > 0:
+        end = last[end]
+        if end > 0:
+            changes.append(int(end))
+    return changes[::-1]
+
+
+def cost(x, changes):
+    bounds = [0] + changes + [len(x)]
+    return sum(((x[a:b] - x[a:b].mean()) ** 2).sum() for a, b in zip(bounds[:-1], bounds[1:]))
+
+
+def test_pelt_is_optimal_on_bundled_data(trends):
+    for term in trends:
+        x = trends[term].to_numpy()
+        penalty = default_penalty(x)
+        found, exact = pelt(x), optimal_partition(x, penalty, 4)
+        assert np.isclose(cost(x, found) + penalty * len(found), cost(x, exact) + penalty * len(exact))
+
+
+def test_pelt_is_optimal_on_random_regimes(rng):
+    for _ in range(5):
+        x = np.repeat(rng.uniform(0, 100, 6), rng.integers(5, 30, 6))
+        x = x + rng.normal(0, 4, len(x))
+        penalty = default_penalty(x)
+        found, exact = pelt(x), optimal_partition(x, penalty, 4)
+        assert np.isclose(cost(x, found) + penalty * len(found), cost(x, exact) + penalty * len(exact))
+
+
+def test_matrix_matches_single_series(trends, rng):
+    values = np.vstack([trends.to_numpy().T, rng.normal(50, 10, (20, len(trends)))])
+    values[-1, 100:140] = np.nan
+    assert pelt_matrix(values, chunk_size=7) == [pelt(row) for row in values]
+
+
+def test_all_nan_series_has_one_regime():
+    index = pd.date_range('2020-01-05', periods=60, freq='W')
+    blank = np.full(60, np.nan)
+    shifted = np.r_[np.full(30, 10.0), np.full(30, 90.0)]
+    assert pelt(blank) == []
+    assert pelt_matrix(np.vstack([blank, shifted])) == [[], [30]]
+
+    table = segments(pd.Series(blank, index=index))
+    assert len(table) == 1 and table['weeks'].iloc[0] == 60 and np.isnan(table['mean'].iloc[0])
+
+    frame = segments_frame(pd.DataFrame({'blank': blank, 'shifted': shifted}, index=index))
+    assert frame.groupby('series', sort=False).size().to_dict() == {'blank': 1, 'shifted': 2}
@@ -0,0 +1,58 @@
+"""
+FFT lag correlations against pandas' shifted corr, both lag directions
+"""
+
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+import ai_bubble_analysis
+from cross_correlation import best_lags, lag_correlation_matrix
+
+LAGS = range(-52, 53)
+
+
+def pandas_matrix(target, others, lags):
+    return np.array([[target.corr(others[term].shift(lag)) for lag in lags] for term in others])
+
+
+def test_bundled_export(trends):
+    others = trends.drop(columns='ai_bubble')
+    result = lag_correlation_matrix(trends['ai_bubble'], others, lags=LAGS)
+    np.testing.assert_allclose(result.to_numpy(), pandas_matrix(trends['ai_bubble'], others, LAGS),
+                               atol=1e-9)
+
+
+# Windows stuck at the 100 ceiling have no variance; pandas warns and gives NaN
+@pytest.mark.filterwarnings('ignore:invalid value encountered:RuntimeWarning')
+def test_random_series_with_gaps(random_export, rng):
+    df = random_export(rng)
+    df = df.mask(rng.random(df.shape) < 0.05)
+    others = df.drop(columns='ai_bubble')
+    result = lag_correlation_matrix(df['ai_bubble'], others, lags=LAGS, chunk_size=2)
+    np.testing.assert_allclose(result.to_numpy(), pandas_matrix(df['ai_bubble'], others, LAGS),
+                               atol=1e-9)
+
+
+def test_trailing_terms_are_reported():
+    # y trails x by 5 weeks: the best lag is -5
+    rng = np.random.default_rng(3)
+    x = rng.normal(size=200)
+    y = np.r_[rng.normal(size=5), x[:-5]]
+    table = best_lags(lag_correlation_matrix(x, y[None, :], lags=LAGS, names=['y']))
+    assert table.loc['y', 'best_lag'] == -5 and table.loc['y', 'relation'] == 'trails'
+    assert table.loc['y', 'best_corr'] == pytest.approx(1.0)
+
+
+def test_script_scans_both_directions_within_the_series(trends):
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        lag_corr = ai_bubble_analysis.correlation_analysis(trends)['lag_correlation']
+    assert list(lag_corr.columns) == list(LAGS)
+    assert '+/-52 weeks' in out.getvalue()
+
+    short = trends.iloc[:30]
+    with contextlib.redirect_stdout(io.StringIO()):
+        lag_corr = ai_bubble_analysis.correlation_analysis(short)['lag_correlation']
+    assert list(lag_corr.columns) == list(range(-29, 30))
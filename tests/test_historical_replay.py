@@ -0,0 +1,62 @@
+"""
+The single-pass replay against the refined script re-run on truncated
+histories
+"""
+
+import contextlib
+import io
+import warnings
+
+import numpy as np
+import pytest
+
+import ai_bubble_refined_analysis
+from batch_scoring import TECHNICAL_TERMS, refined_scores
+from historical_replay import MIN_WEEKS, replay_refined
+
+
+def refined_script(df):
+    with warnings.catch_warnings(), contextlib.redirect_stdout(io.StringIO()):
+        warnings.simplefilter('ignore')
+        return ai_bubble_refined_analysis.run_analysis(df.astype(np.int64))[1]
+
+
+def check_against_script(df, table, cutoffs):
+    for week in cutoffs:
+        results = refined_script(df[:week])
+        row = table.loc[week]
+        assert row['bubble_probability'] == results['bubble_probability'], week
+        assert row['increase_probability'] == results['increase_probability'], week
+        assert row['weekly_change'] == pytest.approx(results['weekly_change']), week
+        assert row['peak_value'] == results['peak_value'], week
+        _, month_avg, phase = results['phases'][-1]
+        assert row['month_avg'] == pytest.approx(month_avg) and row['phase'] == phase, week
+
+
+def check_against_batch(df, table):
+    # Every week, including those before 2025 where the script's fixed
+    # 2024-vs-2025 comparison no longer means "last year vs this year"
+    technical = df[TECHNICAL_TERMS].mean(axis=1).to_numpy()
+    for week in table.index:
+        cut = df[:week]
+        scores = refined_scores(cut['ai_bubble'].to_numpy(), technical[:len(cut)],
+                                cut['ai_startup'].to_numpy(), cut.index)
+        assert table.loc[week, 'bubble_probability'] == scores['bubble_probability'][0], week
+        assert table.loc[week, 'increase_probability'] == scores['increase_probability'][0], week
+
+
+def test_bundled_export(trends):
+    table = replay_refined(trends)
+    since = trends.index.searchsorted(np.datetime64('2023-01-01'))
+    assert table.index[0] == trends.index[since + MIN_WEEKS - 1]
+    assert table.index[-1] == trends.index[-1]
+    check_against_script(trends, table, table.index[table.index.year == 2025])
+    check_against_batch(trends, table)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_random_exports(random_export, seed):
+    df = random_export(np.random.default_rng(seed))
+    table = replay_refined(df)
+    check_against_script(df, table, table.index[table.index.year == 2025][::4])
+    check_against_batch(df, table)
@@ -0,0 +1,25 @@
+"""
+Every analysis module imports headless and within the import-time budget
+"""
+
+import pytest
+
+import import_budget
+
+
+@pytest.fixture(scope='module')
+def results():
+    return import_budget.check()
+
+
+def test_every_module_is_measured(results):
+    assert [module for module, _, _, _ in results] == [module for _, module in import_budget.MODULES]
+
+
+def test_no_plotting_or_scipy_at_import(results):
+    assert {module: loaded for module, _, loaded, _ in results if loaded} == {}
+
+
+def test_within_budget(results):
+    over = {module: round(ms, 1) for module, ms, _, _ in results if ms > import_budget.BUDGET_MS}
+    assert over == {}
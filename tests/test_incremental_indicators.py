@@ -0,0 +1,80 @@
+"""
+Indicators streamed one week at a time against the batch pandas definitions,
+on the bundled export and on NaN-gapped data
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from incremental_indicators import HISTORY, INDICATORS, IndicatorState
+
+
+def batch(df):
+    """
+    {indicator: weeks x series frame}, as the v1 scripts compute them
+    """
+    momentum_1m = df.diff(4)
+    return {'value': df,
+            'rolling_mean': df.rolling(4).mean(),
+            'rolling_std': df.rolling(4).std(),
+            'momentum_1m': momentum_1m,
+            'momentum_3m': df.diff(13),
+            'acceleration': momentum_1m.diff(4),
+            'ma4': df.rolling(4).mean(),
+            'ma13': df.rolling(13).mean()}
+
+
+def stream(state, df):
+    """
+    {indicator: weeks x series frame} of update() returns
+    """
+    weeks = [state.update(row, week=week) for week, row in df.iterrows()]
+    return {name: pd.DataFrame([w[name].to_numpy() for w in weeks], index=df.index, columns=df.columns)
+            for name in INDICATORS}
+
+
+def assert_matches(streamed, expected, label):
+    for name in INDICATORS:
+        pd.testing.assert_frame_equal(streamed[name], expected[name].iloc[-len(streamed[name]):],
+                                      check_freq=False, rtol=1e-9, atol=1e-9, obj=f'{label} {name}')
+
+
+def datasets(trends, random_export, rng):
+    gapped = random_export(rng)
+    gapped = gapped.mask(rng.random(gapped.shape) < 0.05)
+    gapped.iloc[100:103, 0] = np.nan          # a gap longer than the short windows
+    return {'bundled': trends, 'gapped': gapped}
+
+
+def test_streaming_matches_batch(trends, random_export, rng):
+    for label, df in datasets(trends, random_export, rng).items():
+        assert_matches(stream(IndicatorState(df.columns), df), batch(df), label)
+
+
+def test_warm_start_and_snapshots_continue_the_stream(trends, random_export, rng, tmp_path):
+    for label, df in datasets(trends, random_export, rng).items():
+        split = len(df) // 2
+        expected = batch(df)
+
+        state = IndicatorState.from_history(df.iloc[:split])
+        assert state.weeks_seen == split
+        pd.testing.assert_frame_equal(state.current(), pd.DataFrame(
+            {name: expected[name].iloc[split - 1].to_numpy() for name in INDICATORS},
+            index=state.current().index), rtol=1e-9, atol=1e-9)
+
+        restored = IndicatorState.from_dict(state.to_dict())
+        assert_matches(stream(restored, df.iloc[split:split + HISTORY]),
+                       {k: v.iloc[:split + HISTORY] for k, v in expected.items()}, f'{label} dict')
+        restored.save(tmp_path / f'{label}.npz')
+        loaded = IndicatorState.load(tmp_path / f'{label}.npz')
+        assert loaded.last_week == df.index[split + HISTORY - 1]
+        assert_matches(stream(loaded, df.iloc[split + HISTORY:]), expected, f'{label} npz')
+
+
+def test_update_rejects_old_weeks(trends):
+    state = IndicatorState.from_history(trends)
+    with pytest.raises(ValueError):
+        state.update(trends.iloc[-1], week=trends.index[-1])
+    with pytest.raises(ValueError):
+        state.update([1.0, 2.0])
@@ -0,0 +1,118 @@
+"""
+Dependency-ordered indicator evaluation, serial and on a thread pool
+"""
+
+import functools
+import time
+from collections import Counter
+
+import pytest
+
+import instrument
+from bubble_monitoring_dashboard import REGISTRY, AIBubbleMonitor
+from indicator_registry import IndicatorRegistry, run
+
+
+def monitor_with_capex(calls=None):
+    """
+    A monitor with one extra indicator derived from vc_funding; calls, if
+    given, counts every indicator computation by name
+    """
+    registry = REGISTRY.copy()
+
+    @registry.indicator('ai_capex', depends=['vc_funding'], weight=0.05)
+    def ai_capex(monitor, vc_funding, capex_growth=40):
+        time.sleep(0.01)
+        return {'score': (vc_funding['score'] + capex_growth) / 2, 'interpretation': 'derived'}
+
+    if calls is not None:
+        def counted(name, compute):
+            @functools.wraps(compute)
+            def wrapper(*args, **kwargs):
+                calls[name] += 1
+                return compute(*args, **kwargs)
+            return wrapper
+
+        for name in list(registry):
+            indicator = registry[name]
+            registry.register(name, counted(name, indicator.compute), indicator.depends, indicator.weight)
+    return AIBubbleMonitor(registry)
+
+
+def test_order_puts_dependencies_first():
+    registry = IndicatorRegistry()
+    for name, depends in [('c', ['b']), ('b', ['a']), ('a', []), ('d', ['a'])]:
+        registry.register(name, lambda monitor: 0, depends)
+    order = registry.order(['c', 'd'])
+    assert sorted(order) == ['a', 'b', 'c', 'd']
+    assert order.index('a') < order.index('b') < order.index('c') and order.index('a') < order.index('d')
+    assert registry.dependents('a') == {'b', 'c', 'd'}
+
+    registry.register('a', lambda monitor: 0, ['c'])
+    with pytest.raises(ValueError, match='cycle'):
+        registry.order(['c'])
+
+
+def test_run_waits_for_dependencies():
+    registry = IndicatorRegistry()
+    for name, depends in [('a', []), ('b', ['a']), ('c', ['a']), ('d', ['b', 'c'])]:
+        registry.register(name, lambda monitor: 0, depends)
+    finished = []
+
+    def compute(name):
+        assert set(registry[name].depends) <= set(finished)
+        time.sleep(0.005)
+        finished.append(name)
+
+    run(registry, registry.order(['d']), compute, workers=4)
+    assert finished[0] == 'a' and finished[-1] == 'd'
+
+
+@pytest.mark.parametrize('tracing', [False, True])
+def test_threaded_evaluation_with_a_dependency(tracing):
+    serial = monitor_with_capex()
+    expected = serial.calculate_composite_score()
+
+    if tracing:
+        instrument.reset()
+        instrument.enable()
+    try:
+        calls = Counter()
+        monitor = monitor_with_capex(calls)
+        assert monitor.calculate_composite_score(workers=4) == pytest.approx(expected)
+        assert set(calls.values()) == {1} and len(calls) == len(monitor.registry)
+        assert monitor.indicators['ai_capex']['score'] == pytest.approx(
+            (monitor.indicators['vc_funding']['score'] + 40) / 2)
+        assert list(monitor.indicators) == list(monitor.registry)
+
+        # Only the changed indicator and the one derived from it are recomputed
+        monitor.set_inputs('vc_funding', quarterly_investment=10)
+        serial.set_inputs('vc_funding', quarterly_investment=10)
+        assert monitor.dirty_indicators() == ['vc_funding', 'ai_capex']
+        calls.clear()
+        assert monitor.calculate_composite_score(workers=4) == pytest.approx(
+            serial.calculate_composite_score())
+        assert calls == {'vc_funding': 1, 'ai_capex': 1}
+        assert monitor.dirty_indicators() == []
+
+        # The same value again changes nothing
+        monitor.set_inputs('vc_funding', quarterly_investment=10)
+        assert monitor.dirty_indicators() == []
+        calls.clear()
+        monitor.calculate_composite_score(workers=4)
+        assert calls == {}
+        rows = instrument.records()
+    finally:
+        if tracing:
+            instrument.disable()
+            instrument.reset()
+
+    if tracing:
+        composite = [row for row in rows if row['name'] == 'AIBubbleMonitor.calculate_composite_score']
+        assert [row['depth'] for row in composite] == [0, 0, 0, 0]
+        assert all(row['peak_kb'] is not None for row in composite)
+        # The monitor's calculate_* sections ran on the pool's threads, each
+        # at the top of its own stack and without the process-wide peak
+        pooled = [row for row in rows if row['thread'] != composite[0]['thread']]
+        assert pooled and all(row['depth'] == 0 and row['peak_kb'] is None for row in pooled)
+        assert {row['name'] for row in rows} >= {'AIBubbleMonitor.calculate_vc_funding_score'}
@@ -0,0 +1,95 @@
+"""
+Section instrumentation, on one thread and on several at once
+"""
+
+import atexit
+import threading
+import time
+import tracemalloc
+
+import pytest
+
+import instrument
+
+
+@pytest.fixture
+def tracing():
+    instrument.reset()
+    instrument.enable()
+    yield
+    instrument.disable()
+    instrument.reset()
+
+
+def test_nested_sections(tracing):
+    with instrument.section('outer'):
+        with instrument.section('inner'):
+            block = bytearray(1 << 20)
+        del block
+    inner, outer = instrument.records()
+    assert (inner['name'], inner['depth'], outer['name'], outer['depth']) == ('inner', 1, 'outer', 0)
+    assert inner['peak_kb'] >= 1024 and outer['peak_kb'] >= inner['peak_kb']
+    assert outer['wall_ms'] >= inner['wall_ms']
+
+
+def test_threads_keep_their_own_stacks(tracing):
+    barrier = threading.Barrier(4)
+
+    @instrument.traced('worker')
+    def worker():
+        barrier.wait()
+        with instrument.section('step'):
+            time.sleep(0.01)
+        barrier.wait()
+
+    with instrument.section('main'):
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    rows = instrument.records()
+    assert [row['name'] for row in rows].count('step') == 4
+    for row in rows:
+        if row['name'] == 'main':
+            assert row['depth'] == 0 and row['peak_kb'] is not None
+        else:
+            # Worker sections nest on their own thread and skip the process-wide peak
+            assert row['depth'] == (1 if row['name'] == 'step' else 0)
+            assert row['peak_kb'] is None
+            assert row['cpu_ms'] <= row['wall_ms'] + 1
+    assert len({row['thread'] for row in rows if row['name'] == 'worker'}) == 4
+
+
+def test_records_are_capped(tracing, monkeypatch):
+    monkeypatch.setattr(instrument, '_records', instrument._records)   # restored afterwards
+    instrument.enable(max_records=10)
+    for i in range(25):
+        with instrument.section(f'step {i}'):
+            pass
+    assert [row['name'] for row in instrument.records()] == [f'step {i}' for i in range(15, 25)]
+
+
+def test_flush_is_registered_once(monkeypatch):
+    registered = []
+    monkeypatch.setattr(atexit, 'register', registered.append)
+    monkeypatch.setattr(instrument, '_flush_registered', False)
+    for _ in range(3):
+        instrument.enable(memory=False)
+        instrument.disable()
+    assert registered == [instrument._flush]
+
+
+def test_leaves_outside_tracemalloc_running():
+    tracemalloc.start()
+    try:
+        instrument.enable()
+        instrument.disable()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    instrument.enable()
+    instrument.disable()
+    assert not tracemalloc.is_tracing()
+    instrument.reset()
@@ -0,0 +1,84 @@
+"""
+Row-wise least-squares fits against scipy.stats.linregress, for the linear
+trend and the log fit behind the exponential projection
+"""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from batch_scoring import exp_growth_rate, linear_fit, trend_table
+
+FIELDS = {'slope': 'slope', 'intercept': 'intercept', 'r_value': 'rvalue',
+          'p_value': 'pvalue', 'stderr': 'stderr'}
+
+
+def regress(row):
+    """
+    linregress of the row against week number, NaN weeks left out
+    """
+    weeks = np.flatnonzero(np.isfinite(row))
+    return stats.linregress(weeks.astype(np.float64), row[weeks])
+
+
+def series(name, trends, random_export):
+    rng = np.random.default_rng(len(name))
+    if name == 'bundled':
+        return trends.to_numpy().T
+    if name == 'random':
+        return random_export(rng).to_numpy().T
+    if name == 'gapped':
+        x = random_export(rng).to_numpy().T
+        return np.where(rng.random(x.shape) < 0.2, np.nan, x)
+    if name == 'short':
+        return rng.normal(50, 10, (6, 4))
+    if name == 'falling':
+        return 90 - 0.5 * np.arange(52)[None, :] + rng.normal(0, 3, (3, 52))
+
+
+DATASETS = ['bundled', 'random', 'gapped', 'short', 'falling']
+
+
+@pytest.mark.parametrize('weeks', [None, 52, 26])
+@pytest.mark.parametrize('name', DATASETS)
+def test_linear_fit_matches_linregress(trends, random_export, name, weeks):
+    x = series(name, trends, random_export)
+    x = x if weeks is None else x[:, -weeks:]
+    fit = linear_fit(x)
+    for i, row in enumerate(x):
+        expected = regress(row)
+        for field, attribute in FIELDS.items():
+            assert fit[field][i] == pytest.approx(getattr(expected, attribute), rel=1e-8, abs=1e-12), field
+        assert fit['n'][i] == np.isfinite(row).sum()
+
+
+@pytest.mark.parametrize('name', ['bundled', 'random', 'falling'])
+def test_exp_growth_rate_is_the_log_fit(trends, random_export, name):
+    x = series(name, trends, random_export)[:, -26:]
+    rate = exp_growth_rate(x)
+    for i, row in enumerate(x):
+        expected = regress(np.log(row + 1)).slope
+        assert rate[i] == pytest.approx(expected, rel=1e-8, abs=1e-12)
+        # The script's np.polyfit(range(26), log(y + 1), 1)
+        assert rate[i] == pytest.approx(np.polyfit(np.arange(26), np.log(row + 1), 1)[0], rel=1e-8, abs=1e-12)
+
+
+def test_exp_growth_rate_skips_zero_and_missing_weeks():
+    x = np.array([[1.0, 2, 3, 4], [0, 2, 3, 4], [1, np.nan, 3, 4]])
+    rate = exp_growth_rate(x)
+    assert np.isfinite(rate[0])
+    assert np.isnan(rate[1:]).all()
+
+
+@pytest.mark.parametrize('name', ['bundled', 'random'])
+def test_trend_table_projections(trends, random_export, name):
+    x = series(name, trends, random_export)
+    table = trend_table(x, trend_weeks=52, exp_weeks=26, weeks_ahead=13)
+    for i, row in enumerate(x):
+        linear = regress(row[-52:])
+        rate = regress(np.log(row[-26:] + 1)).slope
+        assert table['slope'][i] == pytest.approx(linear.slope, rel=1e-8)
+        assert table['intercept'][i] == pytest.approx(linear.intercept, rel=1e-8)
+        assert table['r_squared'][i] == pytest.approx(linear.rvalue ** 2, rel=1e-8, abs=1e-12)
+        assert table['linear_projection'][i] == pytest.approx(row[-1] + linear.slope * 13, rel=1e-8)
+        assert table['exp_projection'][i] == pytest.approx(row[-1] * np.exp(rate) ** 13, rel=1e-8)
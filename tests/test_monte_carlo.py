@@ -0,0 +1,62 @@
+"""
+AR(1) projections with missing weeks
+"""
+
+import numpy as np
+import pytest
+
+from monte_carlo import fit_ar1, simulate_ar
+
+
+def ar1(rng, n, c=0.6, phi=0.8, scale=0.1):
+    y = np.empty(n)
+    y[0] = c / (1 - phi)
+    for t in range(1, n):
+        y[t] = c + phi * y[t - 1] + rng.normal(0, scale)
+    return y
+
+
+def test_fit_recovers_parameters(rng):
+    c, phi, residuals = fit_ar1(ar1(rng, 5000))
+    assert phi == pytest.approx(0.8, abs=0.03) and c == pytest.approx(0.6, abs=0.1)
+    assert residuals.std() == pytest.approx(0.1, abs=0.01)
+
+
+def test_fit_skips_pairs_across_gaps(rng):
+    y = ar1(rng, 400)
+    gappy = y.copy()
+    gappy[::3] = np.nan                     # every pair touching a gap is dropped
+    prev, curr = y[:-1], y[1:]
+    keep = np.isfinite(gappy[:-1]) & np.isfinite(gappy[1:])
+    expected = np.polyfit(prev[keep], curr[keep], 1)
+    c, phi, residuals = fit_ar1(gappy)
+    assert (phi, c) == pytest.approx(tuple(expected))
+    assert len(residuals) == keep.sum()
+
+
+def test_gaps_are_not_squeezed_out(trends):
+    history = trends['ai_bubble'].to_numpy().copy()
+    gappy = history.copy()
+    gappy[-40::2] = np.nan
+    squeezed = gappy[np.isfinite(gappy)]
+    # Squeezing would pair weeks two apart; the gappy fit keeps them apart
+    assert not np.allclose(simulate_ar(gappy, horizon=4, n_paths=500),
+                           simulate_ar(squeezed, horizon=4, n_paths=500))
+    np.testing.assert_array_equal(simulate_ar(history, horizon=4, n_paths=500, seed=3),
+                                  simulate_ar(history, horizon=4, n_paths=500, seed=3))
+
+
+def test_missing_last_weeks_are_simulated_through(trends):
+    history = trends['ai_bubble'].to_numpy().copy()
+    observed = history[:-3]
+    history[-3:] = np.nan
+    # One week after the gap is the fourth week after the last observed one
+    np.testing.assert_array_equal(simulate_ar(history, horizon=1, n_paths=2000, fit_weeks=1000),
+                                  simulate_ar(observed, horizon=4, n_paths=2000, fit_weeks=1000)[:, 3:])
+
+
+def test_too_little_data_is_a_value_error():
+    with pytest.raises(ValueError, match='no observed weeks'):
+        simulate_ar(np.full(60, np.nan))
+    with pytest.raises(ValueError, match='consecutive'):
+        simulate_ar(np.array([5.0, np.nan, 6.0, np.nan, 7.0, 8.0]))
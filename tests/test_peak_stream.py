@@ -0,0 +1,88 @@
+"""
+The streaming peak detector against scipy.signal.find_peaks
+"""
+
+import numpy as np
+import pytest
+from scipy.signal import find_peaks
+
+from peak_stream import PeakMonitor, StreamingPeakDetector, detect_peaks
+
+WLENS = [None, 3, 4, 9, 26, 52.5]
+
+# Short windows leave find_peaks some zero-prominence flat tops, which it warns about
+pytestmark = pytest.mark.filterwarnings('ignore:some peaks have a prominence of 0')
+
+
+@pytest.mark.parametrize('wlen', WLENS)
+@pytest.mark.parametrize('prominence', [1, 5, 15])
+def test_bundled_export(trends, prominence, wlen):
+    for term in trends:
+        x = trends[term].to_numpy()
+        np.testing.assert_array_equal(detect_peaks(x, prominence, wlen),
+                                      find_peaks(x, prominence=prominence, wlen=wlen)[0], err_msg=term)
+
+
+@pytest.mark.parametrize('wlen', WLENS)
+def test_random_series(rng, wlen):
+    # Coarse integer levels make plenty of flat tops and equal neighbours
+    for high in [3, 10, 101]:
+        for _ in range(30):
+            x = rng.integers(0, high, rng.integers(1, 300)).astype(np.float64)
+            for prominence in [1, 2, 5]:
+                np.testing.assert_array_equal(detect_peaks(x, prominence, wlen),
+                                              find_peaks(x, prominence=prominence, wlen=wlen)[0])
+
+
+def test_random_walks(rng):
+    for _ in range(20):
+        x = np.clip(np.round(np.cumsum(rng.normal(0, 3, 500)) + 50), 0, 100)
+        for wlen in WLENS:
+            np.testing.assert_array_equal(detect_peaks(x, 5, wlen), find_peaks(x, prominence=5, wlen=wlen)[0])
+
+
+def stream(x, **kwargs):
+    detector = StreamingPeakDetector(**kwargs)
+    return [peak for value in x for peak in detector.update(value)]
+
+
+def test_confirmed_prominence_and_latency(trends):
+    x = trends['ai_bubble'].to_numpy()
+    indices, properties = find_peaks(x, prominence=5)
+    peaks = stream(x, prominence=5, wlen=None)
+    assert [peak['index'] for peak in peaks] == list(indices)
+    for peak, prominence in zip(peaks, properties['prominences']):
+        assert peak['value'] == x[peak['index']]
+        assert 5 <= peak['prominence'] <= prominence
+        # Confirmed the week the series first fell prominence below the peak's base
+        assert peak['latency'] >= 1
+
+
+def test_windowed_latency_is_bounded(trends, rng):
+    series = [trends[term].to_numpy() for term in trends]
+    series += [np.clip(np.round(np.cumsum(rng.normal(0, 3, 500)) + 50), 0, 100) for _ in range(10)]
+    for x in series:
+        for wlen in [9, 26, 52]:
+            peaks = stream(x, prominence=5, wlen=wlen)
+            assert [peak['index'] for peak in peaks] == list(find_peaks(x, prominence=5, wlen=wlen)[0])
+            assert all(peak['latency'] <= wlen // 2 for peak in peaks)
+
+
+def test_detector_keeps_no_history(trends):
+    detector = StreamingPeakDetector()
+    assert detector.half == 26
+    for value in np.tile(trends['ai_bubble'].to_numpy(), 20):
+        detector.update(value)
+    assert not hasattr(detector, 'peaks')
+    assert len(detector._recent) <= 2 * detector.half + 2 and len(detector._pending) <= detector.half + 1
+
+
+def test_monitor_matches_each_series(trends):
+    monitor = PeakMonitor(trends.columns, prominence=5, wlen=26)
+    found = {name: [] for name in trends.columns}
+    for week, row in trends.iterrows():
+        for name, peak in monitor.update(row, week):
+            found[name].append(peak['index'])
+            assert peak['week'] == trends.index[peak['index']]
+    for name in trends.columns:
+        assert sorted(found[name]) == list(detect_peaks(trends[name].to_numpy(), 5, 26))
@@ -0,0 +1,96 @@
+"""
+KLL sketch quantiles against np.quantile: rank error on seeded streams, and
+merged shards against one sketch fed the concatenated stream
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantile_sketch import DEFAULT_K, PHASE_QUANTILES, QuantileSketch
+
+QS = [0.01, 0.1] + PHASE_QUANTILES + [0.99]
+# The documented bound for k=200 (99% confidence); seeded, so not flaky
+EPS = 0.0165
+NAMES = ['normal', 'lognormal', 'uniform']
+
+
+def stream(rng, n):
+    return pd.DataFrame({'normal': rng.normal(50, 15, n),
+                         'lognormal': rng.lognormal(2, 1, n),
+                         'uniform': rng.integers(0, 101, n).astype(np.float64)})
+
+
+def rank_error(data, estimates):
+    """
+    Largest gap, over qs, between q and the fraction of data at or below the estimate
+    (within the band of the estimate's ties for discrete data), NaN skipped
+    """
+    errors = []
+    for name in NAMES:
+        values = np.sort(data[name].dropna().to_numpy())
+        for q, estimate in zip(QS, estimates.loc[name]):
+            below = np.searchsorted(values, estimate, 'left') / len(values)
+            at_or_below = np.searchsorted(values, estimate, 'right') / len(values)
+            errors.append(max(below - q, q - at_or_below, 0))
+    return max(errors)
+
+
+def test_exact_before_the_first_compaction(rng):
+    data = stream(rng, DEFAULT_K)
+    sketch = QuantileSketch.from_history(data)
+    assert sketch.retained == DEFAULT_K
+    expected = np.quantile(data.to_numpy(), QS, axis=0).T
+    np.testing.assert_allclose(sketch.quantiles(QS).to_numpy(), expected, rtol=1e-12)
+
+
+def test_rank_error_within_bound(rng):
+    data = stream(rng, 200000)
+    sketch = QuantileSketch(NAMES, seed=1)
+    for start in range(0, len(data), 500):
+        sketch.update(data.iloc[start:start + 500])
+    assert sketch.n == len(data)
+    assert sketch.retained < 3 * DEFAULT_K
+    assert rank_error(data, sketch.quantiles(QS)) < EPS
+
+
+def test_weekly_updates_skip_nan(rng):
+    data = stream(rng, 5000)
+    data.iloc[::7, 0] = np.nan
+    sketch = QuantileSketch(NAMES, seed=2)
+    for _, week in data.iterrows():
+        sketch.update(week)
+    assert sketch.n == len(data)
+    assert rank_error(data, sketch.quantiles(QS)) < EPS
+
+
+def test_merged_shards_match_the_concatenated_stream(rng):
+    shards = [stream(rng, n) for n in (30000, 70000, 1000)]
+    data = pd.concat(shards, ignore_index=True)
+    whole = QuantileSketch.from_history(data, seed=3)
+
+    merged = QuantileSketch.from_history(shards[0], seed=4)
+    for i, shard in enumerate(shards[1:]):
+        merged.merge(QuantileSketch.from_history(shard, seed=5 + i))
+    assert merged.n == whole.n == len(data)
+    assert merged.retained < 3 * DEFAULT_K
+
+    assert rank_error(data, whole.quantiles(QS)) < EPS
+    assert rank_error(data, merged.quantiles(QS)) < EPS
+    # Both estimate the same ranks: within the bound of each other's data
+    np.testing.assert_allclose(merged.quantiles(QS).loc['uniform'], whole.quantiles(QS).loc['uniform'],
+                               atol=2)
+
+
+def test_merging_small_shards_is_exact(rng):
+    shards = [stream(rng, 50) for _ in range(3)]
+    merged = QuantileSketch.from_history(shards[0])
+    for shard in shards[1:]:
+        merged.merge(QuantileSketch.from_history(shard))
+    whole = QuantileSketch.from_history(pd.concat(shards))
+    pd.testing.assert_frame_equal(merged.quantiles(QS), whole.quantiles(QS))
+
+
+def test_merge_rejects_other_series():
+    with pytest.raises(ValueError):
+        QuantileSketch(NAMES).merge(QuantileSketch(NAMES[::-1]))
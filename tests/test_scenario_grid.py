@@ -0,0 +1,69 @@
+"""
+Vectorised scenarios against the monitor's scalar calculate_* methods
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bubble_monitoring_dashboard import AIBubbleMonitor
+from scenario_grid import INDICATOR_INPUTS
+
+# Integer ranges, so scenarios land on the ladder bounds as well as between them
+RANGES = {
+    'current_level': (0, 101), 'growth_rate': (0, 400),
+    'fund_manager_bubble_pct': (0, 101), 'expert_warnings': (0, 15), 'media_mentions': (0, 101),
+    'quarterly_investment': (0, 120), 'yoy_growth': (0, 120),
+    'top7_market_share': (10, 45), 'ai_exposure_pct': (0, 60),
+    'project_failure_rate': (0, 101), 'paid_user_pct': (0, 101), 'revenue_multiple': (0, 120),
+}
+
+
+def scalar_composite(row):
+    """
+    composite and phase of one scenario row from a fresh monitor
+    """
+    monitor = AIBubbleMonitor()
+    pe_ratios = dict(monitor.scenario_defaults()['valuation_metrics']['pe_ratios'])
+    pe_ratios.update((name[3:], row[name]) for name in row.index if name.startswith('pe_'))
+    monitor.set_inputs('valuation_metrics', pe_ratios=pe_ratios)
+    for indicator, names in INDICATOR_INPUTS.items():
+        given = {name: row[name] for name in names if name in row.index}
+        if given:
+            monitor.set_inputs(indicator, **given)
+    composite = monitor.calculate_composite_score()
+    return composite, monitor.get_bubble_phase(composite)
+
+
+def check(scenarios):
+    table = AIBubbleMonitor().score_scenarios(scenarios)
+    for i, row in scenarios.iterrows():
+        composite, phase = scalar_composite(row)
+        assert table['composite'].iloc[i] == pytest.approx(composite, abs=1e-9)
+        assert table['phase'].iloc[i] == phase
+
+
+def test_random_scenarios_match_the_monitor(rng):
+    n = 200
+    scenarios = pd.DataFrame({name: rng.integers(low, high, n) for name, (low, high) in RANGES.items()})
+    for company in AIBubbleMonitor.DEFAULT_PE_RATIOS:
+        scenarios[f'pe_{company}'] = rng.integers(10, 140, n)
+    check(scenarios)
+
+
+def test_partial_pe_columns_keep_the_other_defaults(rng):
+    n = 50
+    scenarios = pd.DataFrame({'pe_NVIDIA': rng.integers(10, 140, n).astype(np.float64),
+                              'quarterly_investment': rng.integers(0, 120, n)})
+    check(scenarios)
+
+    monitor = AIBubbleMonitor()
+    assert monitor.score_scenarios({'pe_NVIDIA': [53.0]})['composite'].iloc[0] == pytest.approx(
+        monitor.calculate_composite_score())
+
+
+def test_unknown_pe_company_is_rejected():
+    with pytest.raises(KeyError, match='pe_Nvidia'):
+        AIBubbleMonitor().score_scenarios({'pe_Nvidia': [53.0]})
+    with pytest.raises(ValueError):
+        AIBubbleMonitor().score_scenarios({'pe_NVIDIA': [53.0], 'pe_ratios': [[53.0] * 5]})
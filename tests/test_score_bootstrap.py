@@ -0,0 +1,65 @@
+"""
+Block-bootstrap score intervals: coverage of the point estimate, seeding,
+and narrowing as each week is measured from more data
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from score_bootstrap import SCORES, bootstrap_frame, bootstrap_scores
+
+N_BOOT = 500
+N_SERIES = 20
+WEEKS = pd.date_range('2020-10-18', periods=260, freq='W')
+
+
+def universe(rng, pooled=1):
+    """
+    Rising series whose weekly noise is the mean of `pooled` independent
+    draws, as if each week were sampled from that many regions
+    """
+    t = np.linspace(0, 1, len(WEEKS))
+    noise = rng.normal(0, 12, (pooled, N_SERIES, len(WEEKS))).mean(axis=0)
+    return np.clip(20 + 40 * t + noise, 0, 100), 30 + 10 * t, np.full(len(WEEKS), 40.0)
+
+
+def widths(table):
+    return pd.DataFrame({score: table[f'{score}_hi'] - table[f'{score}_lo'] for score in SCORES})
+
+
+def test_point_estimate_inside_interval(rng):
+    table = bootstrap_scores(*universe(rng), WEEKS, n_boot=N_BOOT, workers=1, seed=1)
+    assert len(table) == N_SERIES
+    for score in SCORES:
+        assert (table[f'{score}_lo'] <= table[score]).all()
+        assert (table[score] <= table[f'{score}_hi']).all()
+        assert table[f'{score}_mean'].between(table[f'{score}_lo'], table[f'{score}_hi']).all()
+    assert (widths(table).to_numpy() > 0).any()
+
+
+def test_bundled_export_intervals(trends):
+    row = bootstrap_frame(trends, n_boot=N_BOOT, workers=1, seed=1)
+    # This week is the series' peak. Resamples replace its residual, so scores
+    # that reward being at the peak can sit above their interval (see the
+    # README), never below it
+    for score in SCORES:
+        assert row[f'{score}_lo'] <= row[score]
+        assert 0 <= row[f'{score}_lo'] <= row[f'{score}_hi'] <= 100
+    assert row['refined_bubble_probability'] > row['refined_bubble_probability_hi']
+
+
+def test_same_seed_same_intervals(rng):
+    data = universe(rng)
+    first = bootstrap_scores(*data, WEEKS, n_boot=N_BOOT, workers=1, seed=7)
+    pd.testing.assert_frame_equal(bootstrap_scores(*data, WEEKS, n_boot=N_BOOT, workers=1, seed=7), first)
+    pd.testing.assert_frame_equal(bootstrap_scores(*data, WEEKS, n_boot=N_BOOT, workers=2, seed=7), first)
+    other = bootstrap_scores(*data, WEEKS, n_boot=N_BOOT, workers=1, seed=8)
+    assert not other.equals(first)
+
+
+def test_interval_narrows_with_more_data(rng):
+    total = [widths(bootstrap_scores(*universe(rng, pooled), WEEKS, n_boot=N_BOOT, workers=1,
+                                     seed=1)).to_numpy().mean()
+             for pooled in (1, 4, 16)]
+    assert total[0] > total[1] > total[2]
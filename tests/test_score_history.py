@@ -0,0 +1,49 @@
+"""
+Score history queries, including snapshots that share a timestamp
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from score_history import ScoreHistory
+
+
+@pytest.fixture
+def history(tmp_path):
+    with ScoreHistory(tmp_path / 'history.db') as history:
+        yield history
+
+
+def test_same_timestamp_snapshots_stay_apart(history):
+    history.append({'vc': {'score': 10}, 'roi': {'score': 1}}, 50, 'Middle Stage', '2025-01-01')
+    history.append({'vc': {'score': 30}, 'roi': {'score': 3}}, 70, 'Late Stage', '2025-01-01')
+    history.append({'vc': {'score': 40}}, 80, 'Peak Formation', '2025-01-02')
+
+    table = history.range()
+    assert table['composite'].tolist() == [50, 70, 80]
+    assert table['phase'].tolist() == ['Middle Stage', 'Late Stage', 'Peak Formation']
+    assert table['vc'].tolist() == [10, 30, 40]
+    assert table['roi'].tolist()[:2] == [1, 3] and np.isnan(table['roi'].iloc[2])
+    assert list(history.range(indicators=['roi']).columns) == ['composite', 'phase', 'roi']
+
+    daily = history.downsample('1D')
+    assert daily['composite'].tolist() == [60, 80]
+    assert daily['vc'].tolist() == [20, 40]
+    assert history.downsample('1D', how='count')['roi'].tolist()[0] == 2
+
+    latest = history.latest()
+    assert latest['composite'] == 80 and latest['vc'] == 40
+
+
+def test_range_matches_appended_snapshots(history, rng):
+    weeks = pd.date_range('2024-01-07', periods=30, freq='W', tz='UTC')
+    scores = rng.uniform(0, 100, (len(weeks), 3))
+    history.append_many({'indicators': {name: {'score': value} for name, value in zip('abc', row)},
+                         'composite': row.mean(), 'timestamp': week}
+                        for week, row in zip(weeks, scores))
+
+    table = history.range(weeks[5], weeks[20])
+    assert list(table.index) == list(weeks[5:21])
+    np.testing.assert_allclose(table[['a', 'b', 'c']].to_numpy(), scores[5:21])
+    np.testing.assert_allclose(table['composite'].to_numpy(), scores[5:21].mean(axis=1))
@@ -0,0 +1,81 @@
+"""
+Search-trend inputs: incremental extension of the cached pyramid against a
+fresh build, rebuilds on edited history, and the memo/meta fast paths
+"""
+
+import numpy as np
+import pytest
+
+import search_feed
+from aggregate_pyramid import AggregatePyramid
+from search_feed import TERM, SearchTrendFeed
+
+PREFIX = 200
+
+
+def fresh(trends, tmp_path):
+    return SearchTrendFeed(tmp_path / 'fresh').inputs(trends)
+
+
+def forbid(monkeypatch, name):
+    def fail(*args, **kwargs):
+        raise AssertionError(f'{name} should not be called')
+    if name == 'from_frame':
+        monkeypatch.setattr(search_feed.AggregatePyramid, 'from_frame', fail)
+    else:
+        monkeypatch.setattr(SearchTrendFeed, name, fail)
+
+
+def test_extending_a_cached_prefix_matches_a_fresh_build(trends, tmp_path, monkeypatch):
+    expected = fresh(trends, tmp_path)
+    SearchTrendFeed(tmp_path / 'cache').inputs(trends.iloc[:PREFIX])
+
+    with monkeypatch.context() as patch:
+        forbid(patch, 'from_frame')
+        assert SearchTrendFeed(tmp_path / 'cache').inputs(trends) == expected
+
+    # The saved pyramid is the one a fresh build would have saved
+    extended = AggregatePyramid.load(tmp_path / 'cache' / 'monitor' / f'search_{TERM}.npz')
+    built = AggregatePyramid.load(tmp_path / 'fresh' / 'monitor' / f'search_{TERM}.npz')
+    for level in ('month', 'quarter', 'year'):
+        np.testing.assert_allclose(extended.frame(level).to_numpy(), built.frame(level).to_numpy(),
+                                   rtol=1e-12)
+
+
+def test_edited_past_week_forces_a_rebuild(trends, tmp_path):
+    SearchTrendFeed(tmp_path / 'cache').inputs(trends.iloc[:PREFIX])
+    edited = trends.copy()
+    edited.iloc[PREFIX // 2, edited.columns.get_loc(TERM)] += 7
+
+    feed = SearchTrendFeed(tmp_path / 'cache')
+    series = edited[TERM].astype(np.float64).dropna()
+    assert feed._extend(series, feed._read_meta()) is None
+    assert feed.inputs(edited) == fresh(edited, tmp_path)
+
+
+def test_same_data_is_served_from_memo_and_meta(trends, tmp_path, monkeypatch):
+    feed = SearchTrendFeed(tmp_path)
+    expected = feed.inputs(trends)
+
+    with monkeypatch.context() as patch:
+        forbid(patch, '_read_meta')
+        forbid(patch, '_extend')
+        assert feed.inputs(trends) == expected
+
+    with monkeypatch.context() as patch:
+        forbid(patch, '_extend')
+        forbid(patch, 'from_frame')
+        assert SearchTrendFeed(tmp_path).inputs(trends) == expected
+
+    # Callers get a copy, not the memo
+    feed.inputs(trends)['current_level'] = -1
+    assert feed.inputs(trends) == expected
+
+
+def test_unwritable_cache_still_returns_inputs(trends, tmp_path):
+    blocker = tmp_path / 'not_a_directory'
+    blocker.write_text('')
+    feed = SearchTrendFeed(blocker)
+    assert feed.inputs(trends) == fresh(trends, tmp_path)
+    assert feed._read_meta() is None
+    assert feed.inputs(trends.iloc[:PREFIX]) == fresh(trends.iloc[:PREFIX], tmp_path / 'prefix')
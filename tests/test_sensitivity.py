@@ -0,0 +1,50 @@
+"""
+Sobol indices of the composite: the nominal point, fixed parameters and
+determinism across worker counts
+"""
+
+import numpy as np
+import pytest
+
+from bubble_monitoring_dashboard import AIBubbleMonitor
+from sensitivity import composite_scores, parameter_space, sobol_indices
+
+BASE_SAMPLES = 256
+
+
+def run(workers, **kwargs):
+    space = parameter_space(AIBubbleMonitor())
+    per_chunk = BASE_SAMPLES * (len(space) + 2)
+    return sobol_indices(AIBubbleMonitor(), budget=600, max_evaluations=4 * per_chunk,
+                         base_samples=BASE_SAMPLES, workers=workers, seed=7, **kwargs)
+
+
+def test_nominal_row_is_the_monitor_composite():
+    monitor = AIBubbleMonitor()
+    space = parameter_space(monitor)
+    nominal = space['nominal'].to_numpy(np.float64)[None, :]
+    assert composite_scores(nominal, space)[0] == pytest.approx(monitor.calculate_composite_score())
+
+    monitor.set_inputs('vc_funding', quarterly_investment=30)
+    space = parameter_space(monitor)
+    nominal = space['nominal'].to_numpy(np.float64)[None, :]
+    assert composite_scores(nominal, space)[0] == pytest.approx(monitor.calculate_composite_score())
+
+
+def test_fixed_parameter_has_no_effect():
+    fixed = AIBubbleMonitor().scenario_defaults()['sentiment_analysis']['expert_warnings']
+    table = run(1, ranges={'expert_warnings': (fixed, fixed)})
+    assert table.attrs['chunks'] == 4
+    assert table.loc['expert_warnings', 'S1'] == pytest.approx(0, abs=1e-12)
+    assert table.loc['expert_warnings', 'ST'] == pytest.approx(0, abs=1e-12)
+    # Something moves the score, and the ranking is by total index
+    assert table['ST'].max() > 0.05
+    assert (np.diff(table['ST'].to_numpy()) <= 0).all()
+
+
+def test_same_indices_on_any_number_of_workers():
+    serial, pooled = run(1), run(2)
+    assert serial.attrs['chunks'] == pooled.attrs['chunks'] == 4
+    columns = ['S1', 'S1_se', 'ST', 'ST_se']
+    np.testing.assert_allclose(pooled.loc[serial.index, columns].to_numpy(),
+                               serial[columns].to_numpy(), rtol=1e-12, atol=1e-15)
@@ -0,0 +1,62 @@
+"""
+The parsed-CSV cache: reuse, touch handling and rebuilds
+"""
+
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import trends_loader
+from trends_loader import TRENDS_CSV, load_trends, parse_trends_csv
+
+
+@pytest.fixture
+def export(tmp_path):
+    path = tmp_path / 'export.csv'
+    shutil.copy(TRENDS_CSV, path)
+    return path
+
+
+@pytest.fixture
+def digests(monkeypatch):
+    calls = []
+    digest = trends_loader.file_digest
+
+    def counted(path, *args, **kwargs):
+        calls.append(path)
+        return digest(path, *args, **kwargs)
+    monkeypatch.setattr(trends_loader, 'file_digest', counted)
+    return calls
+
+
+def test_cached_load_matches_parse(export, tmp_path):
+    cache = tmp_path / 'cache'
+    cold = load_trends(export, cache_dir=cache)
+    warm = load_trends(export, cache_dir=cache)
+    pd.testing.assert_frame_equal(cold, parse_trends_csv(export))
+    pd.testing.assert_frame_equal(warm, cold)
+
+
+def test_touch_hashes_once(export, tmp_path, digests):
+    cache = tmp_path / 'cache'
+    load_trends(export, cache_dir=cache)
+    assert len(digests) == 1                     # written with the cache
+
+    stat = export.stat()
+    os.utime(export, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    load_trends(export, cache_dir=cache)
+    load_trends(export, cache_dir=cache)
+    # The first load after the touch hashes and refreshes the stored mtime
+    assert len(digests) == 2
+
+
+def test_changed_content_is_reparsed(export, tmp_path):
+    cache = tmp_path / 'cache'
+    load_trends(export, cache_dir=cache)
+    text = export.read_text().splitlines()
+    last = text[-1].split(',')
+    last[1] = '1' if last[1] != '1' else '2'
+    export.write_text('\n'.join(text[:-1] + [','.join(last)]) + '\n')
+    assert load_trends(export, cache_dir=cache).iloc[-1, 0] == int(last[1])
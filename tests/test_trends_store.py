@@ -0,0 +1,79 @@
+"""
+Trends store round trips, missing weeks and region selection
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ai_bubble_analysis
+import ai_bubble_refined_analysis
+from trends_store import MISSING, TrendsStore, load_terms
+
+
+@pytest.fixture
+def store(tmp_path, trends):
+    store = TrendsStore.create(tmp_path / 'store', list(trends.columns), ['US', 'DE'], trends.index)
+    for term in trends:
+        store.write(term, 'US', trends[term].to_numpy())
+        gappy = trends[term].to_numpy().copy()
+        gappy[10:13] = np.nan
+        store.write(term, 'DE', gappy)
+    store.flush()
+    return store
+
+
+def test_missing_weeks_round_trip(store, trends):
+    assert (store.series('ai_bubble', 'DE')[10:13] == MISSING).all()
+    frame = store.frame(['ai_bubble', 'langchain'], 'DE')
+    assert frame['ai_bubble'].isna().sum() == 3
+    pd.testing.assert_series_equal(frame['ai_bubble'].dropna(), trends['ai_bubble'].drop(trends.index[10:13]),
+                                   check_dtype=False)
+    assert store.frame(['ai_bubble'], 'US')['ai_bubble'].dtype == np.uint8
+
+
+@pytest.mark.parametrize('value', [300.0, 254.0, 101.0, -1.0, np.inf])
+def test_write_rejects_out_of_range(store, value):
+    before = store.series('ai_bubble', 'US').copy()
+    values = np.full(len(store.weeks), 50.0)
+    values[7] = value
+    with pytest.raises(ValueError, match='outside 0-100'):
+        store.write('ai_bubble', 'US', values)
+    np.testing.assert_array_equal(store.series('ai_bubble', 'US'), before)
+
+
+@pytest.mark.parametrize('value', [5.5, 99.9, 0.25])
+def test_write_rejects_fractions(store, value):
+    values = np.full(len(store.weeks), 50.0)
+    values[7] = value
+    with pytest.raises(ValueError, match='whole numbers'):
+        store.write('ai_bubble', 'US', values)
+
+
+def test_write_accepts_the_full_scale(store):
+    values = np.r_[0.0, 100.0, np.nan, np.full(len(store.weeks) - 3, 42.0)]
+    store.write('ai_bubble', 'US', values)
+    np.testing.assert_array_equal(store.series('ai_bubble', 'US')[:4], [0, 100, MISSING, 42])
+
+
+def test_region_is_required_with_several(store, tmp_path, trends):
+    with pytest.raises(ValueError, match='2 regions'):
+        store.region_offset(None)
+    with pytest.raises(KeyError):
+        store.region_offset('FR')
+    single = TrendsStore.create(tmp_path / 'single', ['ai_bubble'], ['US'], trends.index)
+    assert single.region_offset(None) == 0
+
+
+def test_scripts_keep_missing_weeks_as_nan(store, monkeypatch):
+    monkeypatch.setenv('TRENDS_STORE', str(store.path))
+    monkeypatch.setenv('TRENDS_REGION', 'DE')
+    for script in [ai_bubble_analysis, ai_bubble_refined_analysis]:
+        df = script.load_data()
+        assert df.dtypes.eq(np.float64).all() and df['ai_bubble'].isna().sum() == 3
+
+    monkeypatch.setenv('TRENDS_REGION', 'US')
+    assert ai_bubble_analysis.load_data().dtypes.eq(np.int64).all()
+    monkeypatch.delenv('TRENDS_REGION')
+    with pytest.raises(ValueError):
+        load_terms(['ai_bubble'])
@@ -0,0 +1,125 @@
+"""
+The columnar valuation engine against a plain pandas groupby
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bubble_monitoring_dashboard import AIBubbleMonitor
+from valuation_engine import (DEFAULT_NORM, SECTOR_NORMS, UNCLASSIFIED, load_universe,
+                              sector_breakdown, universe_score)
+
+
+def ladder_score(deviation):
+    # The monitor's if/elif valuation ladder
+    for bound, score in [(25, 20), (50, 40), (100, 60), (150, 80)]:
+        if deviation < bound:
+            return score
+    return 95
+
+
+@pytest.fixture
+def universe():
+    return pd.DataFrame({
+        'ticker': ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I'],
+        'sector': ['Technology', 'Technology', 'Technology', 'Energy', 'Energy',
+                   None, 'Financials', 'Made Up', 'Financials'],
+        'pe': [44.0, 18.0, -12.0, 30.0, np.nan, 50.0, 14.0, 45.0, 21.0],
+        'ps': [12.0, 3.0, 5.0, np.nan, 0.5, 4.0, 2.0, 9.0, 1.0],
+        'market_cap': [3000.0, 500.0, 100.0, 400.0, 50.0, 20.0, 800.0, 10.0, np.nan],
+    })
+
+
+def reference(df):
+    """
+    Per-sector equal- and cap-weighted deviations the slow way
+    """
+    df = df.copy()
+    df['sector'] = df['sector'].fillna(UNCLASSIFIED)
+    df['market_cap'] = df['market_cap'].fillna(0.0)
+    rows = {}
+    for metric, k in [('pe', 0), ('ps', 1)]:
+        norm = df['sector'].map(lambda s: SECTOR_NORMS.get(s, DEFAULT_NORM)[k])
+        dev = ((df[metric] - norm) / norm * 100).clip(lower=0).where(df[metric] > 0)
+        frame = df.assign(dev=dev, weighted=dev * df['market_cap'],
+                          weight=df['market_cap'].where(dev.notna(), 0.0))
+        for key, group in list(frame.groupby('sector')) + [('All', frame)]:
+            weight = group['weight'].sum()
+            rows.setdefault(key, {})[f'{metric}_deviation_equal'] = group['dev'].mean()
+            rows[key][f'{metric}_deviation_cap'] = group['weighted'].sum() / weight if weight > 0 else np.nan
+        for key, group in list(df.groupby('sector')) + [('All', df)]:
+            rows[key]['n'] = len(group)
+            rows[key]['market_cap'] = group['market_cap'].sum()
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+def test_breakdown_matches_groupby(universe):
+    table = sector_breakdown(load_universe(universe))
+    expected = reference(universe)
+    assert set(table.index) == set(expected.index)
+    for column in expected.columns:
+        np.testing.assert_allclose(table[column].astype(float), expected.loc[table.index, column].astype(float),
+                                   err_msg=column)
+    for metric in ['pe', 'ps']:
+        for weighting in ['equal', 'cap']:
+            deviation = table[f'{metric}_deviation_{weighting}']
+            scores = [ladder_score(d) if np.isfinite(d) else np.nan for d in deviation]
+            np.testing.assert_array_equal(table[f'{metric}_score_{weighting}'], scores)
+    # Loss-makers and missing P/E are left out, but still counted as tickers
+    assert table.loc['Technology', 'n'] == 3 and table.loc['Energy', 'n'] == 2
+    assert table.loc['Made Up', 'pe_norm'] == DEFAULT_NORM[0]
+
+
+def test_universe_score(universe):
+    for weighting in ['cap', 'equal']:
+        result = universe_score(universe, weighting=weighting)
+        expected = reference(universe).loc['All', f'pe_deviation_{weighting}']
+        assert result['deviation'] == pytest.approx(expected)
+        assert result['score'] == ladder_score(expected)
+        valid = universe[universe['pe'] > 0]
+        caps = valid['market_cap'].fillna(0.0) if weighting == 'cap' else np.ones(len(valid))
+        assert result['average'] == pytest.approx(np.average(valid['pe'], weights=caps))
+    with pytest.raises(ValueError):
+        universe_score(universe, weighting='median')
+
+
+def test_missing_sector_and_market_cap(universe):
+    bare = universe[['ticker', 'pe']]
+    table = sector_breakdown(bare)
+    assert list(table.index) == [UNCLASSIFIED, 'All']
+    # Without market caps every ticker weighs the same
+    assert table.loc['All', 'pe_deviation_cap'] == pytest.approx(table.loc['All', 'pe_deviation_equal'])
+    expected = reference(bare.assign(sector=None, ps=np.nan, market_cap=1.0))
+    assert table.loc['All', 'pe_deviation_equal'] == pytest.approx(expected.loc['All', 'pe_deviation_equal'])
+    with pytest.raises(KeyError):
+        load_universe(universe[['ticker', 'sector']])
+
+
+def test_parquet_and_renamed_columns(universe, tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'universe.parquet'
+    universe.rename(columns={'market_cap': 'mktcap_usd'}).to_parquet(path)
+    loaded = load_universe(path, market_cap='mktcap_usd')
+    assert list(loaded.columns) == ['ticker', 'sector', 'pe', 'ps', 'market_cap']
+    # Parquet dictionaries keep the sectors in order of appearance
+    pd.testing.assert_frame_equal(sector_breakdown(loaded).sort_index(),
+                                  sector_breakdown(universe).sort_index())
+
+    csv = tmp_path / 'universe.csv'
+    universe.to_csv(csv, index=False)
+    pd.testing.assert_frame_equal(sector_breakdown(load_universe(csv)), sector_breakdown(universe))
+
+
+def test_use_universe_feeds_the_composite(universe):
+    default = AIBubbleMonitor()
+    base = default.calculate_composite_score()
+    monitor = AIBubbleMonitor().use_universe(universe, weighting='equal')
+    composite = monitor.calculate_composite_score()
+
+    score = universe_score(universe, weighting='equal')['score']
+    weight = monitor.weights['valuation_metrics']
+    assert composite == pytest.approx(base + weight * (score - default.indicators['valuation_metrics']['score']))
+    details = monitor.indicators['valuation_metrics']
+    assert details['score'] == score and details['tickers'] == len(universe)
+    assert details['weighting'] == 'equal'